@@ -15,7 +15,6 @@ import tempfile         # For temporary files
 from pathlib import Path # For path handling
 import subprocess
 import mimetypes
-import base64
 import time
 import getpass
 from typing import Optional
@@ -65,6 +64,7 @@ from conversation import (
 )
 from controller import ChatController, TextTarget
 from events import EventType, Event
+from repositories import get_blob_store
 from message_renderer import MessageRenderer, RenderSettings, RenderCallbacks
 
 gi.require_version("Gtk", "3.0")
@@ -572,6 +572,9 @@ class OpenAIGTKClient(Gtk.Window):
         if hasattr(self, 'ws_provider'):
             self.ws_provider.stop_streaming()
 
+        # Write out chat saves still queued on the persistence worker
+        self.controller.flush_pending_saves()
+
         # Persist last active chat or document
         if self._in_document_mode and self.controller.document_service.current_document_id:
             self.settings.set('LAST_ACTIVE_DOCUMENT', self.controller.document_service.current_document_id, emit_event=False)
@@ -1288,6 +1291,8 @@ class OpenAIGTKClient(Gtk.Window):
     def _on_thinking_cancelled(self):
         """Handle cancel button click from ChatView."""
         self.request_cancelled = True
+        # Drop speech the read_aloud tool queued for this request.
+        self.controller.audio_service.cancel_playback(tag='read_aloud_tool')
         cancel_text = "** Request cancelled by user **"
         message_index = self.controller.add_notification(cancel_text, 'cancel')
         GLib.idle_add(lambda idx=message_index: self.append_message('ai', cancel_text, idx))
@@ -1846,6 +1851,35 @@ class OpenAIGTKClient(Gtk.Window):
             whitelist_str = self.settings.get(setting_key, "") or ""
             whitelists[provider_key] = set(m.strip() for m in whitelist_str.split(",") if m.strip())
 
+        def build_results(provider_models):
+            collected_models = []
+            mapping = {}
+            for name, models in provider_models.items():
+                # Apply whitelist filtering unless disabled
+                whitelist = whitelists.get(name, set())
+                if not disable_filter and whitelist:
+                    models = [m for m in models if m in whitelist]
+
+                for model in models:
+                    mapping[model] = name
+                    collected_models.append(model)
+
+            # Add custom models (persisted on disk)
+            if self.custom_models:
+                custom_whitelist = whitelists.get('custom', set())
+                custom_ids = list(self.custom_models.keys())
+                if not disable_filter and custom_whitelist:
+                    custom_ids = [m for m in custom_ids if m in custom_whitelist]
+                for model_id in custom_ids:
+                    mapping[model_id] = 'custom'
+                    collected_models.append(model_id)
+
+            if not collected_models:
+                collected_models = self._default_models_for_provider('openai')
+                mapping = {model: 'openai' for model in collected_models}
+
+            return sorted(dict.fromkeys(collected_models)), mapping
+
         def fetch_thread():
             if not self.providers:
                 # Even when no remote providers are initialized (e.g. fresh install
@@ -1874,42 +1908,19 @@ class OpenAIGTKClient(Gtk.Window):
                 GLib.idle_add(self.apply_model_fetch_results, unique_models, mapping)
                 return
 
-            collected_models = []
-            mapping = {}
-            for name, provider in self.providers.items():
-                try:
-                    # Fetch all models from the provider (no provider-side filtering)
-                    provider_models = provider.get_available_models(disable_filter=True)
-                except Exception as e:
-                    print(f"Error fetching models for {name}: {e}")
-                    provider_models = self._default_models_for_provider(name)
-
-                # Apply whitelist filtering unless disabled
-                whitelist = whitelists.get(name, set())
-                if not disable_filter and whitelist:
-                    provider_models = [m for m in provider_models if m in whitelist]
-
-                for model in provider_models:
-                    mapping[model] = name
-                    collected_models.append(model)
-
-            # Add custom models (persisted on disk)
-            if self.custom_models:
-                custom_whitelist = whitelists.get('custom', set())
-                custom_ids = list(self.custom_models.keys())
-                if not disable_filter and custom_whitelist:
-                    custom_ids = [m for m in custom_ids if m in custom_whitelist]
-                for model_id in custom_ids:
-                    mapping[model_id] = 'custom'
-                    collected_models.append(model_id)
-
-            if not collected_models:
-                collected_models = self._default_models_for_provider('openai')
-                mapping = {model: 'openai' for model in collected_models}
-
-            unique_models = sorted(dict.fromkeys(collected_models))
+            provider_models = self.controller.refresh_provider_models(list(self.providers.keys()))
+            unique_models, mapping = build_results(provider_models)
             GLib.idle_add(self.apply_model_fetch_results, unique_models, mapping)
 
+        # Populate the combo straight away from the model cache (possibly stale)
+        # when every provider has an entry; the background refresh then
+        # revalidates it and re-applies the result.
+        if self.providers:
+            cached = self.controller.get_cached_provider_models(list(self.providers.keys()))
+            if len(cached) == len(self.providers):
+                unique_models, mapping = build_results(cached)
+                self.apply_model_fetch_results(unique_models, mapping)
+
         # Start fetch in background
         threading.Thread(target=fetch_thread, daemon=True).start()
 
@@ -2013,59 +2024,31 @@ class OpenAIGTKClient(Gtk.Window):
         Handle read_aloud tool calls from AI models.
         
         This is called when a model invokes the read_aloud tool to speak text
-        to the user. Uses the unified TTS settings (tts_voice_provider, tts_voice,
-        tts_hd, tts_prompt_template) and blocks until playback is complete so 
-        the tool returns a proper status.
+        to the user. Uses the unified TTS settings (tts_voice_provider,
+        tts_voice, tts_hd, tts_prompt_template). The text is queued on the
+        AudioService playback queue and the tool returns immediately, so the
+        model's answer does not wait for the speech to finish.
         """
         if not text:
             return "No text provided to read aloud."
         
         try:
-            # Use unified TTS settings (tts_voice_provider)
-            provider = self.settings.get('TTS_VOICE_PROVIDER', 'openai') or 'openai'
-            
-            # Check if this is a custom TTS model
-            custom_models = getattr(self, 'custom_models', {}) or {}
-            is_custom_tts = provider in custom_models and (custom_models[provider].get('api_type') or '').lower() == 'tts'
-            
-            # Check if this is an audio-modality model (gpt-audio, gpt-4o-audio-preview, etc.)
-            from model_cards import get_card
-            card = get_card(provider)
-            is_audio_modality_model = card and card.quirks.get('requires_audio_modality')
-            
-            if provider == 'openai':
-                success = self._synthesize_and_play_tts(
-                    text,
-                    chat_id=self.current_chat_id,
-                    stop_event=None
-                )
-            elif provider == 'gemini':
-                success = self._synthesize_and_play_gemini_tts(
-                    text,
-                    chat_id=self.current_chat_id,
-                    stop_event=None
-                )
-            elif is_audio_modality_model:
-                success = self._synthesize_and_play_audio_preview(
-                    text,
-                    chat_id=self.current_chat_id,
-                    model_id=provider,
-                    stop_event=None
-                )
-            elif is_custom_tts:
-                success = self._synthesize_and_play_custom_tts(
-                    text,
-                    chat_id=self.current_chat_id,
-                    model_id=provider,
-                    stop_event=None
-                )
-            else:
-                return f"Unknown TTS provider: {provider}"
+            request, error = self._resolve_tts_request()
+            if request is None:
+                return error or "Failed to read text aloud."
             
-            if success:
-                return "Text was read aloud successfully."
-            else:
-                return "Failed to read text aloud."
+            provider_type, provider, tts_kwargs = request
+            item_id = self.controller.audio_service.enqueue_speech(
+                text,
+                provider_type,
+                provider,
+                chat_id=self.current_chat_id,
+                tag='read_aloud_tool',
+                **tts_kwargs,
+            )
+            if item_id is None:
+                return "No text provided to read aloud."
+            return "Text was queued and is being read aloud."
         except Exception as e:
             return f"Error reading aloud: {e}"
 
@@ -2572,14 +2555,14 @@ class OpenAIGTKClient(Gtk.Window):
                 is_image = mime_type.startswith("image/")
                 
                 if is_image:
-                    # Handle images: base64 encode and store in images list
+                    # Handle images: store in the shared blob store and
+                    # reference them by digest
                     with open(self.attached_file_path, "rb") as f:
-                        file_data = f.read()
-                        encoded = base64.b64encode(file_data).decode('utf-8')
-                        images.append({
-                            "data": encoded,
-                            "mime_type": mime_type
-                        })
+                        digest = get_blob_store().put(f.read())
+                    images.append({
+                        "blob": digest,
+                        "mime_type": mime_type
+                    })
                 else:
                     # Handle documents (PDF, text, etc.)
                     # Validate file size (max 512 MB per OpenAI docs)
@@ -4054,16 +4037,23 @@ class OpenAIGTKClient(Gtk.Window):
             self._clear_pending_edit_image()
             self._edit_buttons.clear()
             
-            # Rebuild conversation display with formatting
+            # Rebuild conversation display with formatting. The chat opens
+            # scrolled to the top, so only the first messages are rendered
+            # now; later ones get placeholders that the renderer fills in as
+            # they are scrolled into view.
+            displayed = []
             for idx, message in enumerate(history):
-                if message['role'] != 'system':  # Skip system message
-                    message_index = idx
+                if message['role'] == 'user':
                     # Use display_content if available, otherwise fall back to content
-                    content = message.get('display_content') or message['content']
-                    if message['role'] == 'user':
-                        self.append_message('user', content, message_index)
-                    elif message['role'] == 'assistant':
-                        self.append_message('ai', message['content'], message_index)
+                    displayed.append(('user', message.get('display_content') or message['content'], idx))
+                elif message['role'] == 'assistant':
+                    displayed.append(('ai', message['content'], idx))
+            render_window = max(1, int(self.settings.get('CHAT_RENDER_WINDOW', 20)))
+            self.message_renderer.update_chat_id(self.current_chat_id)
+            for sender, content, message_index in displayed[:render_window]:
+                self.append_message(sender, content, message_index)
+            for sender, content, message_index in displayed[render_window:]:
+                self.message_renderer.append_placeholder(sender, content, message_index)
             
             # Scroll to the beginning of the conversation
             def scroll_to_top():
@@ -4075,6 +4065,8 @@ class OpenAIGTKClient(Gtk.Window):
                 if widget:  # We found the ScrolledWindow
                     adj = widget.get_vadjustment()
                     adj.set_value(0)  # Scroll to the top
+                    # Render the placeholders now in view
+                    self.message_renderer.realize_visible_placeholders()
                 return False  # Don't repeat
             
             # Schedule scroll after the conversation is rebuilt (with delay for rendering)
@@ -4271,6 +4263,7 @@ class OpenAIGTKClient(Gtk.Window):
                 # Set the custom title via utils function
                 from utils import set_chat_title
                 chat_id = history_row.chat_id
+                self.controller.flush_pending_saves()
                 set_chat_title(chat_id, new_name)
                 # Refresh sidebar to show new title
                 self.refresh_history_list()
@@ -4573,15 +4566,8 @@ class OpenAIGTKClient(Gtk.Window):
                             audio_service.play_audio_auto(Path(initial_audio_path), stop_event)
                             return
                         
-                        # Check for cached TTS audio using the shared cache path helper
-                        cached_file = self._get_tts_cache_path(text_content, self.current_chat_id)
-                        if cached_file and cached_file.exists():
-                            # Play cached audio (may have been generated by auto read-aloud)
-                            audio_service = self.controller.audio_service
-                            audio_service.play_audio_auto(Path(cached_file), stop_event)
-                            return
-                        
-                        # No cached file, use TTS synthesis based on current provider
+                        # Synthesize with the current provider; sentence chunks
+                        # cached by an earlier playback or auto read-aloud are reused.
                         provider = self.settings.get('TTS_VOICE_PROVIDER', 'openai') or 'openai'
                         
                         # Check if this is a custom TTS model
@@ -4779,71 +4765,42 @@ class OpenAIGTKClient(Gtk.Window):
     # TTS Helpers – synthesize and play text via TTS or audio-preview
     # -----------------------------------------------------------------------
 
-    def _get_tts_cache_path(self, text: str, chat_id: str) -> Path:
-        """Get cache path - delegated to AudioService."""
-        provider = self.settings.get('TTS_VOICE_PROVIDER', 'openai') or 'openai'
-        voice = self.settings.get('TTS_VOICE', None) or 'alloy'
-        model = "tts-1-hd" if provider == 'openai' and self.settings.get('TTS_HD', False) else "tts-1"
-        return self.controller.audio_service._get_cache_path(
-            self.controller.audio_service._clean_tts_text(text),
-            chat_id, f"{provider}_{model}", voice
-        )
-
-    def _synthesize_and_play_tts(self, text: str, *, chat_id: str, stop_event: threading.Event = None) -> bool:
-        """Synthesize text using OpenAI TTS and play it."""
+    def _openai_tts_request(self):
+        """Build the (provider_type, provider, kwargs) request for OpenAI TTS."""
         provider = self.controller.get_provider('openai')
         if not provider:
             print("TTS: OpenAI provider not available")
-            return False
-        
-        result = self.controller.audio_service.synthesize_and_play(
-            text=text,
-            provider_type='openai',
-            provider=provider,
-            stop_event=stop_event,
-            chat_id=chat_id,
-            voice=self.settings.get('TTS_VOICE', 'alloy'),
-            model='tts-1-hd' if self.settings.get('TTS_HD', False) else 'tts-1',
-        )
-        return result
+            return None
+        return 'openai', provider, {
+            'voice': self.settings.get('TTS_VOICE', 'alloy'),
+            'model': 'tts-1-hd' if self.settings.get('TTS_HD', False) else 'tts-1',
+        }
 
-    def _synthesize_and_play_audio_preview(self, text: str, *, chat_id: str, model_id: str, stop_event: threading.Event = None) -> bool:
-        """Synthesize text using audio-preview models."""
+    def _audio_preview_tts_request(self, model_id: str):
+        """Build the (provider_type, provider, kwargs) request for audio-preview models."""
         provider = self.controller.get_provider('openai')
         if not provider:
             print("TTS: OpenAI provider not available for audio-preview")
-            return False
-        
-        return self.controller.audio_service.synthesize_and_play(
-            text=text,
-            provider_type='audio_preview',
-            provider=provider,
-            stop_event=stop_event,
-            chat_id=chat_id,
-            model_id=model_id,
-            voice=self.settings.get('TTS_VOICE', 'alloy'),
-            prompt_template=self.settings.get('TTS_PROMPT_TEMPLATE', '') or 'Please say the following verbatim: "{text}"',
-        )
+            return None
+        return 'audio_preview', provider, {
+            'model_id': model_id,
+            'voice': self.settings.get('TTS_VOICE', 'alloy'),
+            'prompt_template': self.settings.get('TTS_PROMPT_TEMPLATE', '') or 'Please say the following verbatim: "{text}"',
+        }
 
-    def _synthesize_and_play_gemini_tts(self, text: str, *, chat_id: str, stop_event: threading.Event = None) -> bool:
-        """Synthesize text using Gemini TTS."""
+    def _gemini_tts_request(self):
+        """Build the (provider_type, provider, kwargs) request for Gemini TTS."""
         provider = self.controller.get_provider('gemini')
         if not provider:
             print("TTS: Gemini provider not available")
-            return False
-        
-        return self.controller.audio_service.synthesize_and_play(
-            text=text,
-            provider_type='gemini',
-            provider=provider,
-            stop_event=stop_event,
-            chat_id=chat_id,
-            voice=self.settings.get('TTS_VOICE', 'Kore'),
-            prompt_template=self.settings.get('TTS_PROMPT_TEMPLATE', ''),
-        )
+            return None
+        return 'gemini', provider, {
+            'voice': self.settings.get('TTS_VOICE', 'Kore'),
+            'prompt_template': self.settings.get('TTS_PROMPT_TEMPLATE', ''),
+        }
 
-    def _synthesize_and_play_custom_tts(self, text: str, *, chat_id: str, model_id: str, stop_event: threading.Event = None) -> bool:
-        """Synthesize text using custom TTS provider."""
+    def _custom_tts_request(self, model_id: str):
+        """Build the (provider_type, provider, kwargs) request for a custom TTS model."""
         from ai_providers import CustomProvider
         from utils import resolve_api_key
         
@@ -4851,7 +4808,7 @@ class OpenAIGTKClient(Gtk.Window):
         cfg = custom_models.get(model_id)
         if not cfg:
             print(f"TTS: Custom model '{model_id}' not found")
-            return False
+            return None
         
         # Determine voice
         selected_voice = self.settings.get('TTS_VOICE', None) or ''
@@ -4873,15 +4830,74 @@ class OpenAIGTKClient(Gtk.Window):
             api_type='tts',
             voice=voice or None,
         )
+        return 'custom', provider, {'voice': voice, 'model_id': model_id}
+
+    def _resolve_tts_request(self):
+        """
+        Pick the TTS backend from the unified TTS settings (tts_voice_provider).
         
+        Returns
+        -------
+        tuple
+            ``((provider_type, provider, kwargs), None)`` on success, or
+            ``(None, error_message)`` if no backend is available.
+        """
+        provider = self.settings.get('TTS_VOICE_PROVIDER', 'openai') or 'openai'
+        
+        # Check if this is a custom TTS model
+        custom_models = getattr(self, 'custom_models', {}) or {}
+        is_custom_tts = provider in custom_models and (custom_models[provider].get('api_type') or '').lower() == 'tts'
+        
+        # Check if this is an audio-modality model (gpt-audio, gpt-4o-audio-preview, etc.)
+        card = get_card(provider)
+        is_audio_modality_model = card and card.quirks.get('requires_audio_modality')
+        
+        if provider == 'openai':
+            request = self._openai_tts_request()
+        elif provider == 'gemini':
+            request = self._gemini_tts_request()
+        elif is_audio_modality_model:
+            request = self._audio_preview_tts_request(provider)
+        elif is_custom_tts:
+            request = self._custom_tts_request(provider)
+        else:
+            return None, f"Unknown TTS provider: {provider}"
+        if request is None:
+            return None, f"TTS provider '{provider}' is not available."
+        return request, None
+
+    def _play_tts_request(self, request, text: str, *, chat_id: str, stop_event: threading.Event = None) -> bool:
+        """Synthesize and play text with a request from one of the *_tts_request builders."""
+        if request is None:
+            return False
+        provider_type, provider, tts_kwargs = request
         return self.controller.audio_service.synthesize_and_play(
             text=text,
-            provider_type='custom',
+            provider_type=provider_type,
             provider=provider,
             stop_event=stop_event,
             chat_id=chat_id,
-            voice=voice,
-            model_id=model_id,
+            **tts_kwargs,
+        )
+
+    def _synthesize_and_play_tts(self, text: str, *, chat_id: str, stop_event: threading.Event = None) -> bool:
+        """Synthesize text using OpenAI TTS and play it."""
+        return self._play_tts_request(self._openai_tts_request(), text, chat_id=chat_id, stop_event=stop_event)
+
+    def _synthesize_and_play_audio_preview(self, text: str, *, chat_id: str, model_id: str, stop_event: threading.Event = None) -> bool:
+        """Synthesize text using audio-preview models."""
+        return self._play_tts_request(
+            self._audio_preview_tts_request(model_id), text, chat_id=chat_id, stop_event=stop_event
+        )
+
+    def _synthesize_and_play_gemini_tts(self, text: str, *, chat_id: str, stop_event: threading.Event = None) -> bool:
+        """Synthesize text using Gemini TTS."""
+        return self._play_tts_request(self._gemini_tts_request(), text, chat_id=chat_id, stop_event=stop_event)
+
+    def _synthesize_and_play_custom_tts(self, text: str, *, chat_id: str, model_id: str, stop_event: threading.Event = None) -> bool:
+        """Synthesize text using custom TTS provider."""
+        return self._play_tts_request(
+            self._custom_tts_request(model_id), text, chat_id=chat_id, stop_event=stop_event
         )
 
     def read_aloud_text(self, text: str, *, chat_id: str = None):
@@ -4889,10 +4905,10 @@ class OpenAIGTKClient(Gtk.Window):
         Read the given text aloud using the unified TTS settings.
         
         This is the main entry point for the Read Aloud feature. It checks
-        if read aloud is enabled and dispatches to the appropriate synthesis
-        method based on the configured TTS provider (tts_voice_provider).
-        
-        Runs in a background thread to avoid blocking the UI.
+        if read aloud is enabled and queues the text on the AudioService
+        playback queue with the configured TTS provider (tts_voice_provider).
+        Speech queued by the read_aloud tool for the same answer plays first;
+        a previous answer that is still being read is cancelled.
         """
         # Check if read aloud is enabled
         if not self.settings.get('READ_ALOUD_ENABLED', False):
@@ -4902,66 +4918,29 @@ class OpenAIGTKClient(Gtk.Window):
         if chat_id is None:
             chat_id = self.current_chat_id
         
-        # Stop any existing read-aloud playback
-        self.stop_read_aloud()
-        
-        # Create a stop event for this playback
-        self.read_aloud_stop_event = threading.Event()
+        audio_service = self.controller.audio_service
+        audio_service.cancel_playback(tag='read_aloud')
         
-        def read_aloud_thread():
-            # Use unified TTS settings (tts_voice_provider)
-            provider = self.settings.get('TTS_VOICE_PROVIDER', 'openai') or 'openai'
-            
-            # Check if this is a custom TTS model
-            custom_models = getattr(self, 'custom_models', {}) or {}
-            is_custom_tts = provider in custom_models and (custom_models[provider].get('api_type') or '').lower() == 'tts'
-            
-            # Check if this is an audio-modality model
-            from model_cards import get_card
-            card = get_card(provider)
-            is_audio_modality_model = card and card.quirks.get('requires_audio_modality')
-            
-            try:
-                if provider == 'openai':
-                    self._synthesize_and_play_tts(
-                        text,
-                        chat_id=chat_id,
-                        stop_event=self.read_aloud_stop_event
-                    )
-                elif provider == 'gemini':
-                    self._synthesize_and_play_gemini_tts(
-                        text,
-                        chat_id=chat_id,
-                        stop_event=self.read_aloud_stop_event
-                    )
-                elif is_audio_modality_model:
-                    self._synthesize_and_play_audio_preview(
-                        text,
-                        chat_id=chat_id,
-                        model_id=provider,
-                        stop_event=self.read_aloud_stop_event
-                    )
-                elif is_custom_tts:
-                    self._synthesize_and_play_custom_tts(
-                        text,
-                        chat_id=chat_id,
-                        model_id=provider,
-                        stop_event=self.read_aloud_stop_event
-                    )
-                else:
-                    print(f"Read Aloud: Unknown TTS provider '{provider}'")
-            except Exception as e:
-                print(f"Read Aloud error: {e}")
-            finally:
-                self.read_aloud_stop_event = None
-        
-        threading.Thread(target=read_aloud_thread, daemon=True).start()
+        try:
+            request, error = self._resolve_tts_request()
+            if request is None:
+                print(f"Read Aloud: {error}")
+                return
+            provider_type, provider, tts_kwargs = request
+            audio_service.enqueue_speech(
+                text,
+                provider_type,
+                provider,
+                chat_id=chat_id,
+                tag='read_aloud',
+                **tts_kwargs,
+            )
+        except Exception as e:
+            print(f"Read Aloud error: {e}")
 
     def stop_read_aloud(self):
-        """Stop any ongoing read-aloud playback."""
-        # Signal the read-aloud thread to stop
-        if hasattr(self, 'read_aloud_stop_event') and self.read_aloud_stop_event:
-            self.read_aloud_stop_event.set()
+        """Stop any ongoing read-aloud playback and drop queued speech."""
+        self.controller.audio_service.cancel_playback()
         
         # Terminate any playing audio process
         if hasattr(self, 'current_read_aloud_process') and self.current_read_aloud_process:
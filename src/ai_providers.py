@@ -10,9 +10,11 @@ import re
 # Note: GLib dependency removed - callback scheduler is now injected
 import threading
 import base64
+import hashlib
 import io
 import tempfile
 import subprocess
+from typing import Optional
 
 from tools import (
     build_tools_for_provider,
@@ -21,11 +23,12 @@ from tools import (
     ToolContext,
     should_hide_tool_result,
     strip_hide_prefix,
-    run_tool_call,
+    run_tool_calls,
     parse_tool_arguments,
 )
 from config import HISTORY_DIR
 from model_cards import get_card
+from http_transport import get_http_transport
 
 
 # Heavy/optional native deps (NumPy/PortAudio) are imported lazily to keep startup fast,
@@ -62,13 +65,391 @@ def get_current_history_dir():
 
 
 def _get_image_data(img: dict) -> str:
-    """Get base64 image data from an image dict, loading from path if needed."""
-    if "data" in img:
-        return img["data"]
-    if "path" in img:
-        with open(img["path"], "rb") as f:
-            return base64.b64encode(f.read()).decode("utf-8")
-    return ""
+    """Get base64 image data from an image dict, loading from a blob or path if needed."""
+    from repositories.blob_store import image_base64
+    return image_base64(img)
+
+
+def _get_image_data_url(img: dict) -> str:
+    """Get an image dict as a base64 ``data:`` URL (encodings are cached)."""
+    from repositories.blob_store import image_data_url
+    return image_data_url(img)
+
+
+_image_path_lock = threading.Lock()
+
+
+def _unique_image_path(images_dir: Path, stem: str, suffix: str = ".png") -> Path:
+    """
+    Reserve a new file path for a generated image.
+    
+    Filenames use a per-second timestamp, so image tool calls running
+    concurrently can produce the same name; a counter is appended in that case.
+    """
+    with _image_path_lock:
+        path = images_dir / f"{stem}{suffix}"
+        counter = 1
+        while path.exists():
+            path = images_dir / f"{stem}_{counter}{suffix}"
+            counter += 1
+        path.touch()
+        return path
+
+
+# -----------------------------------------------------------------------
+# Streaming helpers
+# -----------------------------------------------------------------------
+# Providers accept an optional ``stream_callback(delta: str)``. When given, the
+# request is made with streaming enabled and text deltas are forwarded as they
+# arrive; the helpers below then rebuild the same response shape a non-streaming
+# call returns, so all downstream parsing (and the final persisted answer) is
+# unchanged.
+
+def _emit_stream_delta(stream_callback, delta) -> None:
+    """Forward a text delta to the stream callback, if any."""
+    if stream_callback and delta:
+        stream_callback(delta)
+
+
+def _create_responses(client, params: dict, stream_callback=None):
+    """
+    Call ``client.responses.create`` and return the final Response object.
+
+    When ``stream_callback`` is set, the call is streamed and
+    ``response.output_text.delta`` events are forwarded to the callback.
+    """
+    if not stream_callback:
+        return client.responses.create(**params)
+
+    final_response = None
+    for event in client.responses.create(**params, stream=True):
+        event_type = getattr(event, "type", "")
+        if event_type == "response.output_text.delta":
+            _emit_stream_delta(stream_callback, getattr(event, "delta", ""))
+        elif event_type in ("response.completed", "response.incomplete"):
+            final_response = event.response
+        elif event_type == "response.failed":
+            error = getattr(event.response, "error", None)
+            raise RuntimeError(getattr(error, "message", None) or "Response failed")
+        elif event_type == "error":
+            raise RuntimeError(getattr(event, "message", None) or "Response stream error")
+    if final_response is None:
+        raise RuntimeError("Response stream ended without a completed response.")
+    return final_response
+
+
+# -----------------------------------------------------------------------
+# Server-side conversation state (Responses API previous_response_id)
+# -----------------------------------------------------------------------
+# When the caller passes ``previous_response_id`` the server already holds the
+# conversation up to that response, so only the turns after the last assistant
+# reply are sent. If the server no longer knows the id (expired or deleted
+# response) the request is repeated once with the full history.
+
+def _messages_since_last_reply(messages) -> list:
+    """Return system messages plus every message after the last assistant reply."""
+    last_reply = -1
+    for i, msg in enumerate(messages):
+        if msg.get("role") == "assistant":
+            last_reply = i
+    return [
+        msg for i, msg in enumerate(messages)
+        if i > last_reply or msg.get("role") == "system"
+    ]
+
+
+def _is_unknown_previous_response(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    return status == 404 or (status == 400 and "previous_response" in str(exc))
+
+
+def _create_chained_responses(client, params: dict, full_input, stream_callback=None):
+    """
+    Call :func:`_create_responses`, falling back to the full history when
+    ``params['previous_response_id']`` is rejected.
+
+    Parameters
+    ----------
+    full_input : list or None
+        Complete input items to resend on fallback; None disables the
+        fallback (e.g. in later tool rounds).
+
+    Returns
+    -------
+    tuple
+        ``(response, params)`` where ``params`` are the parameters of the
+        request that succeeded.
+    """
+    try:
+        return _create_responses(client, params, stream_callback), params
+    except Exception as exc:
+        if full_input is None or "previous_response_id" not in params or not _is_unknown_previous_response(exc):
+            raise
+        print(f"[Responses] previous_response_id rejected ({exc}); resending full history")
+        params = {k: v for k, v in params.items() if k != "previous_response_id"}
+        params["input"] = full_input
+        return _create_responses(client, params, stream_callback), params
+
+
+def _record_response_id(response_meta, namespace: str, response, model: str) -> None:
+    """Store a response id in ``response_meta[namespace]`` for later chaining."""
+    response_id = getattr(response, "id", None)
+    if response_meta is not None and response_id:
+        response_meta.setdefault(namespace, {}).update(
+            {"response_id": response_id, "model": model}
+        )
+
+
+# -----------------------------------------------------------------------
+# Uploaded files in Responses API input
+# -----------------------------------------------------------------------
+# Uploaded PDFs are referenced by ``input_file`` parts. If OpenAI has deleted
+# a file, the request is retried once with the file uploaded again.
+
+def _input_file_ids(input_items) -> list:
+    """Return the ``input_file`` ids referenced by Responses API input items."""
+    file_ids = []
+    for item in input_items or []:
+        content = item.get("content") if isinstance(item, dict) else None
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "input_file" and part.get("file_id"):
+                if part["file_id"] not in file_ids:
+                    file_ids.append(part["file_id"])
+    return file_ids
+
+
+def _replace_file_ids(input_items, replacements: dict):
+    """Return input items with ``input_file`` ids swapped per ``replacements``."""
+    result = []
+    for item in input_items or []:
+        content = item.get("content") if isinstance(item, dict) else None
+        if isinstance(content, list) and any(
+            isinstance(part, dict) and part.get("file_id") in replacements for part in content
+        ):
+            item = {**item, "content": [
+                {**part, "file_id": replacements[part["file_id"]]}
+                if isinstance(part, dict) and part.get("file_id") in replacements else part
+                for part in content
+            ]}
+        result.append(item)
+    return result
+
+
+# -----------------------------------------------------------------------
+# Prompt caching
+# -----------------------------------------------------------------------
+# Providers cache the longest previously seen prefix of a request. The
+# controller keeps that prefix stable (system prompt, tool guidance and
+# compaction summary first; retrieved memories go with the newest user
+# message), and the helpers below add OpenAI's cache key and record how many
+# input tokens were served from the cache. Claude goes through Anthropic's
+# OpenAI-compatible endpoint, which does not support prompt caching, so its
+# requests carry no cache hints; only the usage it reports is recorded.
+
+def _prompt_cache_key(chat_id) -> Optional[str]:
+    """Return an opaque OpenAI ``prompt_cache_key`` for a chat, or None."""
+    if not chat_id:
+        return None
+    return "chatgtk-" + hashlib.sha256(str(chat_id).encode("utf-8")).hexdigest()[:24]
+
+
+def _usage_field(obj, name):
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _record_cache_usage(response_meta, namespace: str, response, log_prefix: str) -> None:
+    """
+    Add a response's input and cached-token counts to
+    ``response_meta[namespace]["usage"]`` (summed over tool rounds) and log them.
+    """
+    usage = _usage_field(response, "usage")
+    if usage is None:
+        return
+    input_tokens = _usage_field(usage, "input_tokens") or _usage_field(usage, "prompt_tokens") or 0
+    details = _usage_field(usage, "input_tokens_details") or _usage_field(usage, "prompt_tokens_details")
+    cached_tokens = _usage_field(details, "cached_tokens")
+    if cached_tokens is None:
+        cached_tokens = _usage_field(usage, "cache_read_input_tokens")
+    cached_tokens = cached_tokens or 0
+    print(f"[{log_prefix}] Prompt cache: {cached_tokens}/{input_tokens} input tokens cached")
+    if response_meta is None:
+        return
+    totals = response_meta.setdefault(namespace, {}).setdefault(
+        "usage", {"input_tokens": 0, "cached_tokens": 0}
+    )
+    totals["input_tokens"] += int(input_tokens)
+    totals["cached_tokens"] += int(cached_tokens)
+
+
+def _create_chat_completion(client, params: dict, stream_callback=None):
+    """
+    Call ``client.chat.completions.create`` and return a completion-shaped object.
+
+    When ``stream_callback`` is set, the call is streamed; content deltas are
+    forwarded and tool call fragments are merged so callers can keep reading
+    ``response.choices[0].message.content`` / ``.tool_calls`` as usual.
+    """
+    if not stream_callback:
+        return client.chat.completions.create(**params)
+
+    from types import SimpleNamespace
+
+    content_parts = []
+    tool_calls = {}
+    finish_reason = None
+    usage = None
+    search_results = None
+
+    for chunk in client.chat.completions.create(**params, stream=True):
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+        if getattr(chunk, "search_results", None):
+            search_results = chunk.search_results
+        for choice in getattr(chunk, "choices", None) or []:
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+            delta = choice.delta
+            if delta is None:
+                continue
+            if delta.content:
+                content_parts.append(delta.content)
+                _emit_stream_delta(stream_callback, delta.content)
+            for tc in delta.tool_calls or []:
+                key = tc.index if tc.index is not None else len(tool_calls)
+                entry = tool_calls.setdefault(key, {"id": "", "type": "function", "name": "", "arguments": ""})
+                if tc.id:
+                    entry["id"] = tc.id
+                if tc.type:
+                    entry["type"] = tc.type
+                if tc.function:
+                    if tc.function.name and not entry["name"]:
+                        entry["name"] = tc.function.name
+                    if tc.function.arguments:
+                        entry["arguments"] += tc.function.arguments
+
+    merged_tool_calls = [
+        SimpleNamespace(
+            id=entry["id"],
+            type=entry["type"],
+            function=SimpleNamespace(name=entry["name"], arguments=entry["arguments"]),
+        )
+        for _, entry in sorted(tool_calls.items())
+    ]
+    message = SimpleNamespace(
+        role="assistant",
+        content="".join(content_parts) or None,
+        tool_calls=merged_tool_calls or None,
+    )
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+        usage=usage,
+        search_results=search_results,
+    )
+
+
+def _iter_sse_json(resp):
+    """Yield decoded JSON payloads from a server-sent events response."""
+    for line in resp.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            yield json.loads(data)
+        except ValueError:
+            continue
+
+
+def _is_event_stream(resp) -> bool:
+    content_type = (resp.headers.get("Content-Type") or "").lower()
+    return "text/event-stream" in content_type
+
+
+def _read_chat_completion_json(resp, stream_callback=None) -> dict:
+    """
+    Return the JSON body of a /chat/completions HTTP response.
+
+    Streamed (SSE) responses are merged into the regular non-streaming shape.
+    Servers that ignore ``"stream": true`` and answer with plain JSON are
+    handled transparently.
+    """
+    if not stream_callback or not _is_event_stream(resp):
+        return resp.json()
+
+    content_parts = []
+    tool_calls = {}
+    finish_reason = None
+    usage = None
+
+    for chunk in _iter_sse_json(resp):
+        if chunk.get("usage"):
+            usage = chunk["usage"]
+        for choice in chunk.get("choices") or []:
+            if choice.get("finish_reason"):
+                finish_reason = choice["finish_reason"]
+            delta = choice.get("delta") or {}
+            text = delta.get("content")
+            if text:
+                content_parts.append(text)
+                _emit_stream_delta(stream_callback, text)
+            for tc in delta.get("tool_calls") or []:
+                index = tc.get("index")
+                key = index if index is not None else len(tool_calls)
+                entry = tool_calls.setdefault(
+                    key, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}}
+                )
+                if tc.get("id"):
+                    entry["id"] = tc["id"]
+                if tc.get("type"):
+                    entry["type"] = tc["type"]
+                function = tc.get("function") or {}
+                if function.get("name") and not entry["function"]["name"]:
+                    entry["function"]["name"] = function["name"]
+                if function.get("arguments"):
+                    entry["function"]["arguments"] += function["arguments"]
+
+    message = {"role": "assistant", "content": "".join(content_parts)}
+    if tool_calls:
+        message["tool_calls"] = [entry for _, entry in sorted(tool_calls.items())]
+    data = {"choices": [{"index": 0, "message": message, "finish_reason": finish_reason}]}
+    if usage:
+        data["usage"] = usage
+    return data
+
+
+def _read_responses_json(resp, stream_callback=None) -> dict:
+    """
+    Return the JSON body of a /responses HTTP response.
+
+    For streamed responses, text deltas are forwarded and the final
+    ``response.completed`` payload is returned.
+    """
+    if not stream_callback or not _is_event_stream(resp):
+        return resp.json()
+
+    final_response = None
+    for event in _iter_sse_json(resp):
+        event_type = event.get("type", "")
+        if event_type == "response.output_text.delta":
+            _emit_stream_delta(stream_callback, event.get("delta", ""))
+        elif event_type in ("response.completed", "response.incomplete"):
+            final_response = event.get("response")
+        elif event_type == "response.failed":
+            error = (event.get("response") or {}).get("error") or {}
+            raise RuntimeError(error.get("message") or "Response failed")
+        elif event_type == "error":
+            raise RuntimeError(event.get("message") or "Response stream error")
+    if final_response is None:
+        raise RuntimeError("Response stream ended without a completed response.")
+    return final_response
+
 
 class AIProvider(ABC):
     """Abstract base class for AI providers."""
@@ -115,7 +496,8 @@ class CustomProvider(AIProvider):
         self.model_id = None
         self.api_type = "chat.completions"
         self.voice = None
-        self.session = requests.Session()
+        # Shared pooled transport (keep-alive connections across providers)
+        self.session = get_http_transport()
 
     def initialize(self, api_key: str, endpoint: str = None, model_id: str = None, api_type: str = None, voice: str = None):
         self.api_key = api_key
@@ -321,6 +703,7 @@ class CustomProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
     ):
         api_type = (self.api_type or "chat.completions").lower()
         card = get_card(model)
@@ -342,6 +725,7 @@ class CustomProvider(AIProvider):
                 text_get_handler=text_get_handler,
                 text_edit_handler=text_edit_handler,
                 wolfram_handler=wolfram_handler,
+                stream_callback=stream_callback,
             )
         
         if api_type == "tts":
@@ -435,13 +819,17 @@ class CustomProvider(AIProvider):
                 payload["max_tokens"] = int(max_tokens)
             if reasoning_effort:
                 payload["reasoning_effort"] = reasoning_effort
+            if stream_callback:
+                payload["stream"] = True
             
             self._debug("Chat URL", url)
             self._debug("Chat Payload", payload)
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=60)
+            resp = self.session.post(
+                url, headers=self._headers(), json=payload, timeout=60, stream=bool(stream_callback)
+            )
             self._debug("Chat Response Status", resp.status_code)
             resp.raise_for_status()
-            data = resp.json()
+            data = _read_chat_completion_json(resp, stream_callback)
             self._debug("Chat Response Data", data)
             return self._extract_text(data, chat_id=chat_id)
         
@@ -466,10 +854,14 @@ class CustomProvider(AIProvider):
             if tools:
                 payload["tools"] = tools
                 payload["tool_choice"] = "auto"
+            if stream_callback:
+                payload["stream"] = True
             
-            resp = self.session.post(url, headers=self._headers(), json=payload, timeout=60)
+            resp = self.session.post(
+                url, headers=self._headers(), json=payload, timeout=60, stream=bool(stream_callback)
+            )
             resp.raise_for_status()
-            data = resp.json()
+            data = _read_chat_completion_json(resp, stream_callback)
             last_response_data = data
             
             # Extract the assistant message and check for tool calls
@@ -501,6 +893,17 @@ class CustomProvider(AIProvider):
                 wolfram_handler=wolfram_handler,
             )
             
+            function_results = iter(run_tool_calls(
+                [
+                    (
+                        tc.get("function", {}).get("name", ""),
+                        parse_tool_arguments(tc.get("function", {}).get("arguments", "{}")),
+                    )
+                    for tc in tool_calls
+                    if isinstance(tc, dict) and tc.get("type", "") == "function"
+                ],
+                tool_context,
+            ))
             for tc in tool_calls:
                 if not isinstance(tc, dict):
                     continue
@@ -510,11 +913,8 @@ class CustomProvider(AIProvider):
                 if tc_type != "function":
                     tool_result_content = "Error: unknown tool type requested."
                 else:
-                    function = tc.get("function", {})
-                    tool_name = function.get("name", "")
-                    raw_args = function.get("arguments", "{}")
-                    parsed_args = parse_tool_arguments(raw_args)
-                    tool_result_content = run_tool_call(tool_name, parsed_args, tool_context)
+                    tool_name = tc.get("function", {}).get("name", "")
+                    tool_result_content = next(function_results)
                 
                 if tool_result_content and not should_hide_tool_result(tool_result_content):
                     tool_result_snippets.append(strip_hide_prefix(tool_result_content))
@@ -580,7 +980,7 @@ class CustomProvider(AIProvider):
         # Handle HTTP URL
         elif image_url and isinstance(image_url, str) and image_url.startswith("http"):
             try:
-                download_response = requests.get(image_url, timeout=30)
+                download_response = get_http_transport().get(image_url, timeout=30)
                 download_response.raise_for_status()
                 final_image_bytes = download_response.content
             except Exception as e:
@@ -607,7 +1007,7 @@ class CustomProvider(AIProvider):
             
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             safe_model = "".join(c if c.isalnum() else "_" for c in (self.model_id or "custom"))
-            image_path = images_dir / f"{safe_model}_{timestamp}.png"
+            image_path = _unique_image_path(images_dir, f"{safe_model}_{timestamp}")
             
             image_path.write_bytes(final_image_bytes)
             
@@ -868,6 +1268,7 @@ class CustomProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
     ):
         # Use base endpoint to avoid appending /responses to an endpoint that already has /chat/completions
         base = self._get_base_endpoint()
@@ -914,12 +1315,17 @@ class CustomProvider(AIProvider):
             effort_level = card.quirks.get("reasoning_effort_level", "low")
             params["reasoning"] = {"effort": effort_level}
         
+        if stream_callback:
+            params["stream"] = True
+        
         # If no function tools are enabled, we can do a simple one-shot call
         if not enabled_tools:
             try:
-                resp = self.session.post(url, headers=self._headers(), json=params, timeout=60)
+                resp = self.session.post(
+                    url, headers=self._headers(), json=params, timeout=60, stream=bool(stream_callback)
+                )
                 resp.raise_for_status()
-                data = resp.json()
+                data = _read_responses_json(resp, stream_callback)
                 result = self._extract_text(data, chat_id=chat_id)
                 # Debug: log response structure if extraction failed
                 if not result:
@@ -955,9 +1361,11 @@ class CustomProvider(AIProvider):
             payload = {**params, "input": current_input}
             
             try:
-                resp = self.session.post(url, headers=self._headers(), json=payload, timeout=60)
+                resp = self.session.post(
+                    url, headers=self._headers(), json=payload, timeout=60, stream=bool(stream_callback)
+                )
                 resp.raise_for_status()
-                data = resp.json()
+                data = _read_responses_json(resp, stream_callback)
             except requests.exceptions.HTTPError as e:
                 error_detail = ""
                 try:
@@ -979,11 +1387,12 @@ class CustomProvider(AIProvider):
                     return text_content + "\n\n" + "\n\n".join(tool_result_snippets)
                 return text_content
             
-            # Process each function call
-            for fc in function_calls:
-                parsed_args = parse_tool_arguments(fc["arguments"])
-                tool_result = run_tool_call(fc["name"], parsed_args, tool_context)
-                
+            # Run this round's function calls (independent ones concurrently)
+            tool_results = run_tool_calls(
+                [(fc["name"], parse_tool_arguments(fc["arguments"])) for fc in function_calls],
+                tool_context,
+            )
+            for fc, tool_result in zip(function_calls, tool_results):
                 # Add to snippets for UI display only if not hidden
                 if tool_result and not should_hide_tool_result(tool_result):
                     tool_result_snippets.append(strip_hide_prefix(tool_result))
@@ -1100,7 +1509,7 @@ class CustomProvider(AIProvider):
         
         if image_url:
             try:
-                download_response = requests.get(image_url, timeout=30)
+                download_response = get_http_transport().get(image_url, timeout=30)
                 download_response.raise_for_status()
                 final_image_bytes = download_response.content
             except Exception as e:
@@ -1121,7 +1530,7 @@ class CustomProvider(AIProvider):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             # Sanitize model name for filename
             safe_model = "".join(c if c.isalnum() else "_" for c in (self.model_id or model))
-            image_path = images_dir / f"{safe_model}_{timestamp}.png"
+            image_path = _unique_image_path(images_dir, f"{safe_model}_{timestamp}")
             
             image_path.write_bytes(final_image_bytes)
             
@@ -1257,34 +1666,70 @@ class OpenAIProvider(AIProvider):
     def __init__(self):
         self.client = None
         self._current_api_key = None
-        # Cache for uploaded file IDs: key = (path, size, mtime) -> file_id
-        self._file_id_cache = {}
+        # Persistent cache of uploaded file IDs (see FileIdCacheRepository),
+        # created on first upload.
+        self._file_id_cache = None
+        # file_id -> (path, mime_type) of files used this session, so a file
+        # deleted on OpenAI's side can be uploaded again.
+        self._file_sources = {}
     
     def initialize(self, api_key: str):
-        # Only clear file cache when API key actually changes (different account)
-        if api_key != self._current_api_key:
-            self._file_id_cache = {}
-            self._current_api_key = api_key
+        # File ids are cached per API-key fingerprint, so switching accounts
+        # needs no cache reset.
+        self._current_api_key = api_key
         OpenAI = _lazy_openai_OpenAI()
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, **get_http_transport().openai_client_kwargs())
     
-    def _get_file_cache_key(self, file_path: str) -> tuple:
-        """Generate a cache key for a file based on path, size, and modification time."""
+    def _get_file_id_cache(self):
+        if self._file_id_cache is None:
+            from repositories.file_id_cache_repository import FileIdCacheRepository
+            self._file_id_cache = FileIdCacheRepository()
+        return self._file_id_cache
+    
+    def _remote_file_exists(self, file_id: str) -> bool:
+        """Return False only if OpenAI reports the file as deleted."""
         try:
-            stat = os.stat(file_path)
-            return (file_path, stat.st_size, stat.st_mtime)
-        except OSError:
-            return None
+            self.client.files.retrieve(file_id)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 404:
+                return False
+            # Network trouble etc.: keep using the id rather than re-uploading.
+            print(f"[OpenAIProvider] Could not verify file_id {file_id}: {e}")
+        return True
     
     def _upload_file(self, file_path: str, mime_type: str) -> str:
         """
         Upload a file to OpenAI and return the file_id.
-        Uses caching to avoid re-uploading unchanged files.
+        
+        File ids are cached on disk by content hash and API-key fingerprint,
+        so an unchanged (or moved) file is uploaded once across sessions and
+        chats. Cached ids are re-checked with the API once they are older
+        than ``FileIdCacheRepository.VERIFY_AFTER_SECONDS``.
         """
-        cache_key = self._get_file_cache_key(file_path)
-        if cache_key and cache_key in self._file_id_cache:
-            print(f"[OpenAIProvider] Using cached file_id for {file_path}")
-            return self._file_id_cache[cache_key]
+        from repositories.file_id_cache_repository import api_key_fingerprint
+        
+        cache = self._get_file_id_cache()
+        account = api_key_fingerprint(self._current_api_key)
+        try:
+            content_hash = cache.content_hash(file_path)
+        except OSError:
+            content_hash = None
+        
+        if content_hash:
+            entry = cache.get(account, content_hash)
+            if entry:
+                file_id = entry["file_id"]
+                if not cache.needs_verification(entry):
+                    print(f"[OpenAIProvider] Using cached file_id for {file_path}")
+                    self._file_sources[file_id] = (file_path, mime_type)
+                    return file_id
+                if self._remote_file_exists(file_id):
+                    cache.put(account, content_hash, file_id, entry.get("expires_at"))
+                    print(f"[OpenAIProvider] Using cached file_id for {file_path}")
+                    self._file_sources[file_id] = (file_path, mime_type)
+                    return file_id
+                print(f"[OpenAIProvider] Cached file_id {file_id} no longer exists; re-uploading")
+                cache.invalidate(file_id)
         
         # Check file size
         file_size = os.path.getsize(file_path)
@@ -1313,11 +1758,55 @@ class OpenAIProvider(AIProvider):
         print(f"[OpenAIProvider] File uploaded successfully: {file_id}")
         
         # Cache the file_id
-        if cache_key:
-            self._file_id_cache[cache_key] = file_id
+        if content_hash:
+            cache.put(account, content_hash, file_id, getattr(response, "expires_at", None))
+        self._file_sources[file_id] = (file_path, mime_type)
         
         return file_id
     
+    def _reupload_missing_files(self, exc: Exception, input_items) -> dict:
+        """
+        Re-upload the files of a request rejected because they were deleted.
+        
+        Cached file ids are only re-checked once a day, so a file deleted
+        on OpenAI's side in between is first noticed by the request using
+        it. Returns ``{old_file_id: new_file_id}``; empty if ``exc`` is not
+        a missing-file error for one of the request's files.
+        """
+        status = getattr(exc, "status_code", None)
+        if status not in (400, 404):
+            return {}
+        message = str(exc)
+        file_ids = _input_file_ids(input_items)
+        missing = [fid for fid in file_ids if fid in message]
+        if not missing and status == 404 and "file" in message.lower():
+            missing = file_ids
+        replacements = {}
+        for file_id in missing:
+            source = self._file_sources.pop(file_id, None)
+            self._get_file_id_cache().invalidate(file_id)
+            if source is None:
+                continue
+            print(f"[OpenAIProvider] File {file_id} no longer exists; re-uploading {source[0]}")
+            replacements[file_id] = self._upload_file(*source)
+        return replacements
+    
+    def _create_responses_with_files(self, params: dict, full_input, stream_callback=None):
+        """
+        :func:`_create_chained_responses`, retried once with re-uploaded
+        files if OpenAI reports a referenced file as missing.
+        """
+        try:
+            return _create_chained_responses(self.client, params, full_input, stream_callback)
+        except Exception as exc:
+            replacements = self._reupload_missing_files(exc, list(params.get("input") or []) + list(full_input or []))
+            if not replacements:
+                raise
+        params = {**params, "input": _replace_file_ids(params.get("input"), replacements)}
+        if full_input is not None:
+            full_input = _replace_file_ids(full_input, replacements)
+        return _create_chained_responses(self.client, params, full_input, stream_callback)
+    
     def _has_attached_files(self, messages) -> bool:
         """Check if any message in the conversation has attached files."""
         for msg in messages:
@@ -1441,11 +1930,9 @@ class OpenAIProvider(AIProvider):
             
             # Add image attachments (convert to base64 data URL format)
             for img in images:
-                img_data = _get_image_data(img)
-                img_mime = img.get("mime_type", "image/jpeg")
                 content_parts.append({
                     "type": "input_image",
-                    "image_url": f"data:{img_mime};base64,{img_data}",
+                    "image_url": _get_image_data_url(img),
                 })
             
             if content_parts:
@@ -1575,7 +2062,7 @@ class OpenAIProvider(AIProvider):
                 return ""
         elif image_url and image_url.startswith("http"):
             try:
-                resp = requests.get(image_url, timeout=30)
+                resp = get_http_transport().get(image_url, timeout=30)
                 resp.raise_for_status()
                 final_image_bytes = resp.content
             except Exception as e:
@@ -1588,7 +2075,7 @@ class OpenAIProvider(AIProvider):
             images_dir = Path(get_current_history_dir()) / chat_id.replace('.json', '') / 'images'
             images_dir.mkdir(parents=True, exist_ok=True)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_path = images_dir / f"responses_{timestamp}.png"
+            image_path = _unique_image_path(images_dir, f"responses_{timestamp}")
             image_path.write_bytes(final_image_bytes)
             return f'<img src="{image_path}"/>'
         except Exception as e:
@@ -1628,6 +2115,9 @@ class OpenAIProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
+        response_meta=None,
+        previous_response_id=None,
     ) -> str:
         """
         Generate a response using the OpenAI Responses API.
@@ -1656,6 +2146,14 @@ class OpenAIProvider(AIProvider):
             Handler for control_music tool calls.
         read_aloud_tool_handler : callable
             Handler for read_aloud tool calls.
+        stream_callback : callable, optional
+            Called with each text delta when streaming is requested.
+        response_meta : dict, optional
+            Receives ``{"openai": {"response_id", "model", "usage"}}``; usage
+            holds input and cached-token counts summed over tool rounds.
+        previous_response_id : str, optional
+            Id of the stored response that ends with the last assistant
+            message in ``messages``; only the newer messages are sent.
             
         Returns
         -------
@@ -1679,6 +2177,12 @@ class OpenAIProvider(AIProvider):
         
         # Build input from messages
         input_items, instructions = self._build_responses_input(messages)
+        full_input = None
+        if previous_response_id:
+            # The server holds everything up to the last reply; keep the full
+            # input only as a fallback if it no longer knows the response.
+            full_input = input_items
+            input_items, _ = self._build_responses_input(_messages_since_last_reply(messages))
         
         # Determine which function tools are enabled
         enabled_tools = build_enabled_tools_from_handlers(
@@ -1716,6 +2220,17 @@ class OpenAIProvider(AIProvider):
         if reasoning_effort:
             params["reasoning"] = {"effort": reasoning_effort}
         
+        cache_key = _prompt_cache_key(chat_id)
+        if cache_key:
+            # Route this chat's requests to the same prompt cache.
+            params["prompt_cache_key"] = cache_key
+        
+        if previous_response_id:
+            params["previous_response_id"] = previous_response_id
+            # Stored conversations keep growing; let the server drop the
+            # oldest turns instead of failing on the context limit.
+            params["truncation"] = "auto"
+        
         tool_types = [t.get("type") for t in tools]
         tool_names = [
             t.get("name")
@@ -1729,7 +2244,9 @@ class OpenAIProvider(AIProvider):
         
         # If no function tools are enabled, we can do a simple one-shot call
         if not enabled_tools:
-            response = self.client.responses.create(**params)
+            response, _ = self._create_responses_with_files(params, full_input, stream_callback)
+            _record_response_id(response_meta, "openai", response, model)
+            _record_cache_usage(response_meta, "openai", response, "OpenAIProvider")
             text_content, _ = self._extract_responses_output(response)
             # Process any image data placeholders from native image_generation tool
             text_content = self._process_image_data_placeholders(text_content, chat_id)
@@ -1752,10 +2269,17 @@ class OpenAIProvider(AIProvider):
         current_input = input_items.copy()
         
         for round_num in range(max_tool_rounds):
-            response = self.client.responses.create(**{
-                **params,
-                "input": current_input,
-            })
+            response, sent = self._create_responses_with_files(
+                {**params, "input": current_input},
+                full_input if round_num == 0 else None,
+                stream_callback,
+            )
+            # Carry over a fallback to the full history or re-uploaded files.
+            current_input = list(sent["input"])
+            if "previous_response_id" not in sent:
+                params.pop("previous_response_id", None)
+            _record_response_id(response_meta, "openai", response, model)
+            _record_cache_usage(response_meta, "openai", response, "OpenAIProvider")
             
             text_content, function_calls = self._extract_responses_output(response)
             
@@ -1769,11 +2293,12 @@ class OpenAIProvider(AIProvider):
                     return text_content + "\n\n" + "\n\n".join(tool_result_snippets)
                 return text_content
             
-            # Process each function call
-            for fc in function_calls:
-                parsed_args = parse_tool_arguments(fc["arguments"])
-                tool_result = run_tool_call(fc["name"], parsed_args, tool_context)
-                
+            # Run this round's function calls (independent ones concurrently)
+            tool_results = run_tool_calls(
+                [(fc["name"], parse_tool_arguments(fc["arguments"])) for fc in function_calls],
+                tool_context,
+            )
+            for fc, tool_result in zip(function_calls, tool_results):
                 # Add to snippets for UI display only if not hidden
                 if tool_result and not should_hide_tool_result(tool_result):
                     tool_result_snippets.append(strip_hide_prefix(tool_result))
@@ -1801,51 +2326,54 @@ class OpenAIProvider(AIProvider):
         return final_text
     
     def get_available_models(self, disable_filter=False):
-        import re
         try:
-            models = self.client.models.list()
-            
-            # Check both parameter and environment variable
-            disable_filter = disable_filter or os.getenv('DISABLE_MODEL_FILTER', '').lower() in ('true', '1', 'yes')
-            #disable_filter = 1 
-            if disable_filter:
-                # Return all available models when filtering is disabled
-                return sorted([model.id for model in models])
-            
-            # Default filtering behavior
-            allowed_models = {
-                "gpt-3.5-turbo",
-                "gpt-4",
-                "dall-e-3",
-                "gpt-image-1",
-                "gpt-image-1-mini",
-                # Realtime (current)
-                "gpt-realtime",
-                "gpt-realtime-mini",
-                "gpt-realtime-2025-08-28",
-                "gpt-realtime-mini-2025-10-06",
-                "chatgpt-4o-latest",
-                "gpt-4-turbo",
-                "gpt-4.1",
-                "gpt-4o-mini",
-                "gpt-4o-audio-preview",
-                "gpt-4o-mini-audio-preview",
-                "gpt-4o",
-                "gpt-4",
-                "o1-mini",
-                "o1-preview",
-                "o3",
-                "o3-mini",
-                "gpt-5.1",
-                "gpt-5.1-chat-latest",
-                "gpt-5-pro",
-            }
-            filtered_models = [model.id for model in models if model.id in allowed_models]
-            return sorted(filtered_models)
+            return self.fetch_models(disable_filter=disable_filter)
         except Exception as e:
             print(f"Error fetching models: {e}")
             return sorted(["gpt-3.5-turbo", "gpt-4", "gpt-4-turbo-preview", "dall-e-3"])
 
+    def fetch_models(self, disable_filter=False):
+        """Fetch the model list from the API, raising on failure."""
+        models = self.client.models.list()
+        
+        # Check both parameter and environment variable
+        disable_filter = disable_filter or os.getenv('DISABLE_MODEL_FILTER', '').lower() in ('true', '1', 'yes')
+        #disable_filter = 1 
+        if disable_filter:
+            # Return all available models when filtering is disabled
+            return sorted([model.id for model in models])
+        
+        # Default filtering behavior
+        allowed_models = {
+            "gpt-3.5-turbo",
+            "gpt-4",
+            "dall-e-3",
+            "gpt-image-1",
+            "gpt-image-1-mini",
+            # Realtime (current)
+            "gpt-realtime",
+            "gpt-realtime-mini",
+            "gpt-realtime-2025-08-28",
+            "gpt-realtime-mini-2025-10-06",
+            "chatgpt-4o-latest",
+            "gpt-4-turbo",
+            "gpt-4.1",
+            "gpt-4o-mini",
+            "gpt-4o-audio-preview",
+            "gpt-4o-mini-audio-preview",
+            "gpt-4o",
+            "gpt-4",
+            "o1-mini",
+            "o1-preview",
+            "o3",
+            "o3-mini",
+            "gpt-5.1",
+            "gpt-5.1-chat-latest",
+            "gpt-5-pro",
+        }
+        filtered_models = [model.id for model in models if model.id in allowed_models]
+        return sorted(filtered_models)
+
     def _requires_chat_completions(self, model: str) -> tuple:
         """
         Determine if a model requires the chat.completions API instead of Responses.
@@ -1897,11 +2425,10 @@ class OpenAIProvider(AIProvider):
             if "images" in msg and msg["images"]:
                 content_parts = [{"type": "text", "text": content}]
                 for img in msg["images"]:
-                    mime_type = img.get("mime_type", "image/jpeg")
                     content_parts.append({
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:{mime_type};base64,{_get_image_data(img)}",
+                            "url": _get_image_data_url(img),
                             "detail": "auto"
                         }
                     })
@@ -1987,7 +2514,7 @@ class OpenAIProvider(AIProvider):
         - o1 series: no tool support
         - o3/o4 series: supports function calling
         """
-        from tools import build_tools_for_provider, parse_tool_arguments, run_tool_call
+        from tools import build_tools_for_provider, parse_tool_arguments, run_tool_calls
         
         # Format messages for reasoning models
         formatted_messages = []
@@ -2102,9 +2629,11 @@ class OpenAIProvider(AIProvider):
                 ],
             })
             
-            for tc in tool_calls:
-                parsed_args = parse_tool_arguments(tc.function.arguments)
-                tool_result = run_tool_call(tc.function.name, parsed_args, tool_context)
+            tool_results = run_tool_calls(
+                [(tc.function.name, parse_tool_arguments(tc.function.arguments)) for tc in tool_calls],
+                tool_context,
+            )
+            for tc, tool_result in zip(tool_calls, tool_results):
                 if tool_result and not should_hide_tool_result(tool_result):
                     tool_result_snippets.append(strip_hide_prefix(tool_result))
                 
@@ -2135,6 +2664,9 @@ class OpenAIProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
+        response_meta=None,
+        previous_response_id=None,
     ):
         """
         Generate a chat completion using the most appropriate API.
@@ -2149,6 +2681,9 @@ class OpenAIProvider(AIProvider):
         - Function tools (image/music/read_aloud)
         - File attachments
         - Image inputs
+        
+        ``response_meta`` and ``previous_response_id`` only apply to the
+        Responses API path (see ``_generate_with_responses_api``).
         """
         card = get_card(model)
         if temperature is None and card and getattr(card, "temperature", None) is not None:
@@ -2196,6 +2731,9 @@ class OpenAIProvider(AIProvider):
             text_get_handler=text_get_handler,
             text_edit_handler=text_edit_handler,
             wolfram_handler=wolfram_handler,
+            stream_callback=stream_callback,
+            response_meta=response_meta,
+            previous_response_id=previous_response_id,
         )
     
     def generate_image(self, prompt, chat_id, model="dall-e-3", image_data=None):
@@ -2253,7 +2791,7 @@ class OpenAIProvider(AIProvider):
             final_image_bytes = None
             
             if getattr(data_obj, "url", None):
-                download_response = requests.get(data_obj.url)
+                download_response = get_http_transport().get(data_obj.url)
                 download_response.raise_for_status()
                 final_image_bytes = download_response.content
             elif getattr(data_obj, "b64_json", None):
@@ -2266,7 +2804,7 @@ class OpenAIProvider(AIProvider):
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         model_prefix = model.replace('-', '_')
-        image_path = images_dir / f"{model_prefix}_{timestamp}.png"
+        image_path = _unique_image_path(images_dir, f"{model_prefix}_{timestamp}")
         
         image_path.write_bytes(final_image_bytes)
         
@@ -2301,7 +2839,11 @@ class OpenAIProvider(AIProvider):
         client = self.client
         if base_url or api_key:
             OpenAI = _lazy_openai_OpenAI()
-            client = OpenAI(api_key=api_key or self._current_api_key, base_url=base_url or None)
+            client = OpenAI(
+                api_key=api_key or self._current_api_key,
+                base_url=base_url or None,
+                **get_http_transport().openai_client_kwargs(),
+            )
         is_openai_base = not base_url or "openai.com" in (base_url or "")
 
         def _make_file_obj():
@@ -2414,7 +2956,7 @@ class GrokProvider(AIProvider):
     def initialize(self, api_key: str):
         # Reuse the OpenAI client with a different base_url.
         OpenAI = _lazy_openai_OpenAI()
-        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL)
+        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL, **get_http_transport().openai_client_kwargs())
 
     # ------------------------------------------------------------------
     # Helpers for Responses API + web search
@@ -2502,15 +3044,19 @@ class GrokProvider(AIProvider):
 
             # Add image attachments (convert to base64 data URL format).
             for img in images:
-                img_data = img.get("data", "")
-                img_mime = img.get("mime_type", "image/jpeg")
-                if img_data:
-                    content_parts.append(
-                        {
-                            "type": "input_image",
-                            "image_url": f"data:{img_mime};base64,{img_data}",
-                        }
-                    )
+                if not (img.get("data") or img.get("blob") or img.get("path")):
+                    continue
+                try:
+                    image_url = _get_image_data_url(img)
+                except OSError as e:
+                    print(f"[GrokProvider] Skipping unreadable image: {e}")
+                    continue
+                content_parts.append(
+                    {
+                        "type": "input_image",
+                        "image_url": image_url,
+                    }
+                )
 
             if content_parts:
                 input_items.append(
@@ -2600,17 +3146,27 @@ class GrokProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
+        response_meta=None,
+        previous_response_id=None,
     ) -> str:
         """
         Generate a response using xAI's Responses API for Grok models.
 
         This path is used primarily to enable web search via the built-in
         `web_search` and `x_search` tools when the web search toggle is on.
+        With ``previous_response_id`` only the messages after the last
+        assistant reply are sent; the final response id is recorded in
+        ``response_meta["grok"]``.
         """
         if not self.client:
             raise RuntimeError("Grok client not initialized")
 
         input_items, instructions = self._build_responses_input(messages)
+        full_input = None
+        if previous_response_id:
+            full_input = input_items
+            input_items, _ = self._build_responses_input(_messages_since_last_reply(messages))
 
         enabled_tools = build_enabled_tools_from_handlers(
             image_tool_handler,
@@ -2641,13 +3197,17 @@ class GrokProvider(AIProvider):
             params["tools"] = tools
             params["tool_choice"] = "auto"
 
+        if previous_response_id:
+            params["previous_response_id"] = previous_response_id
+
         print(
             f"[GrokProvider] Calling Responses API with {len(input_items)} input items, "
             f"{len(tools)} tools (web_search_enabled={web_search_enabled})"
         )
 
         if not enabled_tools:
-            response = self.client.responses.create(**params)
+            response, _ = _create_chained_responses(self.client, params, full_input, stream_callback)
+            _record_response_id(response_meta, "grok", response, model)
             text_content, _ = self._extract_responses_output(response)
             return text_content
 
@@ -2665,11 +3225,17 @@ class GrokProvider(AIProvider):
         tool_result_snippets = []
         current_input = input_items.copy()
 
-        for _ in range(max_tool_rounds):
-            response = self.client.responses.create(**{
-                **params,
-                "input": current_input,
-            })
+        for round_num in range(max_tool_rounds):
+            response, sent = _create_chained_responses(
+                self.client,
+                {**params, "input": current_input},
+                full_input if round_num == 0 else None,
+                stream_callback,
+            )
+            if "previous_response_id" not in sent:
+                params.pop("previous_response_id", None)
+                current_input = list(sent["input"])
+            _record_response_id(response_meta, "grok", response, model)
 
             text_content, function_calls = self._extract_responses_output(response)
 
@@ -2678,10 +3244,11 @@ class GrokProvider(AIProvider):
                     return text_content + "\n\n" + "\n\n".join(tool_result_snippets)
                 return text_content
 
-            for fc in function_calls:
-                parsed_args = parse_tool_arguments(fc["arguments"])
-                tool_result = run_tool_call(fc["name"], parsed_args, tool_context)
-
+            tool_results = run_tool_calls(
+                [(fc["name"], parse_tool_arguments(fc["arguments"])) for fc in function_calls],
+                tool_context,
+            )
+            for fc, tool_result in zip(function_calls, tool_results):
                 if tool_result and not should_hide_tool_result(tool_result):
                     tool_result_snippets.append(strip_hide_prefix(tool_result))
 
@@ -2708,47 +3275,51 @@ class GrokProvider(AIProvider):
         use it; otherwise, fall back to a small, curated set.
         """
         try:
-            models = self.client.models.list()
-            model_ids = [model.id for model in models]
-            # print(f"[GrokProvider] models returned: {model_ids}")
-
-            # Mock realtime entry (xAI realtime voice currently uses a fixed endpoint
-            # and does not expose a model id in the websocket URL).
-            rt_model_id = "grok-realtime"
-            if rt_model_id not in model_ids:
-                model_ids.append(rt_model_id)
-
-            # Hardcode the primary image model so it's always available for testing,
-            # even if it is not listed by the API.
-            image_model_id = "grok-2-image-1212"
-            if image_model_id not in model_ids:
-                model_ids.append(image_model_id)
-
-            # Allow disabling filtering via parameter or env var.
-            env_val = os.getenv('DISABLE_MODEL_FILTER', '')
-            disable_filter = disable_filter or env_val.strip().lower() in ('true', '1', 'yes')
-            if disable_filter:
-                return sorted(model_ids)
-
-            # Prefer commonly used Grok chat and image models.
-            allowed_models = {
-                "grok-2-1212",
-                "grok-2-vision-1212",
-                "grok-2-image-1212",
-                "grok-3",
-                "grok-3-mini",
-                "grok-4-1-fast-non-reasoning",
-                "grok-4-1-fast-reasoning",
-                "grok-4-fast-non-reasoning",
-                "grok-4-fast-reasoning",
-            }
-            filtered = [m for m in model_ids if m in allowed_models]
-            return sorted(filtered or model_ids)
+            return self.fetch_models(disable_filter=disable_filter)
         except Exception as exc:
             print(f"Error fetching Grok models: {exc}")
             # Fallback to a reasonable default set.
             return sorted(["grok-realtime", "grok-2", "grok-2-mini", "grok-2-image-1212"])
 
+    def fetch_models(self, disable_filter: bool = False):
+        """Fetch Grok models from the xAI models.list endpoint, raising on failure."""
+        models = self.client.models.list()
+        model_ids = [model.id for model in models]
+        # print(f"[GrokProvider] models returned: {model_ids}")
+
+        # Mock realtime entry (xAI realtime voice currently uses a fixed endpoint
+        # and does not expose a model id in the websocket URL).
+        rt_model_id = "grok-realtime"
+        if rt_model_id not in model_ids:
+            model_ids.append(rt_model_id)
+
+        # Hardcode the primary image model so it's always available for testing,
+        # even if it is not listed by the API.
+        image_model_id = "grok-2-image-1212"
+        if image_model_id not in model_ids:
+            model_ids.append(image_model_id)
+
+        # Allow disabling filtering via parameter or env var.
+        env_val = os.getenv('DISABLE_MODEL_FILTER', '')
+        disable_filter = disable_filter or env_val.strip().lower() in ('true', '1', 'yes')
+        if disable_filter:
+            return sorted(model_ids)
+
+        # Prefer commonly used Grok chat and image models.
+        allowed_models = {
+            "grok-2-1212",
+            "grok-2-vision-1212",
+            "grok-2-image-1212",
+            "grok-3",
+            "grok-3-mini",
+            "grok-4-1-fast-non-reasoning",
+            "grok-4-1-fast-reasoning",
+            "grok-4-fast-non-reasoning",
+            "grok-4-fast-reasoning",
+        }
+        filtered = [m for m in model_ids if m in allowed_models]
+        return sorted(filtered or model_ids)
+
     def generate_chat_completion(
         self,
         messages,
@@ -2756,8 +3327,9 @@ class GrokProvider(AIProvider):
         temperature=None,
         max_tokens=None,
         chat_id=None,
-        # response_meta kept for interface compatibility; not used by Grok.
         web_search_enabled: bool = False,
+        # response_meta / previous_response_id only apply to the Responses
+        # API (web search) path.
         response_meta=None,
         image_tool_handler=None,
         music_tool_handler=None,
@@ -2766,6 +3338,8 @@ class GrokProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
+        previous_response_id=None,
     ):
         """
         Generate a chat completion using Grok text models.
@@ -2797,6 +3371,9 @@ class GrokProvider(AIProvider):
                 text_get_handler=text_get_handler,
                 text_edit_handler=text_edit_handler,
                 wolfram_handler=wolfram_handler,
+                stream_callback=stream_callback,
+                response_meta=response_meta,
+                previous_response_id=previous_response_id,
             )
 
         # Clean messages for the OpenAI-compatible schema; drop provider-specific keys.
@@ -2814,11 +3391,10 @@ class GrokProvider(AIProvider):
                         "text": content
                     })
                 for img in msg["images"]:
-                    mime_type = img.get("mime_type", "image/jpeg")
                     content_parts.append({
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:{mime_type};base64,{_get_image_data(img)}",
+                            "url": _get_image_data_url(img),
                             "detail": "auto"
                         }
                     })
@@ -2863,7 +3439,7 @@ class GrokProvider(AIProvider):
         # Simple one-shot path when no tools are involved.
         if not enabled_tools:
             print(f"[GrokProvider] Using chat.completions API for model: {model}")
-            response = self.client.chat.completions.create(**params)
+            response = _create_chat_completion(self.client, params, stream_callback)
             return response.choices[0].message.content or ""
 
         # Tool-aware flow for Grok: let the model call generate_image, route that
@@ -2876,11 +3452,10 @@ class GrokProvider(AIProvider):
         tool_result_snippets = []
 
         for _ in range(max_tool_rounds):
-            last_response = self.client.chat.completions.create(
-                **{
-                    **params,
-                    "messages": tool_aware_messages,
-                }
+            last_response = _create_chat_completion(
+                self.client,
+                {**params, "messages": tool_aware_messages},
+                stream_callback,
             )
             msg = last_response.choices[0].message
 
@@ -2918,12 +3493,19 @@ class GrokProvider(AIProvider):
                 text_edit_handler=text_edit_handler,
                 wolfram_handler=wolfram_handler,
             )
+            function_results = iter(run_tool_calls(
+                [
+                    (tc.function.name, parse_tool_arguments(tc.function.arguments or "{}"))
+                    for tc in tool_calls
+                    if tc.type == "function"
+                ],
+                tool_context,
+            ))
             for tc in tool_calls:
                 if tc.type != "function":
                     tool_result_content = "Error: unknown tool requested."
                 else:
-                    parsed_args = parse_tool_arguments(tc.function.arguments or "{}")
-                    tool_result_content = run_tool_call(tc.function.name, parsed_args, tool_context)
+                    tool_result_content = next(function_results)
 
                 if tool_result_content and not should_hide_tool_result(tool_result_content):
                     tool_result_snippets.append(strip_hide_prefix(tool_result_content))
@@ -2965,7 +3547,7 @@ class GrokProvider(AIProvider):
         final_image_bytes = None
 
         if getattr(data_obj, "url", None):
-            download_response = requests.get(data_obj.url)
+            download_response = get_http_transport().get(data_obj.url)
             download_response.raise_for_status()
             final_image_bytes = download_response.content
         elif getattr(data_obj, "b64_json", None):
@@ -2978,7 +3560,7 @@ class GrokProvider(AIProvider):
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         model_prefix = model.replace('-', '_')
-        image_path = images_dir / f"{model_prefix}_{timestamp}.png"
+        image_path = _unique_image_path(images_dir, f"{model_prefix}_{timestamp}")
 
         image_path.write_bytes(final_image_bytes)
 
@@ -3013,7 +3595,7 @@ class ClaudeProvider(AIProvider):
         # compatibility endpoint as described in the Anthropic docs:
         # `https://platform.claude.com/docs/en/api/openai-sdk`
         OpenAI = _lazy_openai_OpenAI()
-        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL)
+        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL, **get_http_transport().openai_client_kwargs())
 
     def get_available_models(self, disable_filter: bool = False):
         """
@@ -3061,10 +3643,13 @@ class ClaudeProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
     ):
         """
         Generate a chat completion using Claude models via the OpenAI-compatible
         /v1/chat/completions endpoint.
+
+        Input-token counts are recorded in ``response_meta["claude"]["usage"]``.
         """
         if not self.client:
             raise RuntimeError("Claude client not initialized")
@@ -3087,11 +3672,10 @@ class ClaudeProvider(AIProvider):
                         "text": content
                     })
                 for img in msg["images"]:
-                    mime_type = img.get("mime_type", "image/jpeg")
                     content_parts.append({
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:{mime_type};base64,{_get_image_data(img)}",
+                            "url": _get_image_data_url(img),
                             "detail": "auto"
                         }
                     })
@@ -3111,6 +3695,9 @@ class ClaudeProvider(AIProvider):
             "model": model,
             "messages": processed_messages,
         }
+        if stream_callback:
+            # Usage is only sent on request when streaming.
+            params["stream_options"] = {"include_usage": True}
         if temperature is not None:
             # Anthropic supports temperature in [0, 1]; higher values are capped
             # according to the OpenAI compatibility docs:
@@ -3138,7 +3725,8 @@ class ClaudeProvider(AIProvider):
         # Simple one-shot path when no tools are involved.
         if not enabled_tools:
             print(f"[ClaudeProvider] Using chat.completions API for model: {model}")
-            response = self.client.chat.completions.create(**params)
+            response = _create_chat_completion(self.client, params, stream_callback)
+            _record_cache_usage(response_meta, "claude", response, "ClaudeProvider")
             return response.choices[0].message.content or ""
 
         # Tool-aware flow for Claude: let the model call tools, route them
@@ -3151,12 +3739,12 @@ class ClaudeProvider(AIProvider):
         tool_result_snippets = []
 
         for _ in range(max_tool_rounds):
-            last_response = self.client.chat.completions.create(
-                **{
-                    **params,
-                    "messages": tool_aware_messages,
-                }
+            last_response = _create_chat_completion(
+                self.client,
+                {**params, "messages": tool_aware_messages},
+                stream_callback,
             )
+            _record_cache_usage(response_meta, "claude", last_response, "ClaudeProvider")
             msg = last_response.choices[0].message
 
             tool_calls = getattr(msg, "tool_calls", None) or []
@@ -3193,12 +3781,19 @@ class ClaudeProvider(AIProvider):
                 text_edit_handler=text_edit_handler,
                 wolfram_handler=wolfram_handler,
             )
+            function_results = iter(run_tool_calls(
+                [
+                    (tc.function.name, parse_tool_arguments(tc.function.arguments or "{}"))
+                    for tc in tool_calls
+                    if tc.type == "function"
+                ],
+                tool_context,
+            ))
             for tc in tool_calls:
                 if tc.type != "function":
                     tool_result_content = "Error: unknown tool requested."
                 else:
-                    parsed_args = parse_tool_arguments(tc.function.arguments or "{}")
-                    tool_result_content = run_tool_call(tc.function.name, parsed_args, tool_context)
+                    tool_result_content = next(function_results)
 
                 if tool_result_content and not should_hide_tool_result(tool_result_content):
                     tool_result_snippets.append(strip_hide_prefix(tool_result_content))
@@ -3251,7 +3846,7 @@ class PerplexityProvider(AIProvider):
     def initialize(self, api_key: str):
         """Initialize the Perplexity client using the OpenAI SDK with a custom base URL."""
         OpenAI = _lazy_openai_OpenAI()
-        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL)
+        self.client = OpenAI(api_key=api_key, base_url=self.BASE_URL, **get_http_transport().openai_client_kwargs())
 
     def get_available_models(self, disable_filter: bool = False):
         """
@@ -3291,6 +3886,7 @@ class PerplexityProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
     ):
         """
         Generate a chat completion using Perplexity models via the OpenAI-compatible
@@ -3327,7 +3923,7 @@ class PerplexityProvider(AIProvider):
         # Perplexity doesn't support function calling tools in the same way as OpenAI,
         # so we use a simple one-shot path.
         print(f"[PerplexityProvider] Using chat.completions API for model: {model}")
-        response = self.client.chat.completions.create(**params)
+        response = _create_chat_completion(self.client, params, stream_callback)
         content = response.choices[0].message.content or ""
 
         # Capture web search results (if any) into provider metadata so they can be
@@ -3388,6 +3984,7 @@ class GeminiProvider(AIProvider):
     
     BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
     OPENAI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai"
+    TTS_MODEL = "gemini-2.5-flash-preview-tts"
     
     def __init__(self):
         self.api_key = None
@@ -3472,25 +4069,67 @@ class GeminiProvider(AIProvider):
                     return found
         return None
     
+    def _parse_model_ids(self, data: dict) -> list:
+        """Return ids of models that support generateContent from a models.list payload."""
+        models = []
+        for model in data.get("models", []):
+            name = model.get("name", "")
+            if not name:
+                continue
+            model_id = name.split("/")[-1]
+            if "generateContent" in model.get("supportedGenerationMethods", []):
+                models.append(model_id)
+        return models
+
+    def fetch_models_if_changed(self, etag: str = None, last_modified: str = None):
+        """
+        Conditionally fetch the unfiltered model list.
+
+        Parameters
+        ----------
+        etag : str, optional
+            ETag from a previous fetch, sent as If-None-Match.
+        last_modified : str, optional
+            Last-Modified from a previous fetch, sent as If-Modified-Since.
+
+        Returns
+        -------
+        tuple
+            (models, validators) where models is None when the server reports
+            the list unchanged (HTTP 304), and validators holds the new
+            'etag' / 'last_modified' values.
+        """
+        headers = self._headers()
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        resp = get_http_transport().get(
+            f"{self.BASE_URL}/models",
+            headers=headers,
+            params={"pageSize": 50},
+            timeout=30
+        )
+        validators = {
+            "etag": resp.headers.get("ETag") or etag,
+            "last_modified": resp.headers.get("Last-Modified") or last_modified,
+        }
+        if resp.status_code == 304:
+            return None, validators
+        resp.raise_for_status()
+        return sorted(self._parse_model_ids(resp.json())), validators
+
     def get_available_models(self, disable_filter=False):
         self._require_key()
         try:
-            resp = requests.get(
+            resp = get_http_transport().get(
                 f"{self.BASE_URL}/models",
                 headers=self._headers(),
                 params={"pageSize": 50},
                 timeout=30
             )
             resp.raise_for_status()
-            data = resp.json()
-            models = []
-            for model in data.get("models", []):
-                name = model.get("name", "")
-                if not name:
-                    continue
-                model_id = name.split("/")[-1]
-                if "generateContent" in model.get("supportedGenerationMethods", []):
-                    models.append(model_id)
+            models = self._parse_model_ids(resp.json())
 
             # Check both parameter and environment variable
             disable_filter = disable_filter or os.getenv('DISABLE_MODEL_FILTER', '').lower() in ('true', '1', 'yes')
@@ -3526,6 +4165,7 @@ class GeminiProvider(AIProvider):
         text_get_handler=None,
         text_edit_handler=None,
         wolfram_handler=None,
+        stream_callback=None,
     ):
         self._require_key()
         card = get_card(model)
@@ -3552,6 +4192,7 @@ class GeminiProvider(AIProvider):
             return self._generate_with_native_api(
                 messages, model, temperature, max_tokens, chat_id, response_meta,
                 web_search_enabled=True,
+                stream_callback=stream_callback,
             )
 
         # Use OpenAI compatibility API for function calling
@@ -3579,18 +4220,21 @@ class GeminiProvider(AIProvider):
         if tools:
             payload["tools"] = tools
             payload["tool_choice"] = "auto"
+        if stream_callback:
+            payload["stream"] = True
 
         try:
             print(f"[GeminiProvider] Using OpenAI compatibility API for model: {model}")
             print(f"[GeminiProvider] Tools: {[t['function']['name'] for t in tools] if tools else 'None'}")
-            resp = requests.post(
+            resp = get_http_transport().post(
                 f"{self.OPENAI_BASE_URL}/chat/completions",
                 headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.api_key}"},
                 json=payload,
-                timeout=60
+                timeout=60,
+                stream=bool(stream_callback),
             )
             resp.raise_for_status()
-            data = resp.json()
+            data = _read_chat_completion_json(resp, stream_callback)
 
             choice = data.get("choices", [{}])[0]
             message = choice.get("message", {})
@@ -3610,14 +4254,16 @@ class GeminiProvider(AIProvider):
                 wolfram_handler=wolfram_handler,
             )
             tool_segments = []
+            calls = []
             for tc in tool_calls:
                 fn = tc.get("function", {})
                 name = fn.get("name")
                 args_str = fn.get("arguments", "{}")
                 args = parse_tool_arguments(args_str)
                 print(f"[GeminiProvider] Tool call: {name} with args: {args}")
+                calls.append((name, args))
 
-                tool_output = run_tool_call(name, args, tool_context)
+            for tool_output in run_tool_calls(calls, tool_context):
                 if tool_output:
                     display_output = strip_hide_prefix(tool_output)
                     tool_segments.append(display_output)
@@ -3633,7 +4279,7 @@ class GeminiProvider(AIProvider):
 
     def _generate_with_native_api(
         self, messages, model, temperature, max_tokens, chat_id, response_meta,
-        web_search_enabled=False,
+        web_search_enabled=False, stream_callback=None,
     ):
         """Use native Gemini API for web search (not supported in OpenAI compatibility mode)."""
         contents, system_instruction = self._convert_messages(messages)
@@ -3655,7 +4301,24 @@ class GeminiProvider(AIProvider):
 
         try:
             print(f"[GeminiProvider] Using native API for model: {model} (web_search={web_search_enabled})")
-            resp = requests.post(
+            if stream_callback:
+                resp = get_http_transport().post(
+                    f"{self.BASE_URL}/models/{model}:streamGenerateContent",
+                    headers=self._headers(),
+                    params={"alt": "sse"},
+                    json=payload,
+                    timeout=120,
+                    stream=True,
+                )
+                resp.raise_for_status()
+                segments = []
+                for chunk in _iter_sse_json(resp):
+                    for part in ((chunk.get("candidates") or [{}])[0].get("content") or {}).get("parts", []):
+                        if "text" in part:
+                            segments.append(part["text"])
+                            _emit_stream_delta(stream_callback, part["text"])
+                return "".join(segments).strip()
+            resp = get_http_transport().post(
                 f"{self.BASE_URL}/models/{model}:generateContent",
                 headers=self._headers(),
                 json=payload,
@@ -3699,7 +4362,7 @@ class GeminiProvider(AIProvider):
             }]
         }
         try:
-            resp = requests.post(
+            resp = get_http_transport().post(
                 f"{self.BASE_URL}/models/{model}:generateContent",
                 headers=self._headers(),
                 json=payload,
@@ -3731,7 +4394,7 @@ class GeminiProvider(AIProvider):
         images_dir = Path(get_current_history_dir()) / (chat_id.replace('.json', '') if chat_id else 'temp') / 'images'
         images_dir.mkdir(parents=True, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        image_path = images_dir / f"{model.replace('-', '_')}_{timestamp}.png"
+        image_path = _unique_image_path(images_dir, f"{model.replace('-', '_')}_{timestamp}")
         image_path.write_bytes(image_bytes)
         return f'<img src="{image_path}"/>'
     
@@ -3761,32 +4424,11 @@ class GeminiProvider(AIProvider):
         """
         self._require_key()
         
-        # Gemini TTS model
-        model = "gemini-2.5-flash-preview-tts"
-        
-        # Build the request payload following Gemini speech generation docs
-        # The voice is specified in speechConfig
-        payload = {
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": [{"text": text}]
-                }
-            ],
-            "generationConfig": {
-                "responseModalities": ["AUDIO"],
-                "speechConfig": {
-                    "voiceConfig": {
-                        "prebuiltVoiceConfig": {
-                            "voiceName": voice
-                        }
-                    }
-                }
-            }
-        }
+        model = self.TTS_MODEL
+        payload = self._speech_payload(text, voice)
         
         try:
-            resp = requests.post(
+            resp = get_http_transport().post(
                 f"{self.BASE_URL}/models/{model}:generateContent",
                 headers=self._headers(),
                 json=payload,
@@ -3842,6 +4484,71 @@ class GeminiProvider(AIProvider):
         # If it's already WAV or another playable format, return as-is
         return raw_audio
     
+    def stream_speech(self, text: str, voice: str):
+        """
+        Stream speech audio using the Gemini TTS model.
+        
+        Parameters
+        ----------
+        text : str
+            The text to synthesize into speech.
+        voice : str
+            The Gemini voice name (e.g., "Zephyr", "Puck", "Kore").
+            
+        Yields
+        ------
+        bytes
+            Raw LINEAR16 PCM (24kHz, mono) as it arrives.
+            
+        Raises
+        ------
+        RuntimeError
+            If the API call fails.
+        """
+        self._require_key()
+        try:
+            resp = get_http_transport().post(
+                f"{self.BASE_URL}/models/{self.TTS_MODEL}:streamGenerateContent",
+                headers=self._headers(),
+                params={"alt": "sse"},
+                json=self._speech_payload(text, voice),
+                timeout=120,
+                stream=True,
+            )
+            resp.raise_for_status()
+        except requests.exceptions.RequestException as exc:
+            raise RuntimeError(f"Gemini TTS API call failed: {exc}") from exc
+        
+        with resp:
+            for event in _iter_sse_json(resp):
+                for candidate in event.get("candidates", []):
+                    for part in candidate.get("content", {}).get("parts", []):
+                        inline_data = part.get("inlineData") or {}
+                        if inline_data.get("data") and inline_data.get("mimeType", "").startswith("audio/"):
+                            yield base64.b64decode(inline_data["data"])
+    
+    def _speech_payload(self, text: str, voice: str) -> dict:
+        """Build a TTS request payload following the Gemini speech generation docs."""
+        # The voice is specified in speechConfig
+        return {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": text}]
+                }
+            ],
+            "generationConfig": {
+                "responseModalities": ["AUDIO"],
+                "speechConfig": {
+                    "voiceConfig": {
+                        "prebuiltVoiceConfig": {
+                            "voiceName": voice
+                        }
+                    }
+                }
+            }
+        }
+    
     def _add_wav_header(self, pcm_data: bytes, sample_rate: int = 24000, channels: int = 1, bits_per_sample: int = 16) -> bytes:
         """
         Add a WAV header to raw PCM audio data.
@@ -58,6 +58,8 @@ PARENT_DIR = _default_data_root()
 SETTINGS_FILE = os.path.join(PARENT_DIR, "settings.cfg")
 HISTORY_DIR = os.path.join(PARENT_DIR, "history")
 MODEL_CACHE_FILE = os.path.join(PARENT_DIR, "model_cache.json")
+# Provider file ids of uploaded documents, keyed by content hash.
+FILE_ID_CACHE_FILE = os.path.join(PARENT_DIR, "file_id_cache.json")
 # Separate file for persisting API keys across sessions. This keeps
 # secrets out of the main settings.cfg while still using the same
 # per-user data root.
@@ -464,6 +466,25 @@ SETTINGS_CONFIG = {
     'SIDEBAR_FILTER_VISIBLE': {'type': bool, 'default': False},
     'SIDEBAR_WIDTH': {'type': int, 'default': 200},
     'MAX_TOKENS': {'type': int, 'default': 0},
+    # Stream assistant text into the chat view as it is generated.
+    'STREAMING_ENABLED': {'type': bool, 'default': True},
+    # Let OpenAI/Grok Responses API requests continue from the previous
+    # response (previous_response_id) instead of resending the whole chat.
+    'RESPONSES_SERVER_STATE': {'type': bool, 'default': False},
+    # Number of messages rendered when a chat is opened (it opens at the top);
+    # later messages are rendered as they are scrolled into view.
+    'CHAT_RENDER_WINDOW': {'type': int, 'default': 20},
+    # Shared HTTP transport: seconds to establish a connection, default seconds
+    # to wait for response data, and whether SDK clients may negotiate HTTP/2
+    # (requires the optional 'h2' package).
+    'HTTP_CONNECT_TIMEOUT': {'type': float, 'default': 10.0},
+    'HTTP_READ_TIMEOUT': {'type': float, 'default': 600.0},
+    'HTTP2_ENABLED': {'type': bool, 'default': False},
+    # Model discovery: cached model lists younger than this are used without a
+    # network request; each provider fetch is abandoned after MODEL_FETCH_TIMEOUT
+    # seconds (the cached list is used instead).
+    'MODEL_CACHE_TTL_HOURS': {'type': float, 'default': 24.0},
+    'MODEL_FETCH_TIMEOUT': {'type': float, 'default': 10.0},
     # Conversation buffer length controls how much of the history is sent with
     # each request. Accepted values:
     #   - "ALL" (default): send the full conversation history.
@@ -546,6 +567,16 @@ SETTINGS_CONFIG = {
     'TEXT_EDIT_TOOL_ENABLED': {'type': bool, 'default': False},
     # Runtime tool toggle for the Tools menu (persisted across restarts).
     'TOOL_MENU_TEXT_EDIT_ENABLED': {'type': bool, 'default': False},
+    # Maximum tool calls from one model turn that may run at the same time
+    # (1 runs them one after another).
+    'TOOL_CALL_CONCURRENCY': {'type': int, 'default': 4},
+    # Downscale attached images to the model's maximum edge and recompress
+    # them (JPEG quality below) before upload.
+    'IMAGE_UPLOAD_OPTIMIZE': {'type': bool, 'default': True},
+    'IMAGE_UPLOAD_JPEG_QUALITY': {'type': int, 'default': 85},
+    # Only the last N messages with attached images send them again; older
+    # ones get a text placeholder instead (0 resends every image).
+    'IMAGE_HISTORY_TURNS': {'type': int, 'default': 3},
     # Whether to include the conversation history folder in search tool queries.
     'SEARCH_HISTORY_ENABLED': {'type': bool, 'default': True},
     # Comma-separated list of additional directories to search (for documents, notes, etc.).
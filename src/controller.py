@@ -12,6 +12,7 @@ The controller is designed to be toolkit-agnostic to facilitate future porting.
 
 from __future__ import annotations
 
+import copy
 import os
 import json
 import shutil
@@ -19,6 +20,7 @@ import subprocess
 import tempfile
 import re
 import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass
@@ -30,6 +32,7 @@ from repositories import (
     KeyringAPIKeysRepository,
     ChatHistoryRepository,
     ModelCacheRepository,
+    image_base64,
 )
 from services import (
     ChatService,
@@ -47,6 +50,9 @@ from utils import (
     set_history_dir_getter as set_utils_history_dir_getter,
 )
 from ai_providers import get_ai_provider, set_history_dir_getter as set_ai_history_dir_getter
+from http_transport import configure_http_transport
+from encoding_cache import get_encoding_cache
+from image_preprocess import estimate_payload_bytes, prepare_images_for_model, prune_history_images
 from conversation import (
     create_system_message,
     create_user_message,
@@ -126,6 +132,13 @@ class ChatController:
         )
         self._migrate_text_edit_prompt_appendix()
 
+        # Configure the shared HTTP transport before any provider is created
+        configure_http_transport(
+            connect_timeout=self._settings_manager.get('HTTP_CONNECT_TIMEOUT', 10.0),
+            read_timeout=self._settings_manager.get('HTTP_READ_TIMEOUT', 600.0),
+            http2=self._settings_manager.get('HTTP2_ENABLED', False),
+        )
+
         # Initialize chat history repo with current project's history dir
         self._chat_history_repo = chat_history_repo
         self._init_history_repo_for_project()
@@ -175,6 +188,8 @@ class ChatController:
         self._pending_text_edit_events: List[Dict[str, Any]] = []
         self._text_edit_history_by_message: Dict[int, List[Dict[str, Any]]] = {}
         self._suppress_text_edit_logging = False
+        # Estimated upload size of the last chat request, in bytes.
+        self.last_request_payload_bytes = 0
         
         # Text targets for reusable text edit tools
         self._text_targets: Dict[str, TextTarget] = {}
@@ -615,6 +630,9 @@ class ChatController:
         project_id : str
             The project ID to switch to, or empty string for default history.
         """
+        # Finish writing chats of the project being left
+        self.flush_pending_saves()
+
         # Save current project setting
         self._settings_manager.set('CURRENT_PROJECT', project_id)
         self._settings_manager.save()
@@ -658,6 +676,7 @@ class ChatController:
         bool
             True if successful.
         """
+        self.flush_pending_saves()
         source_dir = str(self._chat_history_repo.history_dir)
         return self._projects_repo.move_chat_to_project(chat_id, source_dir, project_id)
 
@@ -783,7 +802,11 @@ class ChatController:
         """
         
         api_key = (api_key or "").strip()
+        previous_key = self.api_keys.get(provider_name) or ""
         self.api_keys[provider_name] = api_key
+        if previous_key and previous_key != api_key:
+            # A different account may see a different model list.
+            self._model_cache_repo.invalidate(provider_name)
 
         # If the key was cleared, drop the provider (unless it's a custom provider
         # with an endpoint configured - local models don't need API keys).
@@ -863,6 +886,142 @@ class ChatController:
             return ["sonar", "sonar-pro", "sonar-reasoning"]
         return ["gpt-3.5-turbo", "gpt-4", "gpt-4o-mini"]
 
+    def get_cached_provider_models(self, provider_names: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Return cached (possibly stale) model lists without any network access.
+        
+        Parameters
+        ----------
+        provider_names : Optional[List[str]]
+            Providers to look up. Defaults to all initialized providers.
+        
+        Returns
+        -------
+        Dict[str, List[str]]
+            Mapping of provider name to cached model IDs, for providers that
+            have a cache entry.
+        """
+        names = provider_names if provider_names is not None else list(self.providers.keys())
+        return {
+            name: self._model_cache_repo.get_models(name)
+            for name in names
+            if self._model_cache_repo.has_models(name)
+        }
+
+    def refresh_provider_models(
+        self,
+        provider_names: Optional[List[str]] = None,
+        force: bool = False,
+    ) -> Dict[str, List[str]]:
+        """
+        Fetch model lists for several providers concurrently.
+        
+        Cache entries younger than MODEL_CACHE_TTL_HOURS are returned as-is
+        unless ``force`` is set. The remaining providers are queried in
+        parallel, each bounded by MODEL_FETCH_TIMEOUT seconds. A provider that
+        fails or misses its deadline falls back to its cached list (or the
+        built-in defaults); a late result still updates the cache when it
+        arrives, so the next refresh picks it up.
+        
+        Parameters
+        ----------
+        provider_names : Optional[List[str]]
+            Providers to refresh. Defaults to all initialized providers.
+        force : bool
+            Ignore the TTL and revalidate every provider.
+        
+        Returns
+        -------
+        Dict[str, List[str]]
+            Mapping of provider name to unfiltered model IDs.
+        """
+        names = provider_names if provider_names is not None else list(self.providers.keys())
+        ttl_hours = float(self._settings_manager.get('MODEL_CACHE_TTL_HOURS', 24) or 0)
+        deadline = float(self._settings_manager.get('MODEL_FETCH_TIMEOUT', 10) or 10)
+        
+        results: Dict[str, List[str]] = {}
+        to_fetch: Dict[str, Any] = {}
+        for name in names:
+            provider = self.providers.get(name)
+            if provider is None:
+                continue
+            if (
+                not force
+                and self._model_cache_repo.has_models(name)
+                and not self._model_cache_repo.is_stale(name, max_age_hours=ttl_hours)
+            ):
+                results[name] = self._model_cache_repo.get_models(name)
+            else:
+                to_fetch[name] = provider
+        
+        if not to_fetch:
+            return results
+        
+        executor = ThreadPoolExecutor(max_workers=len(to_fetch), thread_name_prefix="model-fetch")
+        futures = {
+            executor.submit(self._fetch_provider_models, name, provider): name
+            for name, provider in to_fetch.items()
+        }
+        done, _ = wait(futures, timeout=deadline)
+        # Don't block on stragglers; they finish in the background.
+        executor.shutdown(wait=False)
+        
+        for future, name in futures.items():
+            models = None
+            if future in done:
+                try:
+                    models = future.result()
+                except Exception as e:
+                    print(f"[Controller] Error fetching models for {name}: {e}")
+            else:
+                print(f"[Controller] Model fetch for {name} exceeded {deadline:g}s, using cached list")
+            if models is None:
+                models = self._model_cache_repo.get_models(name) or self.get_default_models_for_provider(name)
+            results[name] = models
+        return results
+
+    def _fetch_provider_models(self, name: str, provider: Any) -> List[str]:
+        """
+        Fetch one provider's model list and record it in the model cache.
+        
+        A failed fetch leaves the cache entry as it was (and still stale), so
+        the next refresh tries again; the cached list is published instead.
+        """
+        fetch_if_changed = getattr(provider, 'fetch_models_if_changed', None)
+        fetch_models = getattr(provider, 'fetch_models', None)
+        try:
+            if fetch_if_changed is not None:
+                # Conditional request (ETag / Last-Modified) where the provider supports it.
+                models, validators = fetch_if_changed(**self._model_cache_repo.get_validators(name))
+                if models is None:
+                    self._model_cache_repo.mark_fresh(name)
+                    models = self._model_cache_repo.get_models(name)
+                else:
+                    self._model_cache_repo.set_models(name, models, **validators)
+            elif fetch_models is not None:
+                # Raises on failure, unlike get_available_models() which
+                # returns a built-in fallback list that must not be cached.
+                models = fetch_models(disable_filter=True)
+                self._model_cache_repo.set_models(name, models)
+            else:
+                models = provider.get_available_models(disable_filter=True)
+                self._model_cache_repo.set_models(name, models)
+        except Exception as e:
+            print(f"[Controller] Error fetching models for {name}: {e}")
+            models = self._model_cache_repo.get_models(name) or self.get_default_models_for_provider(name)
+        else:
+            try:
+                self._model_cache_repo.save()
+            except IOError:
+                pass
+        
+        self._event_bus.publish(Event(
+            type=EventType.MODELS_FETCHED,
+            data={'provider': name, 'models': models},
+            source='controller'
+        ))
+        return models
+
     # -----------------------------------------------------------------------
     # Chat lifecycle
     # -----------------------------------------------------------------------
@@ -1119,6 +1278,8 @@ class ChatController:
         Save the current conversation history.
         
         If this is a new chat, generates a name based on the first user message.
+        The chat is written on a background thread from a snapshot taken
+        here, so later changes to the conversation do not affect it.
         Returns the chat_id (filename) or None on error.
         """
         if not self.conversation_history:
@@ -1136,7 +1297,10 @@ class ChatController:
             merged_metadata = dict(self.current_chat_metadata)
             if metadata:
                 merged_metadata.update(metadata)
-            conv_history = ConversationHistory.from_list(self.conversation_history, metadata=merged_metadata)
+            conv_history = ConversationHistory.from_list(
+                copy.deepcopy(self.conversation_history),
+                metadata=copy.deepcopy(merged_metadata),
+            )
             actual_chat_id = self._chat_service.save_chat(chat_id, conv_history)
             self.current_chat_id = actual_chat_id
             self.current_chat_metadata = merged_metadata
@@ -1147,6 +1311,10 @@ class ChatController:
             traceback.print_exc()
             return None
 
+    def flush_pending_saves(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued chat saves are on disk; False on timeout."""
+        return self._chat_service.flush_saves(timeout)
+
     def list_chats(self) -> List[Dict[str, Any]]:
         """List all available chats via service."""
         return self._chat_service.list_chats()
@@ -1188,8 +1356,6 @@ class ChatController:
         str
             Result message or image tag.
         """
-        import base64
-        
         preferred_model = self._settings_manager.get('IMAGE_MODEL', 'dall-e-3') or 'dall-e-3'
         provider_name = self.get_provider_name_for_model(preferred_model)
         
@@ -1206,8 +1372,7 @@ class ChatController:
         mime_type = None
         if image_path:
             try:
-                with open(image_path, "rb") as f:
-                    image_data = base64.b64encode(f.read()).decode("utf-8")
+                image_data = get_encoding_cache().base64_file(image_path)
                 mime_type = "image/png"
             except Exception as e:
                 print(f"[Image Tool] Error loading image: {e}")
@@ -1216,14 +1381,10 @@ class ChatController:
         last_msg = self.conversation_history[-1] if self.conversation_history else {}
         if not image_data and last_msg.get("images"):
             img = last_msg["images"][0]
-            if img.get("data"):
-                image_data = img.get("data")
-            elif img.get("path"):
-                try:
-                    with open(img["path"], "rb") as f:
-                        image_data = base64.b64encode(f.read()).decode("utf-8")
-                except Exception:
-                    pass
+            try:
+                image_data = image_base64(img) or None
+            except Exception:
+                pass
             mime_type = img.get("mime_type", "image/png")
         
         provider = self.get_provider_for_model(preferred_model)
@@ -1298,6 +1459,15 @@ class ChatController:
                     "content": matches_text
                 })
         
+        # Search the app's own documents (full-text indexed like chats)
+        if source in ("documents", "all"):
+            current_doc_id = self._document_service.current_document_id
+            for sr in self._document_repo.search(keyword, result_limit, current_doc_id, context_window):
+                results.append({
+                    "source": f"Document: {sr.chat_title or sr.chat_id}",
+                    "content": "\n".join(sr.matches),
+                })
+
         # Search directories (explicit + implicit per-chat/per-document imports)
         dirs: List[str] = []
         if search_directories:
@@ -1676,7 +1846,11 @@ class ChatController:
 
         # New retrieval flow:
         # 1. Get base history (compacted or full)
-        # 2. Extract system prompt, apply tool guidance, memory, and compaction summary.
+        # 2. Build the system prompt as a stable prefix for provider prompt
+        #    caches: base prompt, tool guidance, document mode guidance, then
+        #    the compaction summary (which only changes when compacting).
+        # 3. Attach retrieved memories to the newest user message, so the
+        #    per-turn part of the request comes after the cached history.
         
         compacted_history, compaction_summary = self._apply_compaction_view(self.conversation_history)
         limited_history = self.apply_conversation_buffer_limit(compacted_history)
@@ -1695,16 +1869,6 @@ class ChatController:
              return limited_history
 
         current_prompt = first_message.get("content", "") or ""
-        if compaction_summary:
-            current_prompt += (
-                f"\n\n### Previous Conversation Summary\n{compaction_summary}\n"
-                f"### Current Conversation\n(The conversation continues below...)"
-            )
-        
-        # Add document mode guidance if in document mode
-        if self.has_document() and "document" in self._text_targets:
-            from config import DEFAULT_DOCUMENT_MODE_PROMPT_APPENDIX
-            current_prompt = current_prompt + "\n\n" + DEFAULT_DOCUMENT_MODE_PROMPT_APPENDIX
 
         # Get enabled tools for this model and append guidance
         try:
@@ -1723,6 +1887,17 @@ class ChatController:
             print(f"Error while appending tool guidance: {e}")
             new_prompt = current_prompt
 
+        # Add document mode guidance if in document mode
+        if self.has_document() and "document" in self._text_targets:
+            from config import DEFAULT_DOCUMENT_MODE_PROMPT_APPENDIX
+            new_prompt = new_prompt + "\n\n" + DEFAULT_DOCUMENT_MODE_PROMPT_APPENDIX
+
+        if compaction_summary:
+            new_prompt += (
+                f"\n\n### Previous Conversation Summary\n{compaction_summary}\n"
+                f"### Current Conversation\n(The conversation continues below...)"
+            )
+
         # Query memory for relevant context
         memory_context = self._get_memory_context_for_query()
         
@@ -1732,14 +1907,20 @@ class ChatController:
         messages = [msg.copy() for msg in limited_history]
         messages[0]["content"] = new_prompt
         
-        # Inject memory context as second message (after system prompt)
         if memory_context:
             memory_appendix = self._settings_manager.get('MEMORY_PROMPT_APPENDIX', '')
-            memory_message = {
-                "role": "system",
-                "content": f"{memory_appendix}\n\n{memory_context}" if memory_appendix else memory_context
-            }
-            messages.insert(1, memory_message)
+            memory_text = f"{memory_appendix}\n\n{memory_context}" if memory_appendix else memory_context
+            last_user = next(
+                (i for i in range(len(messages) - 1, 0, -1) if messages[i].get("role") == "user"),
+                None,
+            )
+            if last_user is not None and isinstance(messages[last_user].get("content", ""), str):
+                # Memories change every turn: keep them out of the cached
+                # prefix by attaching them to the newest user message.
+                user_text = messages[last_user].get("content", "")
+                messages[last_user]["content"] = f"{memory_text}\n\n{user_text}" if user_text else memory_text
+            else:
+                messages.insert(1, {"role": "system", "content": memory_text})
             print(f"[Memory] Injected context into conversation")
         
         return messages
@@ -2240,14 +2421,11 @@ class ChatController:
                 if has_attached_images:
                     image = last_msg.get("images", [None])[0]
                     if image:
-                        image_data = image.get("data")
-                        if not image_data and image.get("path"):
-                            import base64
-                            try:
-                                with open(image["path"], "rb") as f:
-                                    image_data = base64.b64encode(f.read()).decode("utf-8")
-                            except Exception as exc:
-                                print(f"[Controller] Failed to load image for edit: {exc}")
+                        image_data = None
+                        try:
+                            image_data = image_base64(image)
+                        except Exception as exc:
+                            print(f"[Controller] Failed to load image for edit: {exc}")
                         if image_data:
                             image_kwargs["image_data"] = image_data
                             image_kwargs["mime_type"] = image.get("mime_type")
@@ -2271,6 +2449,22 @@ class ChatController:
                 messages_to_send = self.messages_for_model(model)
                 if provider_name == 'perplexity':
                     messages_to_send = self._clean_messages_for_perplexity(messages_to_send)
+                messages_to_send = prune_history_images(
+                    messages_to_send,
+                    int(self._settings_manager.get('IMAGE_HISTORY_TURNS', 3) or 0),
+                )
+                if card and self._settings_manager.get('IMAGE_UPLOAD_OPTIMIZE', True):
+                    messages_to_send = prepare_images_for_model(
+                        messages_to_send,
+                        card.get_max_image_edge(),
+                        quality=self._settings_manager.get('IMAGE_UPLOAD_JPEG_QUALITY', 85),
+                    )
+                payload_bytes, image_bytes = estimate_payload_bytes(messages_to_send)
+                self.last_request_payload_bytes = payload_bytes
+                print(
+                    f"[Controller] Request payload ~{payload_bytes / 1024:.0f} KB "
+                    f"({image_bytes / 1024:.0f} KB images) for {model}"
+                )
                 
                 # Build kwargs
                 response_meta = {}
@@ -2291,10 +2485,28 @@ class ChatController:
                     if tool_handlers:
                         kwargs.update(tool_handlers)
                 
-                # Add response_meta for providers that use it
-                if provider_name in ('gemini', 'perplexity', 'claude'):
+                # Add response_meta for providers that use it (search results,
+                # response ids, prompt cache usage)
+                if provider_name in ('gemini', 'perplexity', 'claude', 'openai', 'grok'):
                     kwargs["response_meta"] = response_meta
                 
+                # Opt-in server-side conversation state for the Responses API:
+                # while the chain is intact, send only the new turn.
+                if (
+                    provider_name in self.RESPONSE_CHAIN_PROVIDERS
+                    and self._settings_manager.get('RESPONSES_SERVER_STATE', False)
+                ):
+                    previous_response_id = self._previous_response_id(provider_name, model)
+                    if previous_response_id:
+                        kwargs["previous_response_id"] = previous_response_id
+                
+                # Stream text deltas to the UI while the response is generated.
+                # The final answer is still emitted via MESSAGE_RECEIVED below.
+                if self._settings_manager.get('STREAMING_ENABLED', True):
+                    kwargs["stream_callback"] = self._make_stream_callback(
+                        model, len(self.conversation_history), is_cancelled
+                    )
+                
                 if is_cancelled():
                     return
                 
@@ -2319,6 +2531,9 @@ class ChatController:
                 print(f"[TextEditTool] Saving {len(self._pending_text_edit_events)} edit events to message")
             message_index = len(self.conversation_history)
             self.conversation_history.append(assistant_message)
+            chain_meta = (assistant_provider_meta or {}).get(provider_name)
+            if isinstance(chain_meta, dict) and chain_meta.get("response_id"):
+                chain_meta["chain"] = self._response_chain_hash(self.conversation_history)
             if self._pending_text_edit_events:
                 self._text_edit_history_by_message[message_index] = list(self._pending_text_edit_events)
                 self._pending_text_edit_events = []
@@ -2367,6 +2582,100 @@ class ChatController:
             # Post-response maintenance
             self._check_and_perform_compaction()
 
+    # -----------------------------------------------------------------------
+    # Server-side conversation state
+    # -----------------------------------------------------------------------
+
+    # Providers whose Responses API can continue from previous_response_id.
+    RESPONSE_CHAIN_PROVIDERS = ('openai', 'grok')
+
+    @staticmethod
+    def _response_chain_hash(history: List[Dict[str, Any]]) -> str:
+        """
+        Fingerprint the conversation a stored response was generated from.
+        
+        Covers the role and text of every non-system, non-notification
+        message plus compaction markers, so edits, deletions and compaction
+        all change it. The system prompt is left out because it is resent as
+        instructions on every request.
+        """
+        digest = hashlib.sha256()
+        for msg in history:
+            meta = msg.get("provider_meta") or {}
+            if msg.get("role") == "system" or meta.get("is_notification"):
+                continue
+            content = msg.get("content", "")
+            if not isinstance(content, str):
+                content = json.dumps(content, sort_keys=True, default=str)
+            digest.update(json.dumps(
+                [msg.get("role"), content, bool(meta.get("compacted_data"))]
+            ).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _previous_response_id(self, provider_name: str, model: str) -> Optional[str]:
+        """
+        Return the response id to continue from, or None to send full history.
+        
+        The id of the latest assistant message is used only if it came from
+        the same provider and model and the conversation up to it is
+        unchanged since the response was stored.
+        """
+        history = self.conversation_history
+        for i in range(len(history) - 1, -1, -1):
+            if history[i].get("role") != "assistant":
+                continue
+            meta = (history[i].get("provider_meta") or {}).get(provider_name)
+            if not isinstance(meta, dict) or not meta.get("response_id"):
+                return None
+            if meta.get("model") != model:
+                return None
+            if meta.get("chain") != self._response_chain_hash(history[:i + 1]):
+                return None
+            return meta["response_id"]
+        return None
+
+    def _make_stream_callback(
+        self,
+        model: str,
+        message_index: int,
+        is_cancelled: Callable[[], bool],
+    ) -> Callable[[str], None]:
+        """
+        Build a provider stream callback that publishes MESSAGE_STREAMING events.
+        
+        Parameters
+        ----------
+        model : str
+            The model generating the response.
+        message_index : int
+            Index the assistant message will occupy once complete.
+        is_cancelled : Callable[[], bool]
+            Cancellation check; when it returns True the stream is aborted.
+        
+        Returns
+        -------
+        Callable[[str], None]
+            Callback accepting each text delta.
+        """
+        state = {'content': ''}
+        
+        def on_delta(delta: str) -> None:
+            if is_cancelled():
+                raise RuntimeError("Request cancelled")
+            state['content'] += delta
+            self._event_bus.publish(Event(
+                type=EventType.MESSAGE_STREAMING,
+                data={
+                    'delta': delta,
+                    'content': state['content'],
+                    'index': message_index,
+                    'model': model,
+                },
+                source='controller'
+            ))
+        
+        return on_delta
+
     def _get_or_init_provider(self, model: str, provider_name: str) -> Any:
         """Get or initialize a provider for the given model."""
         if provider_name == "custom":
@@ -59,7 +59,8 @@ class Message:
     content : str
         The text content of the message.
     images : Optional[List[Dict[str, Any]]]
-        Optional list of attached images (each with 'data' and 'mime_type').
+        Optional list of attached images. Each has a 'mime_type' and one of
+        'blob' (blob store digest), 'data' (inline base64) or 'path'.
     files : Optional[List[Dict[str, Any]]]
         Optional list of attached document files. Each dict may contain:
         - 'path': Local file path (used before upload).
@@ -426,7 +427,8 @@ def create_user_message(
     content : str
         The message content.
     images : Optional[List[Dict[str, Any]]]
-        Optional list of attached images (each with 'data' and 'mime_type').
+        Optional list of attached images. Each has a 'mime_type' and one of
+        'blob' (blob store digest), 'data' (inline base64) or 'path'.
     files : Optional[List[Dict[str, Any]]]
         Optional list of attached document files. Each dict may contain:
         - 'path': Local file path (used before upload).
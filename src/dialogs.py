@@ -125,6 +125,10 @@ def save_model_cache(cache: dict) -> None:
     for provider, models in cache.items():
         if isinstance(models, list):
             repo.set_models(provider, models)
+    try:
+        repo.save()
+    except IOError:
+        pass
 
 
 # ---------------------------------------------------------------------------
@@ -3304,7 +3308,7 @@ class SettingsDialog(Gtk.Dialog):
                 
                 def progress_cb(current, total, chat_id):
                     frac = current / total if total > 0 else 0
-                    GLib.idle_add(self._update_import_progress, frac, f"Importing {current}/{total}...")
+                    GLib.idle_add(self._update_import_progress, frac, f"Importing messages {current}/{total}...")
                 
                 result = service.import_all_conversations(history_repo, store_mode, progress_cb)
                 service.close()
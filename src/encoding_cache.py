@@ -0,0 +1,123 @@
+"""
+encoding_cache.py – Memoized base64 / data-URL encodings of files.
+
+Image attachments are sent with every request of a conversation, so the
+same files are read and base64-encoded again on each turn. The shared
+:class:`EncodingCache` keeps recent encodings in memory, keyed by
+``(path, size, mtime)`` so a file changed on disk is re-encoded, and
+evicts least recently used entries once a memory budget is exceeded.
+"""
+
+import base64
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+# Default memory budget for cached encodings, in bytes of encoded text.
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class EncodingCache:
+    """
+    Bounded LRU cache of base64 encodings of files and other derived
+    payloads (see :meth:`memoize`).
+
+    Thread-safe; hit, miss and eviction counts are available from
+    :meth:`stats`.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Parameters
+        ----------
+        max_bytes : int
+            Total size of cached encodings before old entries are evicted.
+            Encodings larger than this are returned but not cached.
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def base64_file(self, path) -> str:
+        """Return the base64 encoding of a file's contents."""
+        path = os.path.abspath(os.fspath(path))
+        st = os.stat(path)
+
+        def encode():
+            with open(path, "rb") as f:
+                return base64.b64encode(f.read()).decode("utf-8")
+
+        return self.memoize((path, st.st_size, st.st_mtime_ns), encode)
+
+    def memoize(self, key: Hashable, compute: Callable[[], Any], size: Callable[[Any], int] = len) -> Any:
+        """
+        Return the cached value for ``key``, computing and caching it on a miss.
+
+        Parameters
+        ----------
+        key : Hashable
+            Cache key; it must change whenever the source data changes.
+        compute : Callable[[], Any]
+            Produces the value (called without the lock held).
+        size : Callable[[Any], int]
+            Returns the memory cost of a value, counted against ``max_bytes``.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = compute()
+        cost = size(value)
+
+        with self._lock:
+            if cost <= self.max_bytes and key not in self._entries:
+                self._entries[key] = (value, cost)
+                self._bytes += cost
+                while self._bytes > self.max_bytes:
+                    _key, (_value, dropped) = self._entries.popitem(last=False)
+                    self._bytes -= dropped
+                    self.evictions += 1
+        return value
+
+    def data_url(self, path, mime_type: str) -> str:
+        """Return a ``data:<mime_type>;base64,...`` URL for a file."""
+        return f"data:{mime_type};base64,{self.base64_file(path)}"
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters and current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def clear(self) -> None:
+        """Drop all cached encodings (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache: Optional[EncodingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_encoding_cache() -> EncodingCache:
+    """Return the process-wide encoding cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EncodingCache()
+        return _cache
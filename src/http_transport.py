@@ -0,0 +1,226 @@
+"""
+http_transport.py – Shared, pooled HTTP transport for providers and services.
+
+Every outbound HTTP call in the application goes through a single transport so
+connections are reused across requests instead of paying a TCP/TLS handshake
+on each call:
+
+- Raw REST calls (Gemini, custom endpoints, image downloads, Wolfram Alpha) use
+  one ``requests.Session`` with per-host keep-alive connection pools.
+- OpenAI-SDK based clients (OpenAI, Grok, Claude, Perplexity, embeddings) share
+  one ``httpx.Client``, which can optionally negotiate HTTP/2.
+
+Timeouts are configured once (see ``configure_http_transport``) and applied to
+any request that does not pass its own.
+"""
+
+import importlib.util
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 600.0
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 16
+
+TimeoutType = Union[None, float, int, Tuple[float, float]]
+
+
+class HttpTransport:
+    """
+    Process-wide HTTP transport with pooled keep-alive connections.
+
+    Parameters
+    ----------
+    connect_timeout : float
+        Seconds allowed to establish a connection.
+    read_timeout : float
+        Default seconds to wait for response data when a call does not pass
+        an explicit timeout.
+    pool_connections : int
+        Number of per-host connection pools to keep.
+    pool_maxsize : int
+        Maximum connections kept alive per host.
+    http2 : bool
+        Negotiate HTTP/2 for SDK clients when the ``h2`` package is available.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        http2: bool = False,
+    ):
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.pool_connections = int(pool_connections)
+        self.pool_maxsize = int(pool_maxsize)
+        self.http2 = bool(http2)
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._httpx_client = None
+        self._httpx_checked = False
+
+    # -----------------------------------------------------------------------
+    # Configuration
+    # -----------------------------------------------------------------------
+
+    def configure(
+        self,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ) -> None:
+        """
+        Update transport settings.
+
+        Timeout changes apply to the next request. Pool size or HTTP/2 changes
+        rebuild the underlying clients.
+        """
+        rebuild_session = False
+        rebuild_httpx = False
+        with self._lock:
+            if connect_timeout is not None and float(connect_timeout) != self.connect_timeout:
+                self.connect_timeout = float(connect_timeout)
+                rebuild_httpx = True
+            if read_timeout is not None and float(read_timeout) != self.read_timeout:
+                self.read_timeout = float(read_timeout)
+                rebuild_httpx = True
+            if pool_connections is not None and int(pool_connections) != self.pool_connections:
+                self.pool_connections = int(pool_connections)
+                rebuild_session = rebuild_httpx = True
+            if pool_maxsize is not None and int(pool_maxsize) != self.pool_maxsize:
+                self.pool_maxsize = int(pool_maxsize)
+                rebuild_session = rebuild_httpx = True
+            if http2 is not None and bool(http2) != self.http2:
+                self.http2 = bool(http2)
+                rebuild_httpx = True
+            if rebuild_httpx:
+                # SDK clients keep the httpx client they were created with, so
+                # the old one is left open; new clients pick up the new settings.
+                self._httpx_client = None
+                self._httpx_checked = False
+        if rebuild_session:
+            self._reset_session()
+
+    def resolve_timeout(self, timeout: TimeoutType = None) -> Tuple[float, float]:
+        """Return a ``(connect, read)`` timeout tuple for a request."""
+        if timeout is None:
+            return (self.connect_timeout, self.read_timeout)
+        if isinstance(timeout, tuple):
+            return timeout
+        return (self.connect_timeout, float(timeout))
+
+    # -----------------------------------------------------------------------
+    # requests-based transport
+    # -----------------------------------------------------------------------
+
+    @property
+    def session(self) -> requests.Session:
+        """The shared ``requests.Session`` (created on first use)."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def request(self, method: str, url: str, timeout: TimeoutType = None, **kwargs) -> requests.Response:
+        """Send a request through the shared session."""
+        return self.session.request(method, url, timeout=self.resolve_timeout(timeout), **kwargs)
+
+    def get(self, url: str, timeout: TimeoutType = None, **kwargs) -> requests.Response:
+        """Send a GET request through the shared session."""
+        return self.request("GET", url, timeout=timeout, **kwargs)
+
+    def post(self, url: str, timeout: TimeoutType = None, **kwargs) -> requests.Response:
+        """Send a POST request through the shared session."""
+        return self.request("POST", url, timeout=timeout, **kwargs)
+
+    def _reset_session(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            try:
+                session.close()
+            except Exception:
+                pass
+
+    # -----------------------------------------------------------------------
+    # httpx-based transport for the OpenAI SDK
+    # -----------------------------------------------------------------------
+
+    def _get_httpx_client(self):
+        with self._lock:
+            if self._httpx_checked:
+                return self._httpx_client
+            self._httpx_checked = True
+            try:
+                import httpx
+            except ImportError:
+                return None
+            use_http2 = self.http2 and importlib.util.find_spec("h2") is not None
+            if self.http2 and not use_http2:
+                print("[HttpTransport] HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            self._httpx_client = httpx.Client(
+                http2=use_http2,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_connections * self.pool_maxsize,
+                    max_keepalive_connections=self.pool_maxsize,
+                ),
+                follow_redirects=True,
+            )
+            return self._httpx_client
+
+    def openai_client_kwargs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments to pass to ``OpenAI(...)`` so the client shares the
+        pooled transport. Empty when httpx is unavailable.
+        """
+        client = self._get_httpx_client()
+        return {"http_client": client} if client is not None else {}
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._reset_session()
+        with self._lock:
+            client, self._httpx_client = self._httpx_client, None
+            self._httpx_checked = False
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_http_transport() -> HttpTransport:
+    """Get the process-wide HTTP transport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+
+def configure_http_transport(**kwargs) -> HttpTransport:
+    """Configure the process-wide HTTP transport. See ``HttpTransport.configure``."""
+    transport = get_http_transport()
+    transport.configure(**kwargs)
+    return transport
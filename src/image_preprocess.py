@@ -0,0 +1,251 @@
+"""
+image_preprocess.py – Shrink image attachments before they are uploaded.
+
+Vision models downscale every image to a provider-specific maximum edge
+before looking at it, so sending a full-resolution photo only costs upload
+time. :func:`prepare_images_for_model` resizes attached images to the
+target model's limit (``ModelCard.get_max_image_edge``) and recompresses
+them, keeping the original whenever that would not make it smaller.
+Results are memoized per (image, limit, quality) in the shared encoding
+cache, so later turns of the same chat reuse them.
+
+:func:`prune_history_images` bounds how many earlier turns still carry
+their images, and :func:`estimate_payload_bytes` reports what a request
+will upload.
+
+Decoding and encoding use GdkPixbuf; without it images are sent unchanged.
+"""
+
+import base64
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Images within the edge limit are only recompressed when at least this big.
+RECOMPRESS_MIN_BYTES = 256 * 1024
+DEFAULT_JPEG_QUALITY = 85
+
+
+def prepare_images_for_model(
+    messages: List[Dict[str, Any]],
+    max_edge: Optional[int],
+    quality: int = DEFAULT_JPEG_QUALITY,
+) -> List[Dict[str, Any]]:
+    """
+    Return messages whose attached images are sized for a model.
+
+    Messages with images are replaced by shallow copies; the input list and
+    its messages are not modified.
+
+    Parameters
+    ----------
+    messages : List[Dict[str, Any]]
+        Messages about to be sent.
+    max_edge : Optional[int]
+        Longest image edge in pixels; None leaves images untouched.
+    quality : int
+        JPEG quality used when recompressing opaque images.
+    """
+    if not max_edge:
+        return messages
+    result = []
+    for msg in messages:
+        images = msg.get("images")
+        if images:
+            msg = dict(msg)
+            msg["images"] = [prepare_image(img, max_edge, quality) for img in images]
+        result.append(msg)
+    return result
+
+
+def prune_history_images(messages: List[Dict[str, Any]], keep_turns: int) -> List[Dict[str, Any]]:
+    """
+    Drop images from all but the last ``keep_turns`` image-bearing messages.
+
+    Each dropped image is replaced by a line in the message text, using the
+    image's ``caption`` when it has one, so the model still knows it was
+    shown something. Affected messages are shallow copies; the input is not
+    modified.
+
+    Parameters
+    ----------
+    messages : List[Dict[str, Any]]
+        Messages about to be sent.
+    keep_turns : int
+        Number of most recent messages with images that keep them;
+        0 or less keeps every image.
+    """
+    if keep_turns <= 0:
+        return messages
+    with_images = [i for i, msg in enumerate(messages) if msg.get("images")]
+    prune = set(with_images[:-keep_turns])
+    if not prune:
+        return messages
+    result = []
+    for i, msg in enumerate(messages):
+        if i in prune:
+            notes = []
+            for img in msg["images"]:
+                caption = img.get("caption")
+                notes.append(
+                    f"[Image from an earlier turn omitted: {caption}]"
+                    if caption
+                    else "[Image from an earlier turn omitted]"
+                )
+            msg = {k: v for k, v in msg.items() if k != "images"}
+            content = msg.get("content") or ""
+            msg["content"] = "\n".join([content] + notes) if content else "\n".join(notes)
+        result.append(msg)
+    return result
+
+
+def estimate_payload_bytes(messages: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Estimate the upload size of a message list.
+
+    Returns
+    -------
+    Tuple[int, int]
+        ``(total_bytes, image_bytes)``; images stored as blobs or files are
+        counted at their base64-encoded size.
+    """
+    image_bytes = 0
+    text_bytes = 0
+    for msg in messages:
+        for img in msg.get("images") or []:
+            image_bytes += _encoded_size(img)
+        rest = {k: v for k, v in msg.items() if k != "images"}
+        text_bytes += len(json.dumps(rest, ensure_ascii=False, default=str).encode("utf-8"))
+    return text_bytes + image_bytes, image_bytes
+
+
+def _encoded_size(img: Dict[str, Any]) -> int:
+    if img.get("data"):
+        return len(img["data"])
+    try:
+        if img.get("blob"):
+            from repositories.blob_store import get_blob_store
+            size = get_blob_store().path(img["blob"]).stat().st_size
+        elif img.get("path"):
+            size = os.path.getsize(img["path"])
+        else:
+            return 0
+    except (OSError, ValueError):
+        return 0
+    return (size + 2) // 3 * 4
+
+
+def prepare_image(img: Dict[str, Any], max_edge: int, quality: int = DEFAULT_JPEG_QUALITY) -> Dict[str, Any]:
+    """
+    Return an image entry resized and recompressed for ``max_edge``.
+
+    The returned entry carries inline ``data``; if the image cannot be made
+    smaller (or cannot be decoded) ``img`` itself is returned.
+    """
+    from encoding_cache import get_encoding_cache
+
+    try:
+        source = _source_key(img)
+    except OSError:
+        return img
+    if source is None:
+        return img
+
+    def compute() -> Optional[Tuple[str, str]]:
+        try:
+            shrunk = _shrink(_read_image_bytes(img), max_edge, quality)
+        except Exception as e:
+            print(f"[ImagePreprocess] Sending image unchanged: {e}")
+            return None
+        if shrunk is None:
+            return None
+        data, mime_type = shrunk
+        return base64.b64encode(data).decode("utf-8"), mime_type
+
+    # Images that stay unchanged are cached too (as None) so they are not
+    # decoded again on every turn.
+    result = get_encoding_cache().memoize(
+        ("prepared_image", source, max_edge, quality),
+        compute,
+        size=lambda value: len(value[0]) if value else 0,
+    )
+    if result is None:
+        return img
+    encoded, mime_type = result
+    prepared = {k: v for k, v in img.items() if k not in ("data", "blob", "path")}
+    prepared["data"] = encoded
+    prepared["mime_type"] = mime_type
+    return prepared
+
+
+def _source_key(img: Dict[str, Any]) -> Optional[Tuple]:
+    """Identify an image's content without reading it."""
+    if img.get("blob"):
+        return ("blob", img["blob"])
+    if img.get("data"):
+        data = img["data"]
+        return ("data", len(data), hash(data))
+    if img.get("path"):
+        path = os.path.abspath(img["path"])
+        st = os.stat(path)
+        return ("path", path, st.st_size, st.st_mtime_ns)
+    return None
+
+
+def _read_image_bytes(img: Dict[str, Any]) -> bytes:
+    if img.get("blob"):
+        from repositories.blob_store import get_blob_store
+        return get_blob_store().read(img["blob"])
+    if img.get("data"):
+        return base64.b64decode(img["data"])
+    with open(img["path"], "rb") as f:
+        return f.read()
+
+
+def _shrink(raw: bytes, max_edge: int, quality: int) -> Optional[Tuple[bytes, str]]:
+    """
+    Downscale and re-encode image bytes.
+
+    Returns ``(bytes, mime_type)``, or None when the original should be sent
+    (already small, animated, undecodable, or re-encoding does not help).
+    """
+    try:
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf
+    except (ImportError, ValueError):
+        return None
+
+    loader = GdkPixbuf.PixbufLoader()
+    loader.write(raw)
+    loader.close()
+    animation = loader.get_animation()
+    if animation is not None and not animation.is_static_image():
+        return None
+    pixbuf = loader.get_pixbuf()
+    if pixbuf is None:
+        return None
+    # Re-encoding drops EXIF, so bake the orientation into the pixels.
+    pixbuf = pixbuf.apply_embedded_orientation() or pixbuf
+
+    width, height = pixbuf.get_width(), pixbuf.get_height()
+    scale = max_edge / max(width, height)
+    if scale >= 1 and len(raw) < RECOMPRESS_MIN_BYTES:
+        return None
+    if scale < 1:
+        pixbuf = pixbuf.scale_simple(
+            max(1, round(width * scale)),
+            max(1, round(height * scale)),
+            GdkPixbuf.InterpType.HYPER,
+        )
+
+    if pixbuf.get_has_alpha():
+        ok, data = pixbuf.save_to_bufferv("png", [], [])
+        mime_type = "image/png"
+    else:
+        ok, data = pixbuf.save_to_bufferv("jpeg", ["quality"], [str(quality)])
+        mime_type = "image/jpeg"
+    if not ok or len(data) >= len(raw):
+        return None
+    return bytes(data), mime_type
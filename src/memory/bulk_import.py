@@ -0,0 +1,265 @@
+"""
+Bulk import of chat histories into memory.
+
+Importing chat by chat sends one small embedding request per conversation
+and starts over if interrupted. :class:`BulkImporter` instead
+
+1. reads every chat to import and turns its messages into memory items
+   whose IDs are derived from ``(conversation_id, message index)``, so
+   importing a chat twice overwrites rather than duplicates;
+2. splits long messages into chunks (see :mod:`memory.chunker`) and
+   packs items from many chats into batches bounded by an estimated token
+   budget and an item count;
+3. embeds several batches concurrently while a single writer upserts
+   finished batches into the repository, in order;
+4. keeps a checkpoint file listing the chats of the run that are not fully
+   stored yet, so an interrupted import resumes with just those.
+
+Progress is reported per stored message.
+"""
+
+import json
+import os
+import tempfile
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .schema import MemoryItem
+from .chunker import chunk_item
+from .embedding_provider import estimate_tokens
+
+
+def message_text(content: Any) -> str:
+    """Return the text of a message's content (string or content-part list)."""
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content
+            if isinstance(part, dict) and part.get("type") == "text"
+        )
+    return content if isinstance(content, str) else ""
+
+
+def import_item_id(conversation_id: str, index: int) -> str:
+    """Stable memory ID for message ``index`` of a conversation."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"chatgtk-memory:{conversation_id}:{index}"))
+
+
+def conversation_items(
+    conversation_id: str,
+    messages: Iterable[Dict[str, Any]],
+    store_mode: str = "all",
+    imported_at: Optional[str] = None,
+) -> List[MemoryItem]:
+    """
+    Turn a conversation's messages into memory items.
+
+    System messages, empty messages and roles excluded by ``store_mode``
+    ("all", "user" or "assistant") are skipped.
+    """
+    imported_at = imported_at or datetime.utcnow().isoformat() + "Z"
+    items = []
+    for index, msg in enumerate(messages):
+        role = msg.get("role", "")
+        if role == "system":
+            continue
+        if store_mode == "user" and role != "user":
+            continue
+        if store_mode == "assistant" and role != "assistant":
+            continue
+        text = message_text(msg.get("content", ""))
+        if not text.strip():
+            continue
+        item = MemoryItem.create(text, role, conversation_id, id=import_item_id(conversation_id, index))
+        item.imported_at = imported_at
+        items.append(item)
+    return items
+
+
+def pack_batches(
+    items: Iterable[MemoryItem],
+    max_tokens: int,
+    max_items: int,
+) -> List[List[MemoryItem]]:
+    """Group items in order into batches within the token and item limits."""
+    batches: List[List[MemoryItem]] = []
+    current: List[MemoryItem] = []
+    tokens = 0
+    for item in items:
+        cost = estimate_tokens(item.text)
+        if current and (tokens + cost > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(item)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+class ImportCheckpoint:
+    """JSON file listing the chats of an unfinished import."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+
+    def load(self) -> List[str]:
+        """Return the chats still pending from an interrupted run."""
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return [str(chat_id) for chat_id in data.get("pending", [])]
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[Memory] Ignoring unreadable import checkpoint: {e}")
+            return []
+
+    def save(self, pending: Iterable[str]) -> None:
+        if not self.path:
+            return
+        pending = sorted(pending)
+        try:
+            if not pending:
+                if os.path.exists(self.path):
+                    os.unlink(self.path)
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".memory_import.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump({"pending": pending}, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"[Memory] Error writing import checkpoint: {e}")
+
+
+class BulkImporter:
+    """Batched, concurrent and resumable import of many conversations."""
+
+    # Estimated tokens and items per embedding request.
+    MAX_BATCH_TOKENS = 8000
+    MAX_BATCH_ITEMS = 256
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        store_batch: Callable[[List[MemoryItem], List[List[float]]], None],
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = 4,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        embed_batch : Callable
+            Embeds a list of texts; called from up to ``concurrency`` threads.
+        store_batch : Callable
+            Upserts items with their vectors; always called from one thread.
+        checkpoint_path : str, optional
+            Where to record chats not fully imported yet.
+        concurrency : int
+            Embedding requests in flight at once.
+        progress_callback : Callable[[int, int, str], None], optional
+            Called with (messages stored, messages total, conversation id).
+        """
+        self._embed_batch = embed_batch
+        self._store_batch = store_batch
+        self._checkpoint = ImportCheckpoint(checkpoint_path)
+        self._concurrency = max(1, concurrency)
+        self._progress = progress_callback
+
+    def resume_ids(self) -> List[str]:
+        """Return the chats left over from an interrupted import."""
+        return self._checkpoint.load()
+
+    def run(
+        self,
+        conversations: Iterable[Tuple[str, List[Dict[str, Any]]]],
+        store_mode: str = "all",
+    ) -> Dict[str, int]:
+        """
+        Import conversations.
+
+        Parameters
+        ----------
+        conversations : iterable of (conversation_id, messages)
+            Chats to import.
+        store_mode : str
+            "all", "user", or "assistant".
+
+        Returns
+        -------
+        dict
+            {"imported": chats, "messages": messages stored}
+        """
+        imported_at = datetime.utcnow().isoformat() + "Z"
+        remaining: Dict[str, int] = {}
+        all_items: List[MemoryItem] = []
+        message_count = 0
+        for conversation_id, messages in conversations:
+            items = conversation_items(conversation_id, messages, store_mode, imported_at)
+            message_count += len(items)
+            chunks = [chunk for item in items for chunk in chunk_item(item)]
+            remaining[conversation_id] = len(chunks)
+            all_items.extend(chunks)
+
+        pending = {chat_id for chat_id, count in remaining.items() if count}
+        self._checkpoint.save(pending)
+        self._report(0, message_count, "")
+
+        batches = pack_batches(all_items, self.MAX_BATCH_TOKENS, self.MAX_BATCH_ITEMS)
+        print(
+            f"[Memory] Importing {message_count} messages ({len(all_items)} chunks) "
+            f"from {len(remaining)} chats in {len(batches)} batches"
+        )
+
+        stored = 0
+        with ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="memory-import") as pool:
+            in_flight = deque()
+            batch_iter = iter(batches)
+
+            def submit_next() -> None:
+                batch = next(batch_iter, None)
+                if batch is not None:
+                    in_flight.append((batch, pool.submit(self._embed_batch, [i.text for i in batch])))
+
+            # Keep a few batches ahead of the writer so embedding requests
+            # overlap with upserts.
+            for _ in range(self._concurrency * 2):
+                submit_next()
+            while in_flight:
+                batch, future = in_flight.popleft()
+                vectors = future.result()
+                submit_next()
+                if len(vectors) != len(batch):
+                    raise RuntimeError(
+                        f"Embedding provider returned {len(vectors)} vectors for {len(batch)} texts"
+                    )
+                self._store_batch(batch, vectors)
+
+                # A message counts as stored with its last chunk.
+                stored += sum(1 for item in batch if item.chunk_index == item.chunk_count - 1)
+                finished = set()
+                for item in batch:
+                    remaining[item.conversation_id] -= 1
+                    if remaining[item.conversation_id] == 0:
+                        finished.add(item.conversation_id)
+                if finished:
+                    pending -= finished
+                    self._checkpoint.save(pending)
+                self._report(stored, message_count, batch[-1].conversation_id)
+
+        self._checkpoint.save(())
+        return {"imported": len(remaining), "messages": stored}
+
+    def _report(self, current: int, total: int, conversation_id: str) -> None:
+        if self._progress:
+            self._progress(current, total, conversation_id)
@@ -0,0 +1,222 @@
+"""
+Chunking of long messages for memory.
+
+One vector for a multi-page answer is a blurred average of everything in
+it, and injecting the whole answer as context costs far more tokens than
+the passage that matched. :func:`chunk_item` splits long messages into
+overlapping chunks along sentence and line boundaries. Each chunk records
+its parent message and character span. At retrieval time,
+:func:`assemble_context` joins the best chunk with its neighbours into a
+bounded excerpt.
+"""
+
+import re
+import uuid
+from dataclasses import replace
+from typing import Dict, Iterable, List, Tuple
+
+from .schema import MemoryItem
+
+
+# Messages longer than this are chunked. A little under the 256-token input
+# limit of the default local model.
+DEFAULT_CHUNK_CHARS = 1000
+# Whole sentences from the end of a chunk are repeated at the start of the
+# next one, up to this many characters.
+DEFAULT_OVERLAP_CHARS = 150
+# Characters of neighbouring text kept on each side of a matched chunk.
+DEFAULT_CONTEXT_CHARS = 300
+
+# A sentence ends after terminal punctuation (and closing quotes/brackets)
+# followed by whitespace; every line break also ends a unit, which keeps
+# code and lists split by line.
+_UNIT_END = re.compile(r"[.!?][\"')\]]*[ \t]+|\n")
+
+
+def split_units(text: str) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` spans of the sentences and lines of ``text``."""
+    spans = []
+    start = 0
+    for match in _UNIT_END.finditer(text):
+        end = match.end()
+        if text[start:end].strip():
+            spans.append((start, end))
+        start = end
+    if text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+def _split_long(text: str, start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """Cut a span longer than ``max_chars`` at whitespace where possible."""
+    spans = []
+    while end - start > max_chars:
+        cut = text.rfind(" ", start + max_chars // 2, start + max_chars)
+        cut = cut + 1 if cut != -1 else start + max_chars
+        spans.append((start, cut))
+        start = cut
+    spans.append((start, end))
+    return spans
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def chunk_spans(
+    text: str,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+) -> List[Tuple[int, int]]:
+    """
+    Split text into overlapping chunks along sentence and line boundaries.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        Character spans of the chunks, in order, with surrounding
+        whitespace excluded. Text within ``max_chars`` is one chunk.
+    """
+    start, end = _strip_span(text, 0, len(text))
+    if end - start <= max_chars:
+        return [(start, end)] if end > start else []
+
+    units = []
+    for unit_start, unit_end in split_units(text):
+        units.extend(_split_long(text, unit_start, unit_end, max_chars))
+
+    spans = []
+    first = 0
+    while first < len(units):
+        last = first
+        while last + 1 < len(units) and units[last + 1][1] - units[first][0] <= max_chars:
+            last += 1
+        spans.append(_strip_span(text, units[first][0], units[last][1]))
+        if last == len(units) - 1:
+            break
+        # Start the next chunk with the trailing sentences that fit in the
+        # overlap, but always move forward.
+        chunk_end = units[last][1]
+        next_first = last + 1
+        while next_first - 1 > first and chunk_end - units[next_first - 1][0] <= overlap_chars:
+            next_first -= 1
+        first = next_first
+    return [span for span in spans if span[1] > span[0]]
+
+
+def chunk_id(parent_id: str, index: int) -> str:
+    """Stable ID of chunk ``index`` of a message."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"chatgtk-memory-chunk:{parent_id}:{index}"))
+
+
+def chunk_item(
+    item: MemoryItem,
+    max_chars: int = DEFAULT_CHUNK_CHARS,
+    overlap_chars: int = DEFAULT_OVERLAP_CHARS,
+) -> List[MemoryItem]:
+    """
+    Return the items to store for a message.
+
+    Messages within ``max_chars`` are returned as they are; longer ones
+    become chunks whose ``parent_id`` is the message's ID.
+    """
+    if len(item.text) <= max_chars:
+        return [item]
+    spans = chunk_spans(item.text, max_chars, overlap_chars)
+    return [
+        replace(
+            item,
+            id=chunk_id(item.id, index),
+            text=item.text[start:end],
+            tags=list(item.tags),
+            parent_id=item.id,
+            chunk_index=index,
+            chunk_count=len(spans),
+            start=start,
+            end=end,
+        )
+        for index, (start, end) in enumerate(spans)
+    ]
+
+
+def neighbour_ids(item: MemoryItem) -> List[str]:
+    """IDs of the chunks directly before and after a chunk."""
+    if not item.parent_id:
+        return []
+    return [
+        chunk_id(item.parent_id, index)
+        for index in (item.chunk_index - 1, item.chunk_index + 1)
+        if 0 <= index < item.chunk_count
+    ]
+
+
+def assemble_context(
+    hits: Iterable[MemoryItem],
+    neighbours: Iterable[MemoryItem] = (),
+    context_chars: int = DEFAULT_CONTEXT_CHARS,
+) -> str:
+    """
+    Build an excerpt of one message from matched chunks and their neighbours.
+
+    Matched chunks are kept whole; neighbouring text is added up to
+    ``context_chars`` on each side of them. Gaps between excerpts are
+    marked with "…".
+
+    Parameters
+    ----------
+    hits : Iterable[MemoryItem]
+        Matched items of one message (whole messages are returned as is).
+    neighbours : Iterable[MemoryItem]
+        Chunks adjacent to the hits.
+    context_chars : int
+        Neighbouring characters to keep around each hit.
+    """
+    hits = list(hits)
+    whole = next((item for item in hits if not item.parent_id), None)
+    if whole is not None:
+        return whole.text
+
+    # Rebuild the covered parts of the message text from chunk offsets.
+    chunks = list(neighbours) + hits
+    chars: Dict[int, str] = {}
+    for chunk in chunks:
+        for offset, char in enumerate(chunk.text):
+            chars.setdefault(chunk.start + offset, char)
+
+    wanted = set()
+    for hit in hits:
+        wanted.update(
+            position
+            for position in range(hit.start - context_chars, hit.start + len(hit.text) + context_chars)
+            if position in chars
+        )
+    positions = sorted(wanted)
+
+    runs = []
+    for previous, position in zip([None] + positions, positions):
+        if previous is None or position != previous + 1:
+            runs.append([position, position])
+        runs[-1][1] = position
+    excerpts = []
+    for run_start, run_end in runs:
+        excerpt = "".join(chars[p] for p in range(run_start, run_end + 1))
+        # Do not start or end an excerpt in the middle of a word.
+        if not chars.get(run_start - 1, " ").isspace():
+            excerpt = re.sub(r"^\S*", "", excerpt)
+        if not chars.get(run_end + 1, " ").isspace():
+            excerpt = re.sub(r"\S*$", "", excerpt)
+        excerpts.append(excerpt.strip())
+    text = " … ".join(excerpt for excerpt in excerpts if excerpt)
+
+    # Mark where the excerpt does not reach the start or end of the message.
+    first = min(chunks, key=lambda chunk: chunk.chunk_index)
+    last = max(chunks, key=lambda chunk: chunk.chunk_index)
+    if first.chunk_index > 0 or positions[0] > first.start:
+        text = "… " + text
+    if last.chunk_index < last.chunk_count - 1 or positions[-1] < last.start + len(last.text) - 1:
+        text += " …"
+    return text
@@ -0,0 +1,268 @@
+"""
+Cache of text embeddings.
+
+Memory retrieval embeds a query built from the last few messages on every
+send, and re-imports embed texts that were embedded before; each of those is
+a remote request for hosted providers. :class:`EmbeddingCache` keeps vectors
+keyed by the embedding *namespace* (provider, model, endpoint, dimension)
+and the SHA-256 of the text: recent ones in an in-memory LRU, all of them in
+an SQLite file whose size is bounded by evicting the least recently used.
+:class:`CachedEmbeddingProvider` puts the cache in front of any
+:class:`EmbeddingProvider`.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .embedding_provider import EmbeddingProvider
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used);
+"""
+
+
+def cache_namespace(mode: str, model: str, dimension: int, endpoint: Optional[str] = None) -> str:
+    """Return the key prefix for embeddings of one provider configuration."""
+    parts = [mode or "", model or "", str(dimension)]
+    if endpoint:
+        parts.append(endpoint.rstrip("/"))
+    return "|".join(parts)
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: in-memory LRU over an SQLite store.
+
+    Vectors are stored as float32. Thread-safe; hit and miss counts are
+    available from :meth:`stats`.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = 200_000,
+        memory_entries: int = 2048,
+    ):
+        """
+        Parameters
+        ----------
+        db_path : Path, optional
+            SQLite file for the persistent level; None keeps only the
+            in-memory level.
+        max_entries : int
+            Entries kept on disk before the least recently used are evicted.
+        memory_entries : int
+            Entries kept in the in-memory LRU.
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_available = self.db_path is not None
+        self._writes_since_trim = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        """Return the cache key of a text within a namespace."""
+        return namespace + "|" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors among ``keys`` (missing keys are absent)."""
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            missing = [key for key in keys if key not in found]
+            if missing:
+                for key, vector in self._disk_get(missing).items():
+                    found[key] = vector
+                    self._remember(key, vector)
+            for key in dict.fromkeys(keys):
+                if key in found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors under their keys."""
+        if not vectors:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            self._disk_put(vectors)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, hit rate and entry counts."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+            }
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    stats["disk_entries"] = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return stats
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -----------------------------------------------------------------------
+    # Internals (lock held)
+    # -----------------------------------------------------------------------
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or not self._disk_available:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except (sqlite3.Error, OSError) as e:
+            print(f"[Memory] Embedding cache on disk unavailable: {e}")
+            self._disk_available = False
+        return self._conn
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        conn = self._connect()
+        if conn is None:
+            return {}
+        found = {}
+        try:
+            # Stay below SQLite's bound-parameter limit.
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                with conn:
+                    conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key in found],
+                    )
+        except sqlite3.Error as e:
+            print(f"[Memory] Embedding cache read failed: {e}")
+        return found
+
+    def _disk_put(self, vectors: Dict[str, List[float]]) -> None:
+        conn = self._connect()
+        if conn is None:
+            return
+        now = time.time()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings(key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()],
+                )
+            self._writes_since_trim += len(vectors)
+            # Counting rows is cheap but not free; trim every so often.
+            if self._writes_since_trim >= max(1, self.max_entries // 100):
+                self._writes_since_trim = 0
+                self._trim(conn)
+        except sqlite3.Error as e:
+            print(f"[Memory] Embedding cache write failed: {e}")
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        with conn:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used, rowid LIMIT ?)",
+                (excess,),
+            )
+        self.evictions += excess
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """Embedding provider that serves repeated texts from an :class:`EmbeddingCache`."""
+
+    def __init__(self, provider: EmbeddingProvider, cache: EmbeddingCache, namespace: str):
+        """
+        Parameters
+        ----------
+        provider : EmbeddingProvider
+            Provider used for texts not in the cache.
+        cache : EmbeddingCache
+            The cache.
+        namespace : str
+            Identifies the provider configuration (see :func:`cache_namespace`).
+        """
+        self.provider = provider
+        self.cache = cache
+        self.namespace = namespace
+
+    @property
+    def dimension(self) -> int:
+        return self.provider.dimension
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.cache.key(self.namespace, text) for text in texts]
+        found = self.cache.get_many(keys)
+
+        # Embed each missing text once, even if it repeats within the batch.
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            miss_texts = list(missing.values())
+            if len(miss_texts) == 1:
+                vectors = [self.provider.embed(miss_texts[0])]
+            else:
+                vectors = self.provider.embed_batch(miss_texts)
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
@@ -5,8 +5,14 @@ Supports local (sentence-transformers) and hosted (OpenAI, Gemini, Cohere) embed
 """
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 import os
+import random
+import threading
+import time
+
+from http_transport import get_http_transport
 
 # Check if local embeddings are available
 LOCAL_EMBEDDINGS_AVAILABLE = False
@@ -33,6 +39,55 @@ EMBEDDING_DIMENSIONS = {
 }
 
 
+# Rough characters-per-token ratio used to size embedding requests.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used to size embedding requests."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_for_embedding(texts: List[str], max_tokens: int, max_items: int) -> List[range]:
+    """
+    Split texts, in order, into index ranges within the request limits.
+
+    A single text over ``max_tokens`` gets a request of its own.
+    """
+    ranges = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if i > start and (tokens + cost > max_tokens or i - start >= max_items):
+            ranges.append(range(start, i))
+            start, tokens = i, 0
+        tokens += cost
+    if start < len(texts):
+        ranges.append(range(start, len(texts)))
+    return ranges
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    """Whether an SDK exception is an HTTP 429 / quota response."""
+    for attr in ("status_code", "code"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    return type(exc).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Return the server's Retry-After hint, if the exception carries one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
 class EmbeddingProvider(ABC):
     """Abstract base class for embedding providers."""
     
@@ -52,6 +107,94 @@ class EmbeddingProvider(ABC):
         return [self.embed(t) for t in texts]
 
 
+# Guards lazy creation of each provider's request pool and semaphore.
+_provider_lock = threading.Lock()
+
+
+class BatchedEmbeddingProvider(EmbeddingProvider):
+    """
+    Base for hosted providers: splits large batches into requests.
+
+    ``embed_batch`` splits texts into requests bounded by estimated tokens
+    and item count, runs up to ``MAX_PARALLEL_REQUESTS`` of them at once
+    (counted across all callers of the provider), retries rate-limited
+    requests with exponential backoff and returns vectors in input order.
+    Subclasses implement :meth:`_embed_request`.
+    """
+    
+    MAX_BATCH_TOKENS = 8000
+    MAX_BATCH_ITEMS = 64
+    MAX_PARALLEL_REQUESTS = 4
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY_SECONDS = 1.0
+    MAX_RETRY_DELAY_SECONDS = 60.0
+    
+    _request_slots: Optional[threading.BoundedSemaphore] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    
+    @abstractmethod
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with one API request."""
+        pass
+    
+    def embed(self, text: str) -> List[float]:
+        return self._request([text])[0]
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        ranges = split_for_embedding(texts, self.MAX_BATCH_TOKENS, self.MAX_BATCH_ITEMS)
+        if len(ranges) == 1:
+            return self._request(list(texts))
+        futures = [
+            self._get_executor().submit(self._request, [texts[i] for i in r])
+            for r in ranges
+        ]
+        vectors: List[List[float]] = []
+        for r, future in zip(ranges, futures):
+            chunk = future.result()
+            if len(chunk) != len(r):
+                raise RuntimeError(f"Embedding request returned {len(chunk)} vectors for {len(r)} texts")
+            vectors.extend(chunk)
+        return vectors
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with _provider_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_PARALLEL_REQUESTS,
+                    thread_name_prefix="embedding-request",
+                )
+            return self._executor
+    
+    def _get_request_slots(self) -> threading.BoundedSemaphore:
+        with _provider_lock:
+            if self._request_slots is None:
+                self._request_slots = threading.BoundedSemaphore(self.MAX_PARALLEL_REQUESTS)
+            return self._request_slots
+    
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        """Run one request, retrying while the provider rate-limits us."""
+        slots = self._get_request_slots()
+        attempt = 0
+        while True:
+            with slots:
+                try:
+                    return self._embed_request(texts)
+                except Exception as e:
+                    if not _is_rate_limited(e) or attempt >= self.MAX_RETRIES:
+                        raise
+                    error = e
+            # Sleep outside the slot so other requests can proceed.
+            delay = _retry_after_seconds(error)
+            if delay is None:
+                delay = self.RETRY_BASE_DELAY_SECONDS * (2 ** attempt) * (1 + random.random() * 0.25)
+            delay = min(delay, self.MAX_RETRY_DELAY_SECONDS)
+            print(f"[Memory] Embedding request rate-limited, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+
 class LocalEmbeddingProvider(EmbeddingProvider):
     """Local embeddings using sentence-transformers."""
     
@@ -78,31 +221,39 @@ class LocalEmbeddingProvider(EmbeddingProvider):
         return [e.tolist() for e in embeddings]
 
 
-class OpenAIEmbeddingProvider(EmbeddingProvider):
+class OpenAIEmbeddingProvider(BatchedEmbeddingProvider):
     """OpenAI embeddings via API."""
     
+    # The API accepts up to 2048 inputs and 300k tokens per request; stay
+    # well inside since token counts here are estimates.
+    MAX_BATCH_TOKENS = 100_000
+    MAX_BATCH_ITEMS = 1024
+    
     def __init__(self, model_name: str = "text-embedding-3-small", api_key: str = None):
         from openai import OpenAI
         self.model_name = model_name
-        self._client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self._client = OpenAI(
+            api_key=api_key or os.environ.get("OPENAI_API_KEY"),
+            **get_http_transport().openai_client_kwargs(),
+        )
         self._dimension = EMBEDDING_DIMENSIONS.get(model_name, 1536)
     
     @property
     def dimension(self) -> int:
         return self._dimension
     
-    def embed(self, text: str) -> List[float]:
-        response = self._client.embeddings.create(input=text, model=self.model_name)
-        return response.data[0].embedding
-    
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
         response = self._client.embeddings.create(input=texts, model=self.model_name)
-        return [d.embedding for d in response.data]
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
 
 
-class GeminiEmbeddingProvider(EmbeddingProvider):
+class GeminiEmbeddingProvider(BatchedEmbeddingProvider):
     """Google Gemini embeddings via API."""
     
+    # batchEmbedContents takes at most 100 texts per call.
+    MAX_BATCH_TOKENS = 20_000
+    MAX_BATCH_ITEMS = 100
+    
     def __init__(self, model_name: str = "text-embedding-004", api_key: str = None):
         import google.generativeai as genai
         self.model_name = model_name
@@ -115,22 +266,23 @@ class GeminiEmbeddingProvider(EmbeddingProvider):
     def dimension(self) -> int:
         return self._dimension
     
-    def embed(self, text: str) -> List[float]:
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        # A list of contents is sent as one batchEmbedContents call.
         result = self._genai.embed_content(
             model=f"models/{self.model_name}",
-            content=text,
+            content=texts,
             task_type="retrieval_document"
         )
         return result['embedding']
-    
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        # Gemini doesn't have native batch, but we can use embed_content with list
-        return [self.embed(t) for t in texts]
 
 
-class CustomEmbeddingProvider(EmbeddingProvider):
+class CustomEmbeddingProvider(BatchedEmbeddingProvider):
     """Custom embeddings via OpenAI-compatible /v1/embeddings endpoint."""
     
+    # Self-hosted servers often have small batch limits; keep requests modest.
+    MAX_BATCH_TOKENS = 8000
+    MAX_BATCH_ITEMS = 32
+    
     def __init__(self, model_name: str, endpoint: str, api_key: str = None, dimension: int = None):
         from openai import OpenAI
         self.model_name = model_name
@@ -138,7 +290,11 @@ class CustomEmbeddingProvider(EmbeddingProvider):
         base_url = endpoint.rstrip('/')
         if not base_url.endswith('/v1'):
             base_url = base_url + '/v1' if not base_url.endswith('/') else base_url + 'v1'
-        self._client = OpenAI(base_url=base_url, api_key=api_key or "dummy")
+        self._client = OpenAI(
+            base_url=base_url,
+            api_key=api_key or "dummy",
+            **get_http_transport().openai_client_kwargs(),
+        )
         # Auto-detect dimension from first embedding if not provided
         self._dimension = dimension or EMBEDDING_DIMENSIONS.get(model_name)
         if self._dimension is None:
@@ -159,13 +315,9 @@ class CustomEmbeddingProvider(EmbeddingProvider):
     def dimension(self) -> int:
         return self._dimension
     
-    def embed(self, text: str) -> List[float]:
-        response = self._client.embeddings.create(input=text, model=self.model_name)
-        return response.data[0].embedding
-    
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def _embed_request(self, texts: List[str]) -> List[List[float]]:
         response = self._client.embeddings.create(input=texts, model=self.model_name)
-        return [d.embedding for d in response.data]
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
 
 
 def get_embedding_provider(
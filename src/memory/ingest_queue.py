@@ -0,0 +1,341 @@
+"""
+Write-behind ingestion queue for memories.
+
+Embedding a message can take a remote round trip, so storing memories inline
+delays every send. :class:`MemoryIngestQueue` takes new :class:`MemoryItem`
+objects immediately and stores them from a worker thread, embedding several
+pending items with one ``embed_batch`` call. Pending items are appended to a
+small JSONL spool file and removed once stored, so memories queued when the
+app exits are ingested on the next start.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .schema import MemoryItem
+
+
+# Exception class names of SDK errors that are worth retrying.
+_TRANSIENT_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted", "TooManyRequests",
+}
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Whether a storage error is likely to pass on retry."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(exc, OSError):
+        # Includes connection errors and timeouts.
+        return True
+    return type(exc).__name__ in _TRANSIENT_ERROR_NAMES
+
+
+class MemoryIngestQueue:
+    """
+    Single worker thread that stores queued memory items in batches.
+
+    ``store_batch`` is called with up to ``MAX_BATCH`` items. Transient
+    failures (network errors, HTTP 408/429/5xx) are retried with
+    exponential backoff; other failures, and batches still failing after
+    ``MAX_ATTEMPTS``, are split to find and drop the items that fail.
+    """
+
+    # Wait this long after the first item so items arriving together share
+    # one embedding request.
+    BATCH_DELAY_SECONDS = 0.5
+    MAX_BATCH = 64
+    MAX_RETRY_DELAY_SECONDS = 300
+    # Attempts of a batch failing with transient errors before its items
+    # are tried separately.
+    MAX_ATTEMPTS = 6
+
+    def __init__(
+        self,
+        store_batch: Callable[[List[MemoryItem]], None],
+        spool_path: Optional[str] = None,
+        name: str = "memory-ingest",
+    ):
+        """
+        Parameters
+        ----------
+        store_batch : Callable[[List[MemoryItem]], None]
+            Embeds and stores a batch of items (runs on the worker thread).
+        spool_path : str, optional
+            JSONL file holding items not yet stored; None keeps them in
+            memory only.
+        name : str
+            Name of the worker thread.
+        """
+        self._store_batch = store_batch
+        self._spool_path = spool_path
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending: List[MemoryItem] = []
+        self._in_flight: List[MemoryItem] = []
+        self._stopping = False
+        self._flushing = 0
+        self._thread: Optional[threading.Thread] = None
+
+        recovered = self._read_spool()
+        if recovered:
+            print(f"[Memory] Resuming {len(recovered)} queued memories from spool")
+            with self._cond:
+                self._pending.extend(recovered)
+                self._ensure_worker()
+
+    def submit(self, item: MemoryItem) -> None:
+        """Queue an item for embedding and storage."""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Memory ingest queue is closed")
+            self._pending.append(item)
+            self._append_spool(item)
+            self._ensure_worker()
+            self._cond.notify_all()
+
+    def discard_conversation(self, conversation_id: str, timeout: Optional[float] = None) -> int:
+        """
+        Drop queued items of a conversation; returns how many were dropped.
+        
+        If a batch being stored holds items of the conversation, this waits
+        for it to finish, so deleting the conversation's stored memories
+        afterwards also removes those items.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        dropped = 0
+        with self._cond:
+            while True:
+                kept = [item for item in self._pending if item.conversation_id != conversation_id]
+                if len(kept) != len(self._pending):
+                    dropped += len(self._pending) - len(kept)
+                    self._pending = kept
+                    self._rewrite_spool()
+                if not any(item.conversation_id == conversation_id for item in self._in_flight):
+                    return dropped
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    print(f"[Memory] Timed out waiting for queued memories of {conversation_id} to be stored")
+                    return dropped
+                # A failed batch is put back into the queue and dropped on
+                # the next pass.
+                self._cond.wait(remaining)
+    
+    def clear(self, timeout: Optional[float] = None) -> bool:
+        """
+        Drop every queued item and wait for the batch in progress.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired before the batch finished.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._pending = []
+            self._rewrite_spool()
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def pending_count(self) -> int:
+        """Return the number of items not yet stored."""
+        with self._cond:
+            return len(self._pending) + len(self._in_flight)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued item is stored.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Stop the worker after the batch in progress.
+
+        Items still queued remain in the spool for the next start.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # -----------------------------------------------------------------------
+    # Worker
+    # -----------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        retry_delay = 1.0
+        failures = 0
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                # Let items that arrive together share a request.
+                batch_deadline = time.monotonic() + self.BATCH_DELAY_SECONDS
+                while len(self._pending) < self.MAX_BATCH and not self._flushing and not self._stopping:
+                    remaining = batch_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+                if not self._pending:
+                    continue
+                batch = self._pending[:self.MAX_BATCH]
+                del self._pending[:len(batch)]
+                self._in_flight = batch
+
+            try:
+                self._store_batch(batch)
+                requeue = []
+            except Exception as e:
+                failures += 1
+                if _is_transient(e) and failures < self.MAX_ATTEMPTS:
+                    print(f"[Memory] Failed to store {len(batch)} queued memories, retrying in {retry_delay:.0f}s: {e}")
+                    requeue = batch
+                else:
+                    # Likely caused by an item (e.g. over the provider's
+                    # input limit); find and drop it instead of blocking
+                    # everything queued behind it.
+                    print(f"[Memory] Failed to store {len(batch)} queued memories, isolating failing items: {e}")
+                    requeue = self._store_bisecting(batch)
+
+            if requeue:
+                with self._cond:
+                    self._pending[:0] = requeue
+                    self._in_flight = []
+                    self._rewrite_spool()
+                    self._cond.notify_all()
+                    self._cond.wait(retry_delay)
+                retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY_SECONDS)
+                continue
+
+            retry_delay = 1.0
+            failures = 0
+            with self._cond:
+                self._in_flight = []
+                self._rewrite_spool()
+                self._cond.notify_all()
+
+    def _store_bisecting(self, items: List[MemoryItem]) -> List[MemoryItem]:
+        """
+        Store a failing batch in halves, dropping items that fail alone.
+
+        Returns
+        -------
+        List[MemoryItem]
+            Items not stored because of a transient error, to retry later.
+        """
+        mid = len(items) // 2
+        parts = [part for part in (items[:mid], items[mid:]) if part]
+        for i, part in enumerate(parts):
+            rest = [item for later in parts[i + 1:] for item in later]
+            try:
+                self._store_batch(part)
+                continue
+            except Exception as e:
+                if _is_transient(e):
+                    return part + rest
+                if len(part) == 1:
+                    print(f"[Memory] Dropping memory {part[0].id} of {part[0].conversation_id}: {e}")
+                    continue
+            left = self._store_bisecting(part)
+            if left:
+                return left + rest
+        return []
+
+    # -----------------------------------------------------------------------
+    # Spool
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _to_record(item: MemoryItem) -> str:
+        return json.dumps({"id": item.id, **item.to_payload()}, ensure_ascii=False)
+
+    def _read_spool(self) -> List[MemoryItem]:
+        if not self._spool_path or not os.path.exists(self._spool_path):
+            return []
+        items = []
+        try:
+            with open(self._spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-append.
+                        continue
+                    items.append(MemoryItem.from_payload(record.pop("id"), record))
+        except (OSError, KeyError) as e:
+            print(f"[Memory] Error reading ingest spool: {e}")
+        return items
+
+    def _append_spool(self, item: MemoryItem) -> None:
+        if not self._spool_path:
+            return
+        try:
+            with open(self._spool_path, "a", encoding="utf-8") as f:
+                f.write(self._to_record(item) + "\n")
+        except OSError as e:
+            print(f"[Memory] Error writing ingest spool: {e}")
+
+    def _rewrite_spool(self) -> None:
+        """Replace the spool with the items still outstanding (lock held)."""
+        if not self._spool_path:
+            return
+        outstanding = self._in_flight + self._pending
+        try:
+            if not outstanding:
+                if os.path.exists(self._spool_path):
+                    os.unlink(self._spool_path)
+                return
+            directory = os.path.dirname(os.path.abspath(self._spool_path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".memory_spool.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for item in outstanding:
+                        f.write(self._to_record(item) + "\n")
+                os.replace(tmp_path, self._spool_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            print(f"[Memory] Error rewriting ingest spool: {e}")
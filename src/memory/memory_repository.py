@@ -8,7 +8,8 @@ import os
 
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
-    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue,
+    FilterSelector
 )
 
 from .schema import MemoryItem
@@ -137,12 +138,30 @@ class MemoryRepository:
         
         return items
     
+    def get_many(self, ids: List[str]) -> List[MemoryItem]:
+        """Return the stored items among ``ids``."""
+        if not ids:
+            return []
+        points = self._client.retrieve(
+            collection_name=self.COLLECTION_NAME,
+            ids=ids,
+            with_payload=True,
+            with_vectors=False
+        )
+        return [MemoryItem.from_payload(p.id, p.payload) for p in points]
+    
     def delete(self, id: str) -> bool:
-        """Delete a memory item by ID."""
+        """Delete a memory item by ID, together with its chunks."""
         self._client.delete(
             collection_name=self.COLLECTION_NAME,
             points_selector=[id]
         )
+        self._client.delete(
+            collection_name=self.COLLECTION_NAME,
+            points_selector=FilterSelector(
+                filter=Filter(must=[FieldCondition(key="parent_id", match=MatchValue(value=id))])
+            )
+        )
         return True
     
     def delete_by_conversation(self, conversation_id: str) -> int:
@@ -2,17 +2,24 @@
 Memory service - business logic for the memory system.
 """
 
+import os
 from typing import List, Optional, Callable, Dict, Any
-from datetime import datetime
 
 from .schema import MemoryItem
 from .memory_repository import MemoryRepository
+from .ingest_queue import MemoryIngestQueue
+from .bulk_import import BulkImporter, conversation_items
+from .chunker import assemble_context, chunk_item, neighbour_ids
+from .embedding_cache import CachedEmbeddingProvider, EmbeddingCache, cache_namespace
 from .embedding_provider import EmbeddingProvider, get_embedding_provider, get_dimension_for_model
 
 
 class MemoryService:
     """Service for managing conversation memories."""
     
+    # Matching chunks of one message included in the LLM context.
+    CONTEXT_CHUNKS_PER_MEMORY = 2
+    
     def __init__(
         self,
         db_path: str,
@@ -48,15 +55,36 @@ class MemoryService:
         """
         self.event_bus = event_bus
         self.settings_manager = settings_manager
+        self._embedding_mode = embedding_mode
+        self._import_checkpoint_path = f"{db_path.rstrip(os.sep)}.import.json"
         
-        # Initialize embedding provider
-        self._provider = get_embedding_provider(
+        # Initialize embedding provider, behind a cache so repeated texts
+        # (queries, re-imports) are not embedded again
+        provider = get_embedding_provider(
             embedding_mode, embedding_model, api_key,
             endpoint=endpoint, dimension=dimension
         )
+        self._embedding_cache = EmbeddingCache(f"{db_path.rstrip(os.sep)}.embeddings.sqlite3")
+        self._provider = CachedEmbeddingProvider(
+            provider,
+            self._embedding_cache,
+            cache_namespace(
+                embedding_mode,
+                getattr(provider, "model_name", embedding_model),
+                provider.dimension,
+                endpoint,
+            ),
+        )
         
         # Initialize repository with correct vector size
         self._repository = MemoryRepository(db_path, self._provider.dimension)
+        
+        # New memories are embedded and stored in the background; the spool
+        # next to the database keeps them across restarts.
+        self._ingest_queue = MemoryIngestQueue(
+            self._store_batch,
+            spool_path=f"{db_path.rstrip(os.sep)}.pending.jsonl",
+        )
     
     def add_memory(
         self,
@@ -66,27 +94,40 @@ class MemoryService:
         tags: List[str] = None
     ) -> str:
         """
-        Add a memory item.
+        Queue a memory item for embedding and storage.
         
-        Returns the ID of the created memory.
+        Returns immediately with the ID the memory will be stored under; use
+        :meth:`flush` to wait until queued memories are searchable.
         """
         if not text or not text.strip():
             return None
         
         item = MemoryItem.create(text, role, conversation_id, tags)
-        vector = self._provider.embed(text)
-        self._repository.add(item, vector)
-        
-        print(f"[Memory] Stored {role} message ({len(text)} chars) from conversation {conversation_id[:20]}...")
+        self._ingest_queue.submit(item)
+        return item.id
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued memories are stored; False on timeout."""
+        return self._ingest_queue.flush(timeout)
+    
+    def _store_batch(self, items: List[MemoryItem]) -> None:
+        """Embed and upsert queued items (runs on the ingest worker)."""
+        chunks = [chunk for item in items for chunk in chunk_item(item)]
+        vectors = self._provider.embed_batch([chunk.text for chunk in chunks])
+        self._repository.add_batch(chunks, vectors)
+        
+        print(
+            f"[Memory] Stored {len(items)} queued message(s) as {len(chunks)} chunk(s) "
+            f"({sum(len(i.text) for i in items)} chars)"
+        )
         
         if self.event_bus:
             from events import EventType, Event
-            self.event_bus.publish(Event(
-                type=EventType.MEMORY_ADDED,
-                data={"id": item.id, "conversation_id": conversation_id}
-            ))
-        
-        return item.id
+            for item in items:
+                self.event_bus.publish(Event(
+                    type=EventType.MEMORY_ADDED,
+                    data={"id": item.id, "conversation_id": item.conversation_id}
+                ))
     
     def query_memory(
         self,
@@ -137,11 +178,17 @@ class MemoryService:
         """
         Get formatted memory context for injection into LLM prompt.
         
+        Long messages are stored as chunks; each of the ``k`` best-matching
+        messages is represented by its matching chunks plus some text of
+        the neighbouring chunks.
+        
         Returns empty string if no relevant memories found.
         """
+        # Several chunks of one message can match; fetch extra so k
+        # distinct messages remain after grouping.
         results = self.query_memory(
             query_text,
-            k=k,
+            k=k * 3,
             min_score=min_score,
             exclude_conversation_id=exclude_conversation_id
         )
@@ -149,12 +196,28 @@ class MemoryService:
         if not results:
             return ""
         
-        lines = ["[Retrieved from past conversations:]"]
+        groups: Dict[str, List[MemoryItem]] = {}
         for item, score in results:
-            role_label = "User" if item.role == "user" else "Assistant"
-            # Don't truncate with ... if text is short
-            text_preview = item.text[:500] + "..." if len(item.text) > 500 else item.text
-            lines.append(f"- {role_label}: {text_preview}")
+            hits = groups.get(item.source_id)
+            if hits is None and len(groups) < k:
+                groups[item.source_id] = [item]
+            elif hits is not None and len(hits) < self.CONTEXT_CHUNKS_PER_MEMORY:
+                hits.append(item)
+        
+        hit_ids = {item.id for hits in groups.values() for item in hits}
+        wanted = [
+            chunk_id for hits in groups.values() for item in hits
+            for chunk_id in neighbour_ids(item) if chunk_id not in hit_ids
+        ]
+        neighbours: Dict[str, List[MemoryItem]] = {}
+        for chunk in self._repository.get_many(list(dict.fromkeys(wanted))):
+            neighbours.setdefault(chunk.source_id, []).append(chunk)
+        
+        lines = ["[Retrieved from past conversations:]"]
+        for source_id, hits in groups.items():
+            role_label = "User" if hits[0].role == "user" else "Assistant"
+            text = assemble_context(hits, neighbours.get(source_id, []))
+            lines.append(f"- {role_label}: {text}")
         
         return "\n".join(lines)
     
@@ -173,10 +236,14 @@ class MemoryService:
     
     def delete_conversation_memories(self, conversation_id: str) -> int:
         """Delete all memories for a conversation. Returns count deleted."""
-        return self._repository.delete_by_conversation(conversation_id)
+        # Waits for a batch of this conversation being stored, so the
+        # delete below also covers it.
+        dropped = self._ingest_queue.discard_conversation(conversation_id, timeout=10)
+        return dropped + self._repository.delete_by_conversation(conversation_id)
     
     def clear_all_memories(self) -> None:
         """Delete all memories."""
+        self._ingest_queue.clear(timeout=10)
         self._repository.delete_all()
         
         if self.event_bus:
@@ -214,43 +281,14 @@ class MemoryService:
         int
             Number of messages imported
         """
-        items = []
-        texts = []
-        now = datetime.utcnow().isoformat() + "Z"
-        
-        for msg in messages:
-            role = msg.get("role", "")
-            content = msg.get("content", "")
-            
-            # Skip system messages and empty content
-            if role == "system" or not content or not content.strip():
-                continue
-            
-            # Filter by store_mode
-            if store_mode == "user" and role != "user":
-                continue
-            if store_mode == "assistant" and role != "assistant":
-                continue
-            
-            # Handle content that might be a list (vision messages)
-            if isinstance(content, list):
-                text_parts = [p.get("text", "") for p in content if p.get("type") == "text"]
-                content = " ".join(text_parts)
-            
-            if not content.strip():
-                continue
-            
-            item = MemoryItem.create(content, role, conversation_id)
-            item.imported_at = now
-            items.append(item)
-            texts.append(content)
-        
+        items = conversation_items(conversation_id, messages, store_mode)
         if not items:
             return 0
         
         # Batch embed and store
-        vectors = self._provider.embed_batch(texts)
-        self._repository.add_batch(items, vectors)
+        chunks = [chunk for item in items for chunk in chunk_item(item)]
+        vectors = self._provider.embed_batch([chunk.text for chunk in chunks])
+        self._repository.add_batch(chunks, vectors)
         
         return len(items)
     
@@ -263,6 +301,10 @@ class MemoryService:
         """
         Import all existing conversations from history.
         
+        Messages from all chats are embedded in batches, several at a time;
+        an interrupted import resumes with the chats it had not finished.
+        Chats already in memory are skipped.
+        
         Parameters
         ----------
         history_repo : ChatHistoryRepository
@@ -270,36 +312,48 @@ class MemoryService:
         store_mode : str
             "all", "user", or "assistant"
         progress_callback : Callable
-            Called with (current, total, conversation_id) for progress updates
+            Called with (messages stored, messages to store, conversation_id)
+            as batches are stored
         
         Returns
         -------
         dict
             {"imported": n, "skipped": n, "messages": n}
         """
+        importer = BulkImporter(
+            self._provider.embed_batch,
+            self._repository.add_batch,
+            checkpoint_path=self._import_checkpoint_path,
+            # A local model already uses every core; hosted APIs benefit
+            # from several requests in flight.
+            concurrency=1 if self._embedding_mode == "local" else 4,
+            progress_callback=lambda current, total, chat_id: self._import_progress(
+                progress_callback, current, total, chat_id
+            ),
+        )
         existing_ids = self._repository.get_conversation_ids()
-        all_chats = history_repo.list_all()
+        resume_ids = set(importer.resume_ids())
+        if resume_ids:
+            print(f"[Memory] Resuming interrupted import of {len(resume_ids)} chats")
         
-        imported = 0
         skipped = 0
-        total_messages = 0
-        
-        for i, chat_id in enumerate(all_chats):
-            if progress_callback:
-                progress_callback(i, len(all_chats), chat_id)
-            
-            if chat_id in existing_ids:
-                skipped += 1
-                continue
-            
-            history = history_repo.get(chat_id)
-            if history:
-                count = self.import_conversation(chat_id, history, store_mode)
-                total_messages += count
-                imported += 1
         
-        if progress_callback:
-            progress_callback(len(all_chats), len(all_chats), "")
+        def conversations():
+            nonlocal skipped
+            for meta in history_repo.list_all():
+                chat_id = getattr(meta, "chat_id", meta)
+                # Chats of an interrupted run may be partly stored; importing
+                # them again overwrites the same memory IDs.
+                if chat_id in existing_ids and chat_id not in resume_ids:
+                    skipped += 1
+                    continue
+                history = history_repo.get(chat_id)
+                if history:
+                    messages = history.to_list() if hasattr(history, "to_list") else history
+                    yield chat_id, messages
+        
+        result = importer.run(conversations(), store_mode)
+        imported, total_messages = result["imported"], result["messages"]
         
         if self.event_bus:
             from events import EventType, Event
@@ -310,11 +364,33 @@ class MemoryService:
         
         return {"imported": imported, "skipped": skipped, "messages": total_messages}
     
+    def _import_progress(
+        self,
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        current: int,
+        total: int,
+        conversation_id: str
+    ) -> None:
+        if progress_callback:
+            progress_callback(current, total, conversation_id)
+        if self.event_bus:
+            from events import EventType, Event
+            self.event_bus.publish(Event(
+                type=EventType.MEMORY_IMPORT_PROGRESS,
+                data={"current": current, "total": total, "conversation_id": conversation_id}
+            ))
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get memory database statistics."""
-        return self._repository.get_stats()
+        stats = self._repository.get_stats()
+        stats["pending"] = self._ingest_queue.pending_count()
+        stats["embedding_cache"] = self._embedding_cache.stats()
+        return stats
     
     def close(self):
         """Close the memory service and release resources."""
+        # Anything still queued stays in the spool for the next start.
+        self._ingest_queue.close()
+        self._embedding_cache.close()
         if self._repository:
             self._repository.close()
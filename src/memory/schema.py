@@ -18,13 +18,20 @@ class MemoryItem:
     conversation_id: str
     tags: List[str] = field(default_factory=list)
     imported_at: Optional[str] = None  # Set during bulk import
+    # Set on chunks of a long message: the message's ID, the chunk's
+    # position and its character span within the message text.
+    parent_id: Optional[str] = None
+    chunk_index: int = 0
+    chunk_count: int = 1
+    start: int = 0
+    end: Optional[int] = None
     
     @classmethod
     def create(cls, text: str, role: str, conversation_id: str, 
-               tags: List[str] = None) -> "MemoryItem":
+               tags: List[str] = None, id: Optional[str] = None) -> "MemoryItem":
         """Factory method to create a new MemoryItem with generated ID and timestamp."""
         return cls(
-            id=str(uuid.uuid4()),
+            id=id or str(uuid.uuid4()),
             text=text,
             role=role,
             timestamp=datetime.utcnow().isoformat() + "Z",
@@ -32,9 +39,14 @@ class MemoryItem:
             tags=tags or [],
         )
     
+    @property
+    def source_id(self) -> str:
+        """ID of the message this item was taken from."""
+        return self.parent_id or self.id
+    
     def to_payload(self) -> dict:
         """Convert to Qdrant payload format."""
-        return {
+        payload = {
             "text": self.text,
             "role": self.role,
             "timestamp": self.timestamp,
@@ -42,6 +54,15 @@ class MemoryItem:
             "tags": self.tags,
             "imported_at": self.imported_at,
         }
+        if self.parent_id:
+            payload.update({
+                "parent_id": self.parent_id,
+                "chunk_index": self.chunk_index,
+                "chunk_count": self.chunk_count,
+                "start": self.start,
+                "end": self.end,
+            })
+        return payload
     
     @classmethod
     def from_payload(cls, id: str, payload: dict) -> "MemoryItem":
@@ -54,4 +75,9 @@ class MemoryItem:
             conversation_id=payload.get("conversation_id", ""),
             tags=payload.get("tags", []),
             imported_at=payload.get("imported_at"),
+            parent_id=payload.get("parent_id"),
+            chunk_index=payload.get("chunk_index", 0),
+            chunk_count=payload.get("chunk_count", 1),
+            start=payload.get("start", 0),
+            end=payload.get("end"),
         )
@@ -7,6 +7,7 @@ to improve code organization and testability.
 
 from dataclasses import dataclass
 from typing import Callable, List, Optional, Any
+import math
 import re
 import getpass
 
@@ -68,6 +69,9 @@ class MessageRenderer:
         self._raw_message_text_by_index = {}
         self._raw_blocks_by_index = {}
         self._suppress_scroll = False
+        # Windowed rendering: placeholders are realized when scrolled near.
+        self._watched_adjustment = None
+        self._realize_pending = False
 
     def update_chat_id(self, chat_id: str):
         """Update the current chat ID for image paths."""
@@ -78,10 +82,7 @@ class MessageRenderer:
         if self._suppress_scroll:
             return
         def do_scroll():
-            # Find the ScrolledWindow ancestor
-            sw = self.conversation_box
-            while sw and not isinstance(sw, Gtk.ScrolledWindow):
-                sw = sw.get_parent()
+            sw = self._get_scrolled_window()
             if not sw:
                 return False
             
@@ -98,6 +99,13 @@ class MessageRenderer:
         # Wait for layout to complete
         GLib.timeout_add(50, do_scroll)
 
+    def _get_scrolled_window(self) -> Optional[Gtk.ScrolledWindow]:
+        """Return the ScrolledWindow ancestor of the conversation box."""
+        sw = self.conversation_box
+        while sw and not isinstance(sw, Gtk.ScrolledWindow):
+            sw = sw.get_parent()
+        return sw
+
     def set_scroll_suppressed(self, suppressed: bool) -> None:
         """Control auto-scrolling when appending messages."""
         self._suppress_scroll = bool(suppressed)
@@ -203,6 +211,22 @@ class MessageRenderer:
 
     def append_user_message(self, raw_text: str, message_index: int):
         """Add a user message as a styled box with markdown support."""
+        self._pack_message(self._build_user_message(raw_text, message_index))
+
+    def append_ai_message(self, raw_text: str, message_index: int):
+        """Add an AI message with code blocks, tables, and images."""
+        self._pack_message(self._build_ai_message(raw_text, message_index))
+
+    def _pack_message(self, widget: Gtk.Widget) -> None:
+        """Pack a built message widget at the end of the conversation."""
+        self.conversation_box.pack_start(widget, False, False, 0)
+        self.message_widgets.append(widget)
+        self.conversation_box.show_all()
+
+        self._scroll_to_widget(widget)
+
+    def _build_user_message(self, raw_text: str, message_index: int) -> Gtk.Widget:
+        """Build the widget for a user message."""
         formatted_text = format_response(raw_text)
         raw_blocks = self._split_raw_blocks(raw_text)
         self._raw_message_text_by_index[message_index] = raw_text
@@ -254,15 +278,10 @@ class MessageRenderer:
             return False
 
         event_box.connect("button-press-event", on_button_press)
-        
-        self.conversation_box.pack_start(event_box, False, False, 0)
-        self.message_widgets.append(event_box)
-        self.conversation_box.show_all()
-        
-        self._scroll_to_widget(event_box)
+        return event_box
 
-    def append_ai_message(self, raw_text: str, message_index: int):
-        """Add an AI message with code blocks, tables, and images."""
+    def _build_ai_message(self, raw_text: str, message_index: int) -> Gtk.Widget:
+        """Build the widget for an AI message."""
         formatted_text = format_response(raw_text)
         raw_blocks = self._split_raw_blocks(raw_text)
         self._raw_message_text_by_index[message_index] = raw_text
@@ -350,12 +369,147 @@ class MessageRenderer:
             return False
 
         response_container.connect("button-press-event", on_response_button_press)
+        return response_container
 
-        self.conversation_box.pack_start(response_container, False, False, 0)
-        self.message_widgets.append(response_container)
-        self.conversation_box.show_all()
-        
-        self._scroll_to_widget(response_container)
+    # -----------------------------------------------------------------------
+    # Windowed rendering
+    # -----------------------------------------------------------------------
+
+    # Pixels above and below the viewport that are rendered ahead of scrolling.
+    PLACEHOLDER_MARGIN = 1000
+    # Placeholders rendered per idle pass, so back-filling never blocks a frame
+    # for long.
+    PLACEHOLDER_BATCH = 6
+
+    def append_placeholder(self, sender: str, text: str, message_index: int):
+        """
+        Append a lightweight stand-in for a message that is rendered later.
+
+        The placeholder reserves an estimated height so the scrollbar and
+        message navigation behave as if the message were present; it is
+        replaced in place by the real widget once it comes near the viewport.
+        """
+        placeholder = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        placeholder.set_size_request(-1, self.estimate_message_height(text))
+        placeholder.message_index = message_index
+        placeholder.placeholder_message = (sender, text)
+        self._raw_message_text_by_index[message_index] = text
+
+        self.conversation_box.pack_start(placeholder, False, False, 0)
+        self.message_widgets.append(placeholder)
+        placeholder.show()
+        self._watch_scrolling()
+
+    def estimate_message_height(self, text: str) -> int:
+        """Estimate the rendered height in pixels of a message's text."""
+        font_px = self.settings.font_size * 96 / 72
+        line_height = font_px * 1.4
+        width = self.conversation_box.get_allocated_width()
+        if width <= 1:
+            width = 800
+        chars_per_line = max(20, int((width - 60) / (font_px * 0.55)))
+        lines = 0
+        for line in (text or "").splitlines() or [""]:
+            lines += max(1, math.ceil(len(line) / chars_per_line))
+        images = len(re.findall(r'<img\s|!\[', text or ""))
+        # Header, padding and spacing around the content, plus images.
+        return int(60 + lines * line_height + images * 300)
+
+    def has_placeholders(self) -> bool:
+        """Return True while any message is still a placeholder."""
+        return any(hasattr(w, "placeholder_message") for w in self.message_widgets)
+
+    def realize_visible_placeholders(self) -> bool:
+        """
+        Render placeholders that lie within the viewport or its margin.
+
+        Keeps the first visible message at the same on-screen position so
+        back-filling above the viewport does not make the content jump.
+        Schedules another pass while nearby placeholders remain.
+        """
+        self._realize_pending = False
+        sw = self._get_scrolled_window()
+        if not sw:
+            return False
+        adj = sw.get_vadjustment()
+        top = adj.get_value()
+        bottom = top + adj.get_page_size()
+        low = top - self.PLACEHOLDER_MARGIN
+        high = bottom + self.PLACEHOLDER_MARGIN
+
+        anchor = None
+        anchor_offset = 0
+        nearby = []
+        for widget in self.message_widgets:
+            result = widget.translate_coordinates(self.conversation_box, 0, 0)
+            if not result:
+                continue
+            y = result[1]
+            end = y + widget.get_allocated_height()
+            if anchor is None and end > top:
+                anchor, anchor_offset = widget, y - top
+            if hasattr(widget, "placeholder_message") and end >= low and y <= high:
+                distance = 0 if (end >= top and y <= bottom) else min(abs(y - bottom), abs(end - top))
+                nearby.append((distance, widget))
+        if not nearby:
+            return False
+
+        nearby.sort(key=lambda item: item[0])
+        for _distance, placeholder in nearby[:self.PLACEHOLDER_BATCH]:
+            realized = self._realize_placeholder(placeholder)
+            if placeholder is anchor:
+                anchor = realized
+
+        def restore_anchor():
+            # No anchor when nothing ended below the scroll position (e.g.
+            # mid-relayout); there is then no position to keep.
+            if anchor is None:
+                self._schedule_placeholder_pass()
+                return False
+            result = anchor.translate_coordinates(self.conversation_box, 0, 0)
+            if result:
+                adj.set_value(max(0, result[1] - anchor_offset))
+            self._schedule_placeholder_pass()
+            return False
+
+        # Runs after the relayout of the newly realized widgets.
+        GLib.idle_add(restore_anchor)
+        return False
+
+    def _realize_placeholder(self, placeholder: Gtk.Widget) -> Gtk.Widget:
+        """Replace a placeholder with its fully rendered message widget."""
+        sender, text = placeholder.placeholder_message
+        message_index = self._resolve_message_index(placeholder)
+        if sender == 'user':
+            widget = self._build_user_message(text, message_index)
+        else:
+            widget = self._build_ai_message(text, message_index)
+
+        position = self.conversation_box.get_children().index(placeholder)
+        self.conversation_box.pack_start(widget, False, False, 0)
+        self.conversation_box.reorder_child(widget, position)
+        self.message_widgets[self.message_widgets.index(placeholder)] = widget
+        placeholder.destroy()
+        widget.show_all()
+        return widget
+
+    def _watch_scrolling(self) -> None:
+        """Connect once to the conversation's scroll adjustment."""
+        sw = self._get_scrolled_window()
+        if not sw:
+            return
+        adj = sw.get_vadjustment()
+        if adj is self._watched_adjustment:
+            return
+        self._watched_adjustment = adj
+        adj.connect("value-changed", lambda _adj: self._schedule_placeholder_pass())
+        adj.connect("changed", lambda _adj: self._schedule_placeholder_pass())
+
+    def _schedule_placeholder_pass(self) -> None:
+        if self._realize_pending or not self.has_placeholders():
+            return
+        self._realize_pending = True
+        GLib.idle_add(self.realize_visible_placeholders)
 
     def _message_has_text_edits(self, message_index: int) -> bool:
         try:
@@ -127,6 +127,7 @@ def _create_card_from_override(model_id: str, override: dict) -> ModelCard:
         temperature=override.get("temperature"),
         capabilities=caps,
         max_tokens=override.get("max_tokens"),
+        max_image_edge=override.get("max_image_edge"),
         quirks=override.get("quirks", {}),
         key_name=override.get("key_name"),
     )
@@ -182,6 +183,7 @@ def _synthesize_card_from_custom(model_id: str, cfg: dict) -> ModelCard:
         base_url=cfg.get("endpoint"),
         voice=voice,  # Voice for TTS models
         capabilities=caps,
+        max_image_edge=cfg.get("max_image_edge"),
         key_name=model_id,  # Custom models use their own key
     )
 
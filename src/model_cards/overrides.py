@@ -138,6 +138,7 @@ def apply_override_to_card(card: ModelCard, override: Dict[str, Any]) -> ModelCa
     new_image_sizes = set(override.get("image_sizes", list(card.image_sizes)))
     new_supported_file_types = set(override.get("supported_file_types", list(card.supported_file_types)))
     new_max_images = override.get("max_images_per_message", card.max_images_per_message)
+    new_max_image_edge = override.get("max_image_edge", card.max_image_edge)
     
     return ModelCard(
         id=card.id,
@@ -149,6 +150,7 @@ def apply_override_to_card(card: ModelCard, override: Dict[str, Any]) -> ModelCa
         temperature=new_temperature,
         max_tokens=new_max_tokens,
         max_images_per_message=new_max_images,
+        max_image_edge=new_max_image_edge,
         supported_file_types=new_supported_file_types,
         image_sizes=new_image_sizes,
         quirks=new_quirks,
@@ -181,4 +183,5 @@ def card_to_override_dict(card: ModelCard) -> Dict[str, Any]:
         },
         "quirks": card.quirks,
         "max_tokens": card.max_tokens,
+        "max_image_edge": card.max_image_edge,
     }
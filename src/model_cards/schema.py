@@ -24,6 +24,16 @@ class Capabilities:
     image_edit: bool = False
 
 
+# Longest image edge (pixels) each provider's vision models work at. Images
+# larger than this are downscaled by the provider anyway, so they can be
+# shrunk before upload without changing what the model sees.
+DEFAULT_MAX_IMAGE_EDGE: Dict[str, int] = {
+    "openai": 2048,
+    "claude": 1568,
+    "gemini": 3072,
+}
+
+
 @dataclass
 class ModelCard:
     """
@@ -50,6 +60,7 @@ class ModelCard:
     temperature: Optional[float] = None          # Optional temperature override
     max_tokens: Optional[int] = None
     max_images_per_message: Optional[int] = None
+    max_image_edge: Optional[int] = None        # Downscale attached images to this edge (pixels)
     supported_file_types: Set[str] = field(default_factory=set)
     image_sizes: Set[str] = field(default_factory=set)  # e.g., {"1024x1024", "1792x1024"}
 
@@ -75,3 +86,9 @@ class ModelCard:
     def get_display_name(self) -> str:
         """Return the display name, falling back to the model ID."""
         return self.display_name or self.id
+
+    def get_max_image_edge(self) -> Optional[int]:
+        """Return the image edge limit, falling back to the provider default (None: no limit)."""
+        if self.max_image_edge:
+            return self.max_image_edge
+        return DEFAULT_MAX_IMAGE_EDGE.get(self.provider)
@@ -7,20 +7,26 @@ and retrieval operations, separating data access concerns from business logic.
 
 from .base import Repository
 from .chat_history_repository import ChatHistoryRepository
+from .blob_store import BlobStore, get_blob_store, image_base64
 from .settings_repository import SettingsRepository
 from .api_keys_repository import APIKeysRepository, KeyringAPIKeysRepository, KEYRING_AVAILABLE
 from .model_cache_repository import ModelCacheRepository
+from .file_id_cache_repository import FileIdCacheRepository
 from .projects_repository import ProjectsRepository, Project, PROJECTS_DIR
 from .document_repository import DocumentRepository, Document, DocumentMetadata
 
 __all__ = [
     'Repository',
     'ChatHistoryRepository',
+    'BlobStore',
+    'get_blob_store',
+    'image_base64',
     'SettingsRepository',
     'APIKeysRepository',
     'KeyringAPIKeysRepository',
     'KEYRING_AVAILABLE',
     'ModelCacheRepository',
+    'FileIdCacheRepository',
     'ProjectsRepository',
     'Project',
     'PROJECTS_DIR',
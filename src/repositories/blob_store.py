@@ -0,0 +1,344 @@
+"""
+Content-addressed storage for image attachments.
+
+Attachment bytes are stored once, under their SHA-256 digest, in
+``<HISTORY_DIR>/.blobs``; chats reference them from ``images[]`` entries
+as ``{"blob": <digest>, "mime_type": ...}`` instead of carrying inline
+base64 ``data``. A single store is shared by the default history and all
+projects (see :func:`get_blob_store`), so the same picture attached in
+several chats is kept on disk once.
+
+Each chat snapshot that references blobs is an *owner*. The store keeps
+the set of digests per owner in ``refs.json``; a blob whose reference
+count drops to zero is deleted, unless it was stored or re-used within the
+last ``GC_GRACE_SECONDS`` (it may belong to a message that has not been
+saved yet). :meth:`BlobStore.collect_garbage` additionally forgets owners
+whose snapshot no longer exists and sweeps unreferenced blob files.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import HISTORY_DIR
+from encoding_cache import get_encoding_cache
+
+
+BLOB_DIRNAME = ".blobs"
+REFS_FILENAME = "refs.json"
+REFS_VERSION = 1
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """
+    SHA-256 keyed blob files with per-owner reference tracking.
+
+    Base64 encodings of blobs are memoized in the shared encoding cache.
+    """
+
+    # Unreferenced blobs younger than this are kept.
+    GC_GRACE_SECONDS = 3600
+
+    def __init__(self, root: Path):
+        """
+        Parameters
+        ----------
+        root : Path
+            Directory holding the blob files and ``refs.json``.
+        """
+        self.root = Path(root)
+        self._lock = threading.RLock()
+        self._owners: Optional[Dict[str, Set[str]]] = None
+        self._counts: Dict[str, int] = {}
+
+    # -----------------------------------------------------------------------
+    # Blobs
+    # -----------------------------------------------------------------------
+
+    def put(self, data: bytes) -> str:
+        """Store bytes (if not already present) and return their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        with self._lock:
+            if path.exists():
+                # Re-used: restart the grace period.
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return digest
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(path, data)
+        return digest
+
+    def put_base64(self, encoded: str) -> str:
+        """Store base64 text and return the digest of the decoded bytes."""
+        return self.put(base64.b64decode(encoded))
+
+    def path(self, digest: str) -> Path:
+        """Return the file path of a blob."""
+        if not _DIGEST_RE.match(digest or ""):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        """Return True if the blob is stored."""
+        try:
+            return self.path(digest).exists()
+        except ValueError:
+            return False
+
+    def read(self, digest: str) -> bytes:
+        """Return a blob's bytes."""
+        with open(self.path(digest), "rb") as f:
+            return f.read()
+
+    def read_base64(self, digest: str) -> str:
+        """Return a blob's bytes as base64 text, memoized."""
+        return get_encoding_cache().base64_file(self.path(digest))
+
+    # -----------------------------------------------------------------------
+    # References
+    # -----------------------------------------------------------------------
+
+    def ref_count(self, digest: str) -> int:
+        """Return the number of owners referencing a blob."""
+        with self._lock:
+            self._load_refs()
+            return self._counts.get(digest, 0)
+
+    def owned(self, owner: str) -> Set[str]:
+        """Return the digests referenced by an owner."""
+        with self._lock:
+            self._load_refs()
+            return set(self._owners.get(owner, ()))
+
+    def set_refs(self, owner: str, digests: Iterable[str]) -> None:
+        """
+        Replace the set of blobs referenced by an owner.
+
+        Blobs no longer referenced by anyone are deleted (outside the grace
+        period).
+        """
+        self._set_refs(owner, digests)
+
+    def _set_refs(self, owner: str, digests: Iterable[str]) -> int:
+        """Replace an owner's references; returns the number of blobs deleted."""
+        new = {d for d in digests if _DIGEST_RE.match(d or "")}
+        with self._lock:
+            self._load_refs()
+            old = self._owners.get(owner, set())
+            if new == old:
+                return 0
+            if new:
+                self._owners[owner] = new
+            else:
+                self._owners.pop(owner, None)
+            for digest in new - old:
+                self._counts[digest] = self._counts.get(digest, 0) + 1
+            released = []
+            for digest in old - new:
+                count = self._counts.get(digest, 0) - 1
+                if count > 0:
+                    self._counts[digest] = count
+                else:
+                    self._counts.pop(digest, None)
+                    released.append(digest)
+            self._save_refs()
+            return sum(1 for digest in released if self._delete_if_expired(digest))
+
+    def release(self, owner: str) -> None:
+        """Drop every reference held by an owner."""
+        self.set_refs(owner, ())
+
+    def rename_owner(self, old_owner: str, new_owner: str) -> None:
+        """Move an owner's references to a new key (e.g. a moved chat)."""
+        if old_owner == new_owner:
+            return
+        with self._lock:
+            self._load_refs()
+            digests = self._owners.get(old_owner)
+            if not digests:
+                return
+            self.set_refs(new_owner, digests)
+            self.release(old_owner)
+
+    def copy_owner(self, source_owner: str, new_owner: str) -> None:
+        """Give a new owner the same references as an existing one."""
+        with self._lock:
+            self._load_refs()
+            digests = self._owners.get(source_owner)
+            if digests:
+                self.set_refs(new_owner, digests)
+
+    def collect_garbage(self) -> int:
+        """
+        Forget owners whose file is gone and delete unreferenced blobs.
+
+        Returns
+        -------
+        int
+            Number of blob files removed.
+        """
+        with self._lock:
+            self._load_refs()
+            missing = [owner for owner in self._owners if not os.path.exists(owner)]
+            removed = 0
+            for owner in missing:
+                removed += self._set_refs(owner, ())
+            if not self.root.is_dir():
+                return removed
+            for path in self.root.glob("??/*"):
+                digest = path.name
+                if not _DIGEST_RE.match(digest) or self._counts.get(digest):
+                    continue
+                if self._delete_if_expired(digest):
+                    removed += 1
+            return removed
+
+    def _delete_if_expired(self, digest: str) -> bool:
+        path = self.path(digest)
+        try:
+            if time.time() - path.stat().st_mtime < self.GC_GRACE_SECONDS:
+                return False
+            path.unlink()
+        except OSError:
+            return False
+        return True
+
+    def _load_refs(self) -> None:
+        if self._owners is not None:
+            return
+        self._owners = {}
+        try:
+            with open(self.root / REFS_FILENAME, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            owners = data.get("owners", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            owners = {}
+        for owner, digests in owners.items():
+            if isinstance(digests, list) and digests:
+                self._owners[owner] = set(digests)
+        self._counts = {}
+        for digests in self._owners.values():
+            for digest in digests:
+                self._counts[digest] = self._counts.get(digest, 0) + 1
+
+    def _save_refs(self) -> None:
+        data = {
+            "version": REFS_VERSION,
+            "owners": {owner: sorted(digests) for owner, digests in self._owners.items()},
+        }
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.root / REFS_FILENAME, json.dumps(data).encode("utf-8"))
+        except OSError as e:
+            print(f"[BlobStore] Error writing references: {e}")
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp_path = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Message helpers
+# ---------------------------------------------------------------------------
+
+def externalize_images(store: BlobStore, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Move inline base64 image ``data`` into the store.
+
+    Returns a list where each message carrying inline image data is replaced
+    by a shallow copy whose images reference blobs; other messages are
+    returned unchanged. The input is not modified.
+    """
+    result = []
+    for msg in messages:
+        images = msg.get("images") if isinstance(msg, dict) else None
+        if not images or not any(isinstance(img, dict) and img.get("data") for img in images):
+            result.append(msg)
+            continue
+        new_images = []
+        for img in images:
+            if isinstance(img, dict) and img.get("data"):
+                try:
+                    digest = store.put_base64(img["data"])
+                except (ValueError, OSError) as e:
+                    print(f"[BlobStore] Keeping inline image data: {e}")
+                    new_images.append(img)
+                    continue
+                img = {k: v for k, v in img.items() if k != "data"}
+                img["blob"] = digest
+            new_images.append(img)
+        msg = dict(msg)
+        msg["images"] = new_images
+        result.append(msg)
+    return result
+
+
+def referenced_blobs(messages: Iterable[Dict[str, Any]]) -> Set[str]:
+    """Return the digests referenced by messages' images."""
+    digests = set()
+    for msg in messages:
+        for img in (msg.get("images") or []) if isinstance(msg, dict) else []:
+            if isinstance(img, dict) and img.get("blob"):
+                digests.add(img["blob"])
+    return digests
+
+
+def image_base64(img: Dict[str, Any]) -> str:
+    """Return an image entry's bytes as base64, from inline data, blob or path."""
+    if img.get("data"):
+        return img["data"]
+    if img.get("blob"):
+        return get_blob_store().read_base64(img["blob"])
+    if img.get("path"):
+        return get_encoding_cache().base64_file(img["path"])
+    return ""
+
+
+def image_data_url(img: Dict[str, Any], default_mime: str = "image/jpeg") -> str:
+    """Return an image entry as a ``data:`` URL."""
+    mime_type = img.get("mime_type") or default_mime
+    return f"data:{mime_type};base64,{image_base64(img)}"
+
+
+# ---------------------------------------------------------------------------
+# Shared store
+# ---------------------------------------------------------------------------
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Return the store shared by all history directories.
+
+    The first call starts a background garbage collection pass.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore(Path(HISTORY_DIR) / BLOB_DIRNAME)
+            threading.Thread(target=_store.collect_garbage, daemon=True).start()
+        return _store
@@ -5,17 +5,32 @@ Repository for managing chat history persistence.
 import os
 import json
 import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator
 from dataclasses import dataclass
 
 from .base import Repository
-from .history_index import load_history_index, save_history_index, HISTORY_INDEX_FILENAME
+from .blob_store import BlobStore, externalize_images, get_blob_store, referenced_blobs
+from .history_index import get_history_index, HISTORY_INDEX_FILENAME
+from .search_index import (
+    SearchResult,
+    collect_results,
+    filter_predicate,
+    get_search_index,
+    message_text,
+)
 from conversation import ConversationHistory, Message
 from config import HISTORY_DIR
 
 
+JOURNAL_FILENAME = "journal.jsonl"
+
+
 @dataclass
 class ChatMetadata:
     """Metadata about a chat conversation."""
@@ -33,32 +48,32 @@ class ChatMetadata:
         }
 
 
-@dataclass
-class SearchResult:
-    """Result from a chat history search."""
-    chat_id: str
-    chat_title: str
-    matches: List[str]
-    relevance_score: float = 1.0
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            'chat_id': self.chat_id,
-            'chat_title': self.chat_title,
-            'matches': self.matches,
-            'relevance_score': self.relevance_score,
-        }
-
-
 class ChatHistoryRepository(Repository[ConversationHistory]):
     """
     Repository for managing chat conversation history.
     
     This repository handles loading, saving, and searching chat histories
-    stored as JSON files in the history directory.
+    stored in the history directory. Each chat is a JSON snapshot
+    (``<chat_id>.json``) plus an append-only journal
+    (``<chat_id>/journal.jsonl``) holding the changes made since the
+    snapshot was written. Saves append one line describing the change, and
+    the journal is folded back into the snapshot on a background thread
+    once it grows large. Plain ``.json`` chats written by older versions
+    are snapshots without a journal and need no migration.
+    
+    Attached images are kept in the shared :class:`BlobStore` and
+    referenced by digest; inline base64 image data in older chats is moved
+    there when the chat is loaded or saved.
     """
     
-    def __init__(self, history_dir: str = None):
+    # Compact once the journal outgrows both this many bytes and the
+    # snapshot itself, or once it holds this many records.
+    COMPACT_MIN_BYTES = 256 * 1024
+    COMPACT_MAX_RECORDS = 200
+    # Number of chats whose last persisted state is kept for diffing.
+    STATE_CACHE_SIZE = 8
+    
+    def __init__(self, history_dir: str = None, blob_store: Optional[BlobStore] = None):
         """
         Initialize the chat history repository.
         
@@ -67,9 +82,17 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
         history_dir : str, optional
             Directory where chat histories are stored.
             Defaults to HISTORY_DIR from config.
+        blob_store : BlobStore, optional
+            Store for image attachments. Defaults to the shared store.
         """
         self.history_dir = Path(history_dir or HISTORY_DIR)
+        self._blob_store = blob_store
         self._ensure_history_dir()
+        self._index = get_history_index(self.history_dir)
+        self._search_index = get_search_index(self.history_dir)
+        self._lock = threading.RLock()
+        self._states: "OrderedDict[str, _JournalState]" = OrderedDict()
+        self._compacting = set()
     
     def _ensure_history_dir(self) -> None:
         """Ensure the history directory exists."""
@@ -82,6 +105,44 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
             chat_id = chat_id[:-5]
         return self.history_dir / f"{chat_id}.json"
     
+    @property
+    def blob_store(self) -> BlobStore:
+        """Store holding this repository's image attachments."""
+        if self._blob_store is None:
+            self._blob_store = get_blob_store()
+        return self._blob_store
+    
+    def _blob_owner(self, chat_id: str) -> str:
+        """Owner key of a chat's blob references (its snapshot path)."""
+        return os.path.abspath(self._get_chat_path(chat_id))
+    
+    def _get_journal_path(self, chat_id: str) -> Path:
+        """Get the journal path for a chat ID (inside the chat's asset folder)."""
+        return self.history_dir / _clean_id(chat_id) / JOURNAL_FILENAME
+    
+    def _chat_mtime(self, chat_id: str) -> Optional[float]:
+        """Return the latest modification time of a chat's snapshot and journal."""
+        try:
+            mtime = self._get_chat_path(chat_id).stat().st_mtime
+        except OSError:
+            return None
+        try:
+            return max(mtime, self._get_journal_path(chat_id).stat().st_mtime)
+        except OSError:
+            return mtime
+    
+    def _file_signature(self, chat_id: str) -> tuple:
+        """Identify the on-disk version of a chat (snapshot mtime, journal size)."""
+        try:
+            snapshot = self._get_chat_path(chat_id).stat().st_mtime_ns
+        except OSError:
+            snapshot = None
+        try:
+            journal = self._get_journal_path(chat_id).stat().st_size
+        except OSError:
+            journal = 0
+        return snapshot, journal
+    
     def get(self, chat_id: str) -> Optional[ConversationHistory]:
         """
         Load a chat history by ID.
@@ -96,33 +157,29 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
         Optional[ConversationHistory]
             The conversation history if found, None otherwise.
         """
-        chat_path = self._get_chat_path(chat_id)
-        
-        if not chat_path.exists():
+        data = self._read_chat_data(chat_id)
+        if data is None:
             return None
         
-        try:
-            with open(chat_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            messages = data.get('messages', [])
-            metadata = data.get('metadata', {})
-            system_message = "You are a helpful assistant."
-            
-            # Extract system message if present
-            if messages and messages[0].get('role') == 'system':
-                system_message = messages[0].get('content', system_message)
-            
-            return ConversationHistory.from_list(messages, default_system=system_message, metadata=metadata)
-            
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Error loading chat {chat_id}: {e}")
-            return None
+        messages = self._externalize_images(data.get('messages', []))
+        metadata = data.get('metadata', {})
+        system_message = "You are a helpful assistant."
+        
+        # Extract system message if present
+        if messages and messages[0].get('role') == 'system':
+            system_message = messages[0].get('content', system_message)
+        
+        return ConversationHistory.from_list(messages, default_system=system_message, metadata=metadata)
     
     def save(self, chat_id: str, history, metadata: Optional[Dict[str, Any]] = None) -> None:
         """
         Save a chat history.
         
+        Only the difference from the last persisted state is written: new
+        trailing messages, a rewrite from the first changed message, and/or
+        replaced metadata are appended to the chat's journal as one record.
+        A chat without a snapshot yet gets its snapshot written directly.
+        
         Parameters
         ----------
         chat_id : str
@@ -132,7 +189,7 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
         metadata : Optional[Dict[str, Any]]
             Optional metadata to save with the chat.
         """
-        chat_path = self._get_chat_path(chat_id)
+        chat_id = _clean_id(chat_id)
         
         try:
             # Handle both ConversationHistory and list formats
@@ -147,25 +204,52 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
             if metadata:
                 meta.update(metadata)
             
+            messages = self._externalize_images(messages)
             timestamp = datetime.now()
-            data = {
-                'messages': messages,
-                'timestamp': timestamp.isoformat(),
-            }
-            if meta:
-                data['metadata'] = meta
+            encoded = [_encode_message(msg) for msg in messages]
+            # Detached copy: ``meta`` may be the live history's metadata dict.
+            meta_copy = json.loads(json.dumps(meta))
             
-            with open(chat_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._lock:
+                state = self._load_state(chat_id)
+                start = 0
+                if state is None:
+                    state = _JournalState()
+                    state.messages = encoded
+                    state.metadata = meta_copy
+                    state.timestamp = timestamp.isoformat()
+                    self._write_snapshot(chat_id, state)
+                    self._remember_state(chat_id, state)
+                else:
+                    start = _common_prefix_length(state.messages, encoded)
+                    record: Dict[str, Any] = {}
+                    if start < len(state.messages) or start < len(encoded):
+                        record['start'] = start
+                        record['messages'] = messages[start:]
+                    if meta_copy != state.metadata:
+                        record['metadata'] = meta_copy
+                    record['seq'] = state.seq + 1
+                    record['timestamp'] = timestamp.isoformat()
+                    self._append_record(chat_id, state, record)
+                    state.messages = encoded
+                    state.metadata = meta_copy
+                    state.timestamp = record['timestamp']
+                    if self._needs_compaction(state):
+                        self._schedule_compaction(chat_id)
+            
+            self.blob_store.set_refs(self._blob_owner(chat_id), referenced_blobs(messages))
+
+            title = meta.get('title') or self._generate_title(messages, chat_id)
 
             # Update history index for fast listing
             self._update_history_index(
                 chat_id=chat_id,
-                title=meta.get('title') or self._generate_title(messages, chat_id),
+                title=title,
                 timestamp=timestamp,
                 message_count=len(messages),
                 is_document=False,
             )
+            self._index_chat(chat_id, title, messages, start)
                 
         except IOError as e:
             print(f"Error saving chat {chat_id}: {e}")
@@ -185,28 +269,224 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
         bool
             True if the chat was deleted, False if not found.
         """
+        chat_id = _clean_id(chat_id)
         chat_path = self._get_chat_path(chat_id)
         
         if not chat_path.exists():
             return False
         
         try:
-            chat_path.unlink()
+            with self._lock:
+                self._states.pop(chat_id, None)
+                chat_path.unlink()
+                
+                # Also delete associated images/audio directory (and journal) if it exists
+                chat_dir = self.history_dir / chat_id
+                if chat_dir.exists() and chat_dir.is_dir():
+                    shutil.rmtree(chat_dir)
             
-            # Also delete associated images/audio directory if it exists
-            chat_dir = self.history_dir / chat_id
-            if chat_dir.exists() and chat_dir.is_dir():
-                import shutil
-                shutil.rmtree(chat_dir)
+            self.blob_store.release(self._blob_owner(chat_id))
             
-            # Update history index
+            # Update history and search indexes
             self._remove_from_history_index(chat_id)
+            self._search_index.remove_item(chat_id)
             return True
             
         except IOError as e:
             print(f"Error deleting chat {chat_id}: {e}")
             return False
 
+    # -----------------------------------------------------------------------
+    # Image blobs
+    # -----------------------------------------------------------------------
+
+    def _externalize_images(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Move inline image data into the blob store (no-op without images)."""
+        if not any(isinstance(msg, dict) and msg.get('images') for msg in messages):
+            return messages
+        return externalize_images(self.blob_store, messages)
+
+    # -----------------------------------------------------------------------
+    # Journal
+    # -----------------------------------------------------------------------
+
+    def compact(self, chat_id: str) -> bool:
+        """
+        Fold a chat's journal into its snapshot.
+        
+        The new snapshot is written to a temporary file and renamed into
+        place, and records its journal sequence number so a journal left
+        behind by an interrupted compaction is never replayed twice.
+        
+        Parameters
+        ----------
+        chat_id : str
+            The unique identifier of the chat.
+            
+        Returns
+        -------
+        bool
+            True if the snapshot was rewritten.
+        """
+        chat_id = _clean_id(chat_id)
+        with self._lock:
+            state = self._load_state(chat_id)
+            if state is None:
+                return False
+            journal_path = self._get_journal_path(chat_id)
+            if not journal_path.exists():
+                return False
+            self._write_snapshot(chat_id, state)
+            try:
+                journal_path.unlink()
+            except OSError:
+                pass
+            try:
+                self._search_index.set_mtime(chat_id, self._get_chat_path(chat_id).stat().st_mtime)
+            except OSError:
+                pass
+            state.journal_bytes = 0
+            state.journal_records = 0
+            state.signature = self._file_signature(chat_id)
+            return True
+
+    def flush(self) -> None:
+        """Compact every chat whose journal is due, blocking until done."""
+        with self._lock:
+            chat_ids = [cid for cid, state in self._states.items() if state.journal_records]
+        for chat_id in chat_ids:
+            try:
+                self.compact(chat_id)
+            except (IOError, OSError) as e:
+                print(f"[ChatHistoryRepository] Error compacting {chat_id}: {e}")
+
+    def _read_chat_data(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a chat as a snapshot-format dict, replaying its journal.
+        
+        Document files sharing the history directory are returned as-is.
+        """
+        chat_id = _clean_id(chat_id)
+        chat_path = self._get_chat_path(chat_id)
+        with self._lock:
+            if not chat_path.exists():
+                # Removed behind our back (e.g. moved to another project).
+                self._states.pop(chat_id, None)
+                return None
+            state = self._states.get(chat_id)
+            if state is not None and state.signature == self._file_signature(chat_id):
+                self._states.move_to_end(chat_id)
+                return state.to_data()
+            
+            try:
+                with open(chat_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Error loading chat {chat_id}: {e}")
+                return None
+            if not isinstance(data, dict) or data.get('mode') == 'document':
+                return data
+            
+            state = _JournalState.from_snapshot(data)
+            try:
+                state.snapshot_bytes = chat_path.stat().st_size
+            except OSError:
+                pass
+            self._replay_journal(chat_id, state)
+            self._remember_state(chat_id, state)
+            return state.to_data()
+
+    def _load_state(self, chat_id: str) -> Optional["_JournalState"]:
+        """Return the last persisted state of a chat, or None if it has no snapshot."""
+        data = self._read_chat_data(chat_id)
+        if not isinstance(data, dict) or data.get('mode') == 'document':
+            return None
+        return self._states.get(chat_id)
+
+    def _remember_state(self, chat_id: str, state: "_JournalState") -> None:
+        state.signature = self._file_signature(chat_id)
+        self._states[chat_id] = state
+        self._states.move_to_end(chat_id)
+        while len(self._states) > self.STATE_CACHE_SIZE:
+            self._states.popitem(last=False)
+
+    def _replay_journal(self, chat_id: str, state: "_JournalState") -> None:
+        """Apply journal records newer than the snapshot to ``state``."""
+        journal_path = self._get_journal_path(chat_id)
+        try:
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        except IOError as e:
+            print(f"Error reading journal for {chat_id}: {e}")
+            return
+        
+        for line in lines:
+            state.journal_bytes += len(line.encode('utf-8'))
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line from an interrupted write.
+                continue
+            if not isinstance(record, dict):
+                continue
+            state.journal_records += 1
+            seq = record.get('seq', 0)
+            if seq <= state.seq:
+                continue
+            state.apply(record)
+
+    def _append_record(self, chat_id: str, state: "_JournalState", record: Dict[str, Any]) -> None:
+        journal_path = self._get_journal_path(chat_id)
+        journal_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+        state.seq = record['seq']
+        state.journal_bytes += len(line.encode('utf-8'))
+        state.journal_records += 1
+        state.signature = self._file_signature(chat_id)
+
+    def _write_snapshot(self, chat_id: str, state: "_JournalState") -> None:
+        """Atomically write ``state`` as the chat's snapshot file."""
+        chat_path = self._get_chat_path(chat_id)
+        payload = json.dumps(state.to_data(include_seq=True), ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{chat_id}.", suffix=".tmp", dir=str(self.history_dir))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, chat_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        state.snapshot_bytes = len(payload.encode('utf-8'))
+
+    def _needs_compaction(self, state: "_JournalState") -> bool:
+        if state.journal_records >= self.COMPACT_MAX_RECORDS:
+            return True
+        return state.journal_bytes > max(self.COMPACT_MIN_BYTES, state.snapshot_bytes)
+
+    def _schedule_compaction(self, chat_id: str) -> None:
+        """Compact a chat's journal on a background thread."""
+        if chat_id in self._compacting:
+            return
+        self._compacting.add(chat_id)
+
+        def worker():
+            try:
+                self.compact(chat_id)
+            except (IOError, OSError) as e:
+                print(f"[ChatHistoryRepository] Error compacting {chat_id}: {e}")
+            finally:
+                with self._lock:
+                    self._compacting.discard(chat_id)
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def _update_history_index(
         self,
         chat_id: str,
@@ -216,30 +496,21 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
         is_document: bool,
     ) -> None:
         """Update the cached history index entry for this chat."""
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
-        path = self._get_chat_path(chat_id)
-        try:
-            file_mtime = path.stat().st_mtime
-        except OSError:
+        file_mtime = self._chat_mtime(chat_id)
+        if file_mtime is None:
             return
-        entries[chat_id] = {
+        self._index.set(chat_id, {
             "title": title,
             "timestamp": timestamp.isoformat(),
             "sort_ts": timestamp.isoformat(),
             "message_count": message_count,
             "file_mtime": file_mtime,
             "is_document": is_document,
-        }
-        save_history_index(self.history_dir, index)
+        })
 
     def _remove_from_history_index(self, chat_id: str) -> None:
         """Remove a chat from the cached history index."""
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
-        if chat_id in entries:
-            del entries[chat_id]
-            save_history_index(self.history_dir, index)
+        self._index.remove(chat_id)
     
     def list_all(self) -> List[ChatMetadata]:
         """
@@ -251,9 +522,8 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
             A list of metadata for all chats, sorted by timestamp (newest first).
         """
         chats: List[ChatMetadata] = []
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
-        changed = False
+        entries = self._index.entries()
+        updates: Dict[str, Dict[str, Any]] = {}
         seen_ids = set()
 
         for chat_file in self.history_dir.glob("*.json"):
@@ -262,9 +532,8 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
             chat_id = chat_file.stem
             seen_ids.add(chat_id)
 
-            try:
-                file_mtime = chat_file.stat().st_mtime
-            except OSError:
+            file_mtime = self._chat_mtime(chat_id)
+            if file_mtime is None:
                 continue
 
             entry = entries.get(chat_id)
@@ -282,22 +551,18 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
                 ))
                 continue
 
-            try:
-                with open(chat_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Error reading chat metadata for {chat_id}: {e}")
+            data = self._read_chat_data(chat_id)
+            if not isinstance(data, dict):
                 continue
 
             if data.get("mode") == "document":
-                entries[chat_id] = {
+                updates[chat_id] = {
                     "title": data.get("title", "Untitled"),
                     "updated_at": data.get("updated_at", ""),
                     "sort_ts": data.get("updated_at", ""),
                     "file_mtime": file_mtime,
                     "is_document": True,
                 }
-                changed = True
                 continue
 
             messages = data.get('messages', [])
@@ -309,7 +574,7 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
                 timestamp = datetime.fromtimestamp(file_mtime)
             title = metadata.get('title') or self._generate_title(messages, chat_id)
 
-            entries[chat_id] = {
+            updates[chat_id] = {
                 "title": title,
                 "timestamp": timestamp.isoformat(),
                 "sort_ts": timestamp.isoformat(),
@@ -317,7 +582,6 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
                 "file_mtime": file_mtime,
                 "is_document": False,
             }
-            changed = True
 
             chats.append(ChatMetadata(
                 chat_id=chat_id,
@@ -326,61 +590,22 @@ class ChatHistoryRepository(Repository[ConversationHistory]):
                 message_count=len(messages),
             ))
 
-        # Remove stale entries
-        for chat_id in list(entries.keys()):
-            if chat_id not in seen_ids:
-                del entries[chat_id]
-                changed = True
-
-        if changed:
-            save_history_index(self.history_dir, index)
+        # Store refreshed entries and drop stale ones
+        stale_ids = [chat_id for chat_id in entries if chat_id not in seen_ids]
+        self._index.update(updates, remove=stale_ids)
 
         # Sort by timestamp, newest first
         chats.sort(key=lambda c: c.timestamp, reverse=True)
         return chats
     
-    def _generate_title(self, messages: List[Dict[str, Any]], fallback: str) -> str:
-        """
-        Generate a title for a chat from its messages.
-        
-        Parameters
-        ----------
-        messages : List[Dict[str, Any]]
-            The chat messages.
-        fallback : str
-            Fallback title if no suitable message found.
-            
-        Returns
-        -------
-        str
-            The generated title.
-        """
-        for msg in messages:
-            if msg.get('role') == 'user':
-                content = msg.get('content', '').strip()
-                if content:
-                    # Clean and truncate
-                    content = re.sub(r'\s+', ' ', content)
-                    if len(content) > 50:
-                        content = content[:47] + '...'
-                    return content
-        
-        return fallback
-
-
-def _parse_iso(value: Optional[str]) -> Optional[datetime]:
-    """Parse an ISO timestamp string to datetime."""
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value)
-    except (ValueError, TypeError):
-        return None
-    
     def search(self, query: str, limit: int = 10, exclude_chat_id: str = None, context_window: int = 200) -> List[SearchResult]:
         """
         Search chat histories for a keyword.
         
+        Matches are whole words with an optional plural 's'. Candidates
+        come from the full-text index, which is brought up to date first;
+        without FTS5 every chat is scanned instead.
+        
         Parameters
         ----------
         query : str
@@ -399,62 +624,63 @@ def _parse_iso(value: Optional[str]) -> Optional[datetime]:
         """
         if not query:
             return []
+        if exclude_chat_id:
+            exclude_chat_id = _clean_id(exclude_chat_id)
         
-        # Build word-boundary regex pattern with optional plural 's'
-        escaped = re.escape(query)
-        pattern = re.compile(r'\b' + escaped + r's?\b', re.IGNORECASE)
-        results = []
+        self._sync_search_index()
+        candidates = self._search_index.candidates(query, 'chat')
+        if candidates is None:
+            candidates = self._scan_candidates()
+        return collect_results(candidates, query, limit, context_window, exclude_chat_id)
+    
+    def iter_content_matches(
+        self,
+        text: str,
+        whole_words: bool = False,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield IDs of chats with a message containing ``text``.
         
-        for chat_file in self.history_dir.glob("*.json"):
-            chat_id = chat_file.stem
-            
-            # Skip excluded chat
-            if exclude_chat_id and chat_id == exclude_chat_id:
-                continue
-            
-            if len(results) >= limit:
-                break
+        Intended for a worker thread: it may read files to bring the search
+        index up to date. Matching is a case-insensitive substring test, or
+        whole words when ``whole_words`` is set.
+        
+        Parameters
+        ----------
+        text : str
+            Filter text.
+        whole_words : bool
+            Only match whole words.
+        is_cancelled : Callable[[], bool], optional
+            Polled while searching; stops early once it returns True.
             
-            try:
-                with open(chat_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                messages = data.get('messages', [])
-                matching_messages = []
-                
-                for msg in messages:
-                    role = msg.get('role', '')
-                    if role == 'system':
-                        continue
-                    
-                    content = msg.get('content', '')
-                    match = pattern.search(content)
-                    if match:
-                        # Extract context around the match
-                        start = max(0, match.start() - context_window)
-                        end = min(len(content), match.end() + context_window)
-                        snippet = content[start:end]
-                        if start > 0:
-                            snippet = '...' + snippet
-                        if end < len(content):
-                            snippet = snippet + '...'
-                        matching_messages.append(f"[{role}]: {snippet}")
-                
-                if matching_messages:
-                    title = self._generate_title(messages, chat_id)
-                    results.append(SearchResult(
-                        chat_id=chat_id,
-                        chat_title=title,
-                        matches=matching_messages[:3],  # Limit messages per chat
-                        relevance_score=len(matching_messages),
-                    ))
-                    
-            except (json.JSONDecodeError, IOError):
-                continue
+        Yields
+        ------
+        str
+            Matching chat IDs, as they are found.
+        """
+        if not text:
+            return
+        self._sync_search_index()
+        if is_cancelled and is_cancelled():
+            return
+        matches = self._search_index.iter_filter_matches(text, whole_words, 'chat', is_cancelled)
+        if matches is not None:
+            yield from matches
+            return
         
-        # Sort by relevance
-        results.sort(key=lambda r: r.relevance_score, reverse=True)
-        return results[:limit]
+        predicate = filter_predicate(text, whole_words)
+        for path in self._iter_item_files():
+            if is_cancelled and is_cancelled():
+                return
+            data = self._read_chat_data(path.stem)
+            if not isinstance(data, dict) or data.get('mode') == 'document':
+                continue
+            for msg in data.get('messages', []):
+                if msg.get('role') != 'system' and predicate(message_text(msg.get('content', ''))):
+                    yield path.stem
+                    break
     
     def get_by_date_range(self, start: datetime, end: datetime) -> List[ChatMetadata]:
         """
@@ -477,3 +703,174 @@ def _parse_iso(value: Optional[str]) -> Optional[datetime]:
             chat for chat in all_chats
             if start <= chat.timestamp <= end
         ]
+
+    def _iter_item_files(self):
+        for path in self.history_dir.glob("*.json"):
+            if path.name == HISTORY_INDEX_FILENAME or path.name.startswith("."):
+                continue
+            yield path
+
+    def _index_chat(self, chat_id: str, title: str, messages: List[Dict[str, Any]], start: int = 0) -> None:
+        """Store messages from position ``start`` onwards in the search index."""
+        # Saves append to the journal without touching the snapshot, so the
+        # indexed mtime covers both files.
+        mtime = self._chat_mtime(chat_id)
+        if mtime is None:
+            return
+        rows = [
+            (pos, msg.get('role', ''), message_text(msg.get('content', '')))
+            for pos, msg in enumerate(messages)
+            if pos >= start and msg.get('role') != 'system'
+        ]
+        self._search_index.replace_item(chat_id, 'chat', title, mtime, rows, start=start)
+
+    def _sync_search_index(self) -> None:
+        """Re-index files whose mtime no longer matches the search index."""
+        if not self._search_index.available:
+            return
+        indexed = self._search_index.item_mtimes()
+        seen = set()
+        for path in self._iter_item_files():
+            item_id = path.stem
+            seen.add(item_id)
+            mtime = self._chat_mtime(item_id)
+            if mtime is None:
+                continue
+            known = indexed.get(item_id)
+            if known and known[1] == mtime:
+                continue
+            data = self._read_chat_data(item_id)
+            if not isinstance(data, dict):
+                continue
+            if data.get('mode') == 'document':
+                self._search_index.replace_item(
+                    item_id, 'document', data.get('title', 'Untitled'), mtime,
+                    [(0, 'document', data.get('content', '') or '')],
+                )
+                continue
+            messages = data.get('messages', [])
+            title = (data.get('metadata') or {}).get('title') or self._generate_title(messages, item_id)
+            self._index_chat(item_id, title, messages)
+        for item_id in indexed:
+            if item_id not in seen:
+                self._search_index.remove_item(item_id)
+
+    def _scan_candidates(self):
+        """Yield every chat message as a search candidate (no FTS5 fallback)."""
+        for path in self._iter_item_files():
+            chat_id = path.stem
+            data = self._read_chat_data(chat_id)
+            if not isinstance(data, dict) or data.get('mode') == 'document':
+                continue
+            messages = data.get('messages', [])
+            title = (data.get('metadata') or {}).get('title') or self._generate_title(messages, chat_id)
+            for pos, msg in enumerate(messages):
+                role = msg.get('role', '')
+                if role == 'system':
+                    continue
+                yield chat_id, title, pos, role, message_text(msg.get('content', ''))
+    
+    def _generate_title(self, messages: List[Dict[str, Any]], fallback: str) -> str:
+        """
+        Generate a title for a chat from its messages.
+        
+        Parameters
+        ----------
+        messages : List[Dict[str, Any]]
+            The chat messages.
+        fallback : str
+            Fallback title if no suitable message found.
+            
+        Returns
+        -------
+        str
+            The generated title.
+        """
+        for msg in messages:
+            if msg.get('role') == 'user':
+                content = msg.get('content', '').strip()
+                if content:
+                    # Clean and truncate
+                    content = re.sub(r'\s+', ' ', content)
+                    if len(content) > 50:
+                        content = content[:47] + '...'
+                    return content
+        
+        return fallback
+
+
+class _JournalState:
+    """Last persisted state of a chat: snapshot plus replayed journal."""
+
+    def __init__(self):
+        # Messages are kept JSON-encoded so saves can diff them cheaply and
+        # callers mutating their dicts cannot alter the persisted state.
+        self.messages: List[str] = []
+        self.metadata: Dict[str, Any] = {}
+        self.timestamp: str = ''
+        self.seq = 0
+        self.snapshot_bytes = 0
+        self.journal_bytes = 0
+        self.journal_records = 0
+        # File signature when last read or written; a mismatch means the
+        # chat was changed by someone else and must be re-read.
+        self.signature: tuple = (None, 0)
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "_JournalState":
+        state = cls()
+        state.messages = [_encode_message(msg) for msg in data.get('messages', [])]
+        state.metadata = data.get('metadata', {}) or {}
+        state.timestamp = data.get('timestamp', '')
+        state.seq = data.get('journal_seq', 0)
+        return state
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        """Apply one journal record."""
+        if 'start' in record:
+            start = record['start']
+            self.messages = self.messages[:start] + [
+                _encode_message(msg) for msg in record.get('messages', [])
+            ]
+        if 'metadata' in record:
+            self.metadata = record['metadata'] or {}
+        self.timestamp = record.get('timestamp', self.timestamp)
+        self.seq = record.get('seq', self.seq)
+
+    def to_data(self, include_seq: bool = False) -> Dict[str, Any]:
+        """Return the state in the snapshot file format."""
+        data: Dict[str, Any] = {
+            'messages': [json.loads(msg) for msg in self.messages],
+            'timestamp': self.timestamp,
+        }
+        if self.metadata:
+            data['metadata'] = json.loads(json.dumps(self.metadata))
+        if include_seq:
+            data['journal_seq'] = self.seq
+        return data
+
+
+def _clean_id(chat_id: str) -> str:
+    return chat_id[:-5] if chat_id.endswith('.json') else chat_id
+
+
+def _encode_message(message: Dict[str, Any]) -> str:
+    return json.dumps(message, ensure_ascii=False, sort_keys=True)
+
+
+def _common_prefix_length(old: List[str], new: List[str]) -> int:
+    length = min(len(old), len(new))
+    for i in range(length):
+        if old[i] != new[i]:
+            return i
+    return length
+
+
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp string to datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
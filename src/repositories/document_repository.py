@@ -9,7 +9,8 @@ from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 
 from .base import Repository
-from .history_index import load_history_index, save_history_index, HISTORY_INDEX_FILENAME
+from .history_index import get_history_index, HISTORY_INDEX_FILENAME
+from .search_index import SearchResult, collect_results, get_search_index
 from config import HISTORY_DIR
 
 
@@ -73,6 +74,8 @@ class DocumentRepository(Repository[Document]):
     def __init__(self, history_dir: str = None):
         self.history_dir = Path(history_dir or HISTORY_DIR)
         self._ensure_dir()
+        self._index = get_history_index(self.history_dir)
+        self._search_index = get_search_index(self.history_dir)
     
     def _ensure_dir(self) -> None:
         self.history_dir.mkdir(parents=True, exist_ok=True)
@@ -130,6 +133,7 @@ class DocumentRepository(Repository[Document]):
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(doc.to_dict(), f, indent=2)
         self._update_history_index(doc, path)
+        self._index_document(doc.id, doc.title, doc.content, path)
         return doc.id
     
     def delete(self, doc_id: str) -> bool:
@@ -143,6 +147,7 @@ class DocumentRepository(Repository[Document]):
         # Delete the JSON file
         path.unlink()
         self._remove_from_history_index(doc_id)
+        self._search_index.remove_item(doc_id.replace('.json', ''))
         
         # Delete associated assets folder (images, etc.)
         doc_id_clean = doc_id.replace('.json', '')
@@ -158,8 +163,7 @@ class DocumentRepository(Repository[Document]):
     def list_all(self) -> List[DocumentMetadata]:
         """List all documents with metadata."""
         documents: List[DocumentMetadata] = []
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
+        entries = self._index.entries()
 
         for doc_id, entry in entries.items():
             if not entry.get("is_document"):
@@ -179,7 +183,7 @@ class DocumentRepository(Repository[Document]):
 
         # Fallback: scan files if index is missing or empty
         documents = []
-        index_changed = False
+        updates: Dict[str, Dict[str, Any]] = {}
         for path in self.history_dir.glob('*.json'):
             if path.name == HISTORY_INDEX_FILENAME or path.name.startswith("."):
                 continue
@@ -194,49 +198,92 @@ class DocumentRepository(Repository[Document]):
                         title=data.get('title', 'Untitled'),
                         updated_at=updated_at,
                     ))
-                    entries[doc_id] = {
+                    updates[doc_id] = {
                         "title": data.get('title', 'Untitled'),
                         "updated_at": updated_at.isoformat(),
                         "sort_ts": updated_at.isoformat(),
                         "file_mtime": path.stat().st_mtime,
                         "is_document": True,
                     }
-                    index_changed = True
                 except:
                     continue
         documents.sort(key=lambda d: d.updated_at, reverse=True)
-        if index_changed:
-            save_history_index(self.history_dir, index)
+        self._index.update(updates)
         return documents
     
+    def search(self, query: str, limit: int = 10, exclude_doc_id: str = None, context_window: int = 200) -> List[SearchResult]:
+        """
+        Search document contents for a keyword.
+        
+        Uses the same word-boundary/plural matching as chat search; results
+        carry the document ID and title in ``chat_id``/``chat_title``.
+        """
+        if not query:
+            return []
+        self._sync_search_index()
+        candidates = self._search_index.candidates(query, 'document')
+        if candidates is None:
+            candidates = (
+                (doc.id, doc.title, 0, 'document', doc.content)
+                for doc in (self.get(meta.id) for meta in self.list_all())
+                if doc is not None
+            )
+        return collect_results(candidates, query, limit, context_window, exclude_doc_id)
+    
     def exists(self, doc_id: str) -> bool:
         """Check if a document exists."""
         return self._get_path(doc_id).exists()
 
     def _update_history_index(self, doc: Document, path: Path) -> None:
         """Update the shared history index entry for this document."""
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
         try:
             file_mtime = path.stat().st_mtime
         except OSError:
             return
-        entries[doc.id] = {
+        self._index.set(doc.id, {
             "title": doc.title,
             "updated_at": doc.updated_at.isoformat(),
             "sort_ts": doc.updated_at.isoformat(),
             "file_mtime": file_mtime,
             "is_document": True,
-        }
-        save_history_index(self.history_dir, index)
+        })
+
+    def _index_document(self, doc_id: str, title: str, content: str, path: Path) -> None:
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return
+        self._search_index.replace_item(doc_id, 'document', title, mtime, [(0, 'document', content or '')])
+
+    def _sync_search_index(self) -> None:
+        """Index document files that are new or changed since last indexed."""
+        if not self._search_index.available:
+            return
+        indexed = self._search_index.item_mtimes()
+        seen = set()
+        for path in self.history_dir.glob('*.json'):
+            if path.name == HISTORY_INDEX_FILENAME or path.name.startswith("."):
+                continue
+            seen.add(path.stem)
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            known = indexed.get(path.stem)
+            if known and known[1] == mtime:
+                continue
+            # Unknown or changed files may be chats; those are indexed by
+            # the chat repository, which can replay their journals.
+            doc = self.get(path.stem)
+            if doc is not None:
+                self._index_document(doc.id, doc.title, doc.content, path)
+        for item_id, (kind, _mtime) in indexed.items():
+            if kind == 'document' and item_id not in seen:
+                self._search_index.remove_item(item_id)
 
     def _remove_from_history_index(self, doc_id: str) -> None:
         """Remove a document from the shared history index."""
-        index = load_history_index(self.history_dir)
-        entries = index.get("entries", {})
-        if doc_id in entries:
-            del entries[doc_id]
-            save_history_index(self.history_dir, index)
+        self._index.remove(doc_id)
 
 
 def _parse_iso(value: Optional[str]) -> Optional[datetime]:
@@ -0,0 +1,164 @@
+"""
+Repository for remembering uploaded files across sessions.
+
+Providers that take documents by reference (OpenAI ``file_id``) would
+otherwise re-upload the same PDF - up to 512 MB - in every session. Entries
+are keyed by the SHA-256 of the file's contents plus a fingerprint of the
+API key, so a moved or copied file is still recognised while a different
+account never sees another account's ids. Content hashes are remembered per
+``(path, size, mtime)`` so unchanged files are not re-read on every send.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import FILE_ID_CACHE_FILE
+
+
+CACHE_VERSION = 1
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Return a short, non-reversible identifier for an API key."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class FileIdCacheRepository:
+    """
+    Persistent map of ``(account, content hash)`` to provider file ids.
+
+    Entries record when they were last confirmed to exist remotely;
+    callers re-check entries older than ``VERIFY_AFTER_SECONDS`` and
+    :meth:`invalidate` ids the provider no longer knows.
+    """
+
+    # Cached ids older than this are checked with the provider before reuse.
+    VERIFY_AFTER_SECONDS = 24 * 3600
+
+    def __init__(self, cache_file: str = None):
+        """
+        Parameters
+        ----------
+        cache_file : str, optional
+            Path to the cache file. Defaults to FILE_ID_CACHE_FILE from config.
+        """
+        self.cache_file = Path(cache_file or FILE_ID_CACHE_FILE)
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._hashes: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"[FileIdCache] Error loading cache: {e}")
+            return
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            self._entries = dict(data.get("entries") or {})
+            self._hashes = dict(data.get("hashes") or {})
+
+    # -----------------------------------------------------------------------
+    # Content hashes
+    # -----------------------------------------------------------------------
+
+    def content_hash(self, file_path: str) -> str:
+        """Return the SHA-256 of a file, reusing the last result if unchanged."""
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        with self._lock:
+            known = self._hashes.get(path)
+            if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+                return known["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256}
+            self._save()
+        return sha256
+
+    # -----------------------------------------------------------------------
+    # File ids
+    # -----------------------------------------------------------------------
+
+    @staticmethod
+    def _key(account: str, sha256: str) -> str:
+        return f"{account}:{sha256}"
+
+    def get(self, account: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entry for a file, or None.
+
+        Entries past their provider-reported ``expires_at`` are dropped.
+        The returned dict has ``file_id`` and ``verified_at`` keys.
+        """
+        key = self._key(account, sha256)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            expires_at = entry.get("expires_at")
+            if expires_at and expires_at <= time.time():
+                del self._entries[key]
+                self._save()
+                return None
+            return dict(entry)
+
+    def needs_verification(self, entry: Dict[str, Any]) -> bool:
+        """Return True if an entry should be confirmed with the provider."""
+        return time.time() - entry.get("verified_at", 0) > self.VERIFY_AFTER_SECONDS
+
+    def put(self, account: str, sha256: str, file_id: str, expires_at: Optional[float] = None) -> None:
+        """Remember an uploaded (or freshly verified) file id."""
+        entry = {"file_id": file_id, "verified_at": time.time()}
+        if expires_at:
+            entry["expires_at"] = expires_at
+        with self._lock:
+            self._entries[self._key(account, sha256)] = entry
+            self._save()
+
+    def invalidate(self, file_id: str) -> None:
+        """Forget a file id, e.g. after the provider reports it deleted."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.get("file_id") == file_id]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+
+    def _save(self) -> None:
+        # Drop hashes of files that no longer exist so the file stays small.
+        self._hashes = {path: info for path, info in self._hashes.items() if os.path.exists(path)}
+        payload = json.dumps(
+            {"version": CACHE_VERSION, "entries": self._entries, "hashes": self._hashes},
+            indent=2,
+        )
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.cache_file.parent), prefix=".file_id_cache.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except IOError as e:
+            print(f"[FileIdCache] Error saving cache: {e}")
@@ -1,41 +1,208 @@
 """
-Shared history index helpers for fast sidebar listings.
+Shared history index for fast sidebar listings.
+
+The index maps chat and document IDs in a history directory to the
+metadata needed to list them without opening every file. One
+:class:`HistoryIndex` per directory is shared process-wide (see
+:func:`get_history_index`); it stays resident in memory, coalesces writes
+on a short debounce, and reloads from disk only when another process has
+changed the file.
 """
 
+import atexit
 import json
+import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 
 
 HISTORY_INDEX_FILENAME = ".history_index.json"
+INDEX_VERSION = 1
+
+
+class HistoryIndex:
+    """
+    In-memory view of a history directory's ``.history_index.json``.
+
+    Mutations are applied in memory immediately and written back after
+    ``flush_delay`` seconds of quiet, atomically (temp file + rename).
+    Every access checks the file's mtime; if it changed behind our back the
+    index is reloaded and any not-yet-flushed local changes are re-applied
+    on top.
+    """
+
+    FLUSH_DELAY = 0.5
+
+    def __init__(self, history_dir: Path, flush_delay: Optional[float] = None):
+        """
+        Parameters
+        ----------
+        history_dir : Path
+            Directory holding the index file.
+        flush_delay : float, optional
+            Debounce before pending changes are written.
+        """
+        self.history_dir = Path(history_dir)
+        self.path = self.history_dir / HISTORY_INDEX_FILENAME
+        self.flush_delay = self.FLUSH_DELAY if flush_delay is None else flush_delay
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime_ns: Optional[int] = None
+        self._loaded = False
+        # Local changes not yet written: id -> entry, or None for removals.
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    # -----------------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------------
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of all entries."""
+        with self._lock:
+            self._reload_if_changed()
+            return {item_id: dict(entry) for item_id, entry in self._entries.items()}
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of one entry, or None."""
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._entries.get(item_id)
+            return dict(entry) if entry is not None else None
+
+    # -----------------------------------------------------------------------
+    # Writes
+    # -----------------------------------------------------------------------
+
+    def set(self, item_id: str, entry: Dict[str, Any]) -> None:
+        """Add or replace an entry."""
+        self.update({item_id: entry})
+
+    def update(self, entries: Dict[str, Dict[str, Any]], remove: Iterable[str] = ()) -> None:
+        """Add or replace several entries and remove others in one change."""
+        remove = [item_id for item_id in remove if item_id not in entries]
+        if not entries and not remove:
+            return
+        with self._lock:
+            self._reload_if_changed()
+            for item_id, entry in entries.items():
+                self._entries[item_id] = dict(entry)
+                self._pending[item_id] = dict(entry)
+            for item_id in remove:
+                self._entries.pop(item_id, None)
+                self._pending[item_id] = None
+            self._schedule_flush()
 
+    def remove(self, item_id: str) -> bool:
+        """Remove an entry; returns True if it was present."""
+        with self._lock:
+            self._reload_if_changed()
+            if item_id not in self._entries:
+                return False
+            self.update({}, remove=[item_id])
+            return True
 
-def _default_index() -> Dict[str, Any]:
-    return {"version": 1, "entries": {}}
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            self._reload_if_changed()
+            data = {"version": INDEX_VERSION, "entries": self._entries}
+            try:
+                self.history_dir.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=HISTORY_INDEX_FILENAME + ".", suffix=".tmp", dir=str(self.history_dir)
+                )
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(data, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+                self._mtime_ns = self.path.stat().st_mtime_ns
+                self._pending.clear()
+            except Exception as e:
+                print(f"[HistoryIndex] Error writing {self.path}: {e}")
 
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.flush_delay <= 0:
+            self._timer = None
+            self.flush()
+            return
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
 
-def load_history_index(history_dir: Path) -> Dict[str, Any]:
-    """Load the history index file or return an empty index."""
-    path = history_dir / HISTORY_INDEX_FILENAME
-    if not path.exists():
-        return _default_index()
+    # -----------------------------------------------------------------------
+    # Disk sync
+    # -----------------------------------------------------------------------
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if self._loaded and mtime_ns == self._mtime_ns:
+            return
+        self._entries = _read_entries(self.path) if mtime_ns is not None else {}
+        self._mtime_ns = mtime_ns
+        self._loaded = True
+        # Re-apply local changes the external write did not know about.
+        for item_id, entry in self._pending.items():
+            if entry is None:
+                self._entries.pop(item_id, None)
+            else:
+                self._entries[item_id] = dict(entry)
+
+
+def _read_entries(path: Path) -> Dict[str, Dict[str, Any]]:
     try:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        if not isinstance(data, dict) or "entries" not in data:
-            return _default_index()
-        if not isinstance(data.get("entries"), dict):
-            data["entries"] = {}
-        return data
     except Exception:
-        return _default_index()
+        return {}
+    if not isinstance(data, dict) or not isinstance(data.get("entries"), dict):
+        return {}
+    return {k: v for k, v in data["entries"].items() if isinstance(v, dict)}
 
 
-def save_history_index(history_dir: Path, data: Dict[str, Any]) -> None:
-    """Persist the history index file."""
-    path = history_dir / HISTORY_INDEX_FILENAME
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except Exception:
-        pass
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_indexes: Dict[str, HistoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_history_index(history_dir) -> HistoryIndex:
+    """Return the shared index for a history directory."""
+    key = os.path.abspath(str(history_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = HistoryIndex(Path(key))
+            _indexes[key] = index
+        return index
+
+
+def flush_history_indexes() -> None:
+    """Write pending changes of every shared index (also run at exit)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.flush()
+
+
+atexit.register(flush_history_indexes)
@@ -3,6 +3,9 @@ Repository for managing model cache persistence.
 """
 
 import json
+import os
+import tempfile
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -15,7 +18,9 @@ class ModelCacheRepository:
     Repository for managing cached model lists per provider.
     
     This repository handles caching of available models from each provider
-    to avoid repeated API calls.
+    to avoid repeated API calls. Entries carry a timestamp (for TTL checks)
+    and optional HTTP validators (ETag / Last-Modified) so callers can serve
+    the cached list immediately and revalidate it in the background.
     """
     
     def __init__(self, cache_file: str = None):
@@ -29,6 +34,8 @@ class ModelCacheRepository:
         """
         self.cache_file = Path(cache_file or MODEL_CACHE_FILE)
         self._cache: Dict[str, Dict] = {}
+        # Background refreshes update the cache from worker threads.
+        self._lock = threading.RLock()
         self._load()
     
     def _load(self) -> None:
@@ -63,13 +70,24 @@ class ModelCacheRepository:
             List of model IDs, or empty list if not cached.
         """
         provider = provider.lower()
-        provider_data = self._cache.get(provider, {})
-        # Handle both formats: list directly or {'models': [...]}
-        if isinstance(provider_data, list):
-            return provider_data
-        return provider_data.get('models', [])
+        with self._lock:
+            provider_data = self._cache.get(provider, {})
+            # Handle both formats: list directly or {'models': [...]}
+            if isinstance(provider_data, list):
+                return list(provider_data)
+            return list(provider_data.get('models', []))
+    
+    def has_models(self, provider: str) -> bool:
+        """Return True if a (possibly stale) model list is cached for a provider."""
+        return provider.lower() in self._cache
     
-    def set_models(self, provider: str, models: List[str]) -> None:
+    def set_models(
+        self,
+        provider: str,
+        models: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
         """
         Set cached models for a provider.
         
@@ -79,13 +97,63 @@ class ModelCacheRepository:
             The provider name.
         models : List[str]
             List of model IDs to cache.
+        etag : Optional[str]
+            ETag returned with the model list, if any.
+        last_modified : Optional[str]
+            Last-Modified header returned with the model list, if any.
         """
         provider = provider.lower()
         
-        self._cache[provider] = {
-            'models': models,
+        entry = {
+            'models': list(models),
             'last_updated': datetime.now().isoformat(),
         }
+        if etag:
+            entry['etag'] = etag
+        if last_modified:
+            entry['last_modified'] = last_modified
+        with self._lock:
+            self._cache[provider] = entry
+    
+    def get_validators(self, provider: str) -> Dict[str, str]:
+        """
+        Get the HTTP validators stored with a provider's model list.
+        
+        Parameters
+        ----------
+        provider : str
+            The provider name.
+            
+        Returns
+        -------
+        Dict[str, str]
+            Mapping with optional 'etag' and 'last_modified' keys.
+        """
+        with self._lock:
+            provider_data = self._cache.get(provider.lower(), {})
+            if not isinstance(provider_data, dict):
+                return {}
+            return {
+                key: provider_data[key]
+                for key in ('etag', 'last_modified')
+                if provider_data.get(key)
+            }
+    
+    def mark_fresh(self, provider: str) -> None:
+        """
+        Reset the TTL of a provider's cached list without changing it.
+        
+        Used when a conditional request reports the list is unchanged
+        (HTTP 304).
+        """
+        provider = provider.lower()
+        with self._lock:
+            provider_data = self._cache.get(provider)
+            if isinstance(provider_data, list):
+                provider_data = {'models': provider_data}
+                self._cache[provider] = provider_data
+            if isinstance(provider_data, dict):
+                provider_data['last_updated'] = datetime.now().isoformat()
     
     def invalidate(self, provider: str) -> None:
         """
@@ -97,12 +165,13 @@ class ModelCacheRepository:
             The provider name.
         """
         provider = provider.lower()
-        if provider in self._cache:
-            del self._cache[provider]
+        with self._lock:
+            self._cache.pop(provider, None)
     
     def invalidate_all(self) -> None:
         """Invalidate the entire cache."""
-        self._cache = {}
+        with self._lock:
+            self._cache = {}
     
     def get_last_updated(self, provider: str) -> Optional[datetime]:
         """
@@ -120,6 +189,8 @@ class ModelCacheRepository:
         """
         provider = provider.lower()
         provider_data = self._cache.get(provider, {})
+        if not isinstance(provider_data, dict):
+            return None
         timestamp_str = provider_data.get('last_updated')
         
         if not timestamp_str:
@@ -130,7 +201,7 @@ class ModelCacheRepository:
         except (ValueError, TypeError):
             return None
     
-    def is_stale(self, provider: str, max_age_hours: int = 24) -> bool:
+    def is_stale(self, provider: str, max_age_hours: float = 24) -> bool:
         """
         Check if a provider's cache is stale.
         
@@ -138,7 +209,7 @@ class ModelCacheRepository:
         ----------
         provider : str
             The provider name.
-        max_age_hours : int
+        max_age_hours : float
             Maximum age in hours before cache is considered stale.
             
         Returns
@@ -160,8 +231,20 @@ class ModelCacheRepository:
             # Ensure parent directory exists
             self.cache_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f, indent=2)
+            with self._lock:
+                payload = json.dumps(self._cache, indent=2)
+            # Write atomically so a concurrent reader never sees a partial file.
+            fd, tmp_path = tempfile.mkstemp(
+                dir=str(self.cache_file.parent), prefix='.model_cache.', suffix='.tmp'
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
         
         except IOError as e:
             print(f"Error saving model cache: {e}")
@@ -176,7 +259,8 @@ class ModelCacheRepository:
         List[str]
             List of provider names.
         """
-        return list(self._cache.keys())
+        with self._lock:
+            return list(self._cache.keys())
     
     def get_cache_stats(self) -> Dict[str, Dict]:
         """
@@ -189,7 +273,9 @@ class ModelCacheRepository:
             (model count, last updated timestamp).
         """
         stats = {}
-        for provider, data in self._cache.items():
+        with self._lock:
+            items = list(self._cache.items())
+        for provider, data in items:
             # Handle both dict and list formats (legacy compatibility)
             if isinstance(data, dict):
                 stats[provider] = {
@@ -5,13 +5,13 @@ Repository for managing projects (separate history folders).
 import os
 import json
 import shutil
-from pathlib import Path
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from datetime import datetime
 
 from config import PARENT_DIR
-from .history_index import load_history_index, save_history_index
+from .blob_store import get_blob_store
+from .history_index import get_history_index
 
 
 PROJECTS_FILE = os.path.join(PARENT_DIR, "projects.json")
@@ -126,6 +126,7 @@ class ProjectsRepository:
         
         dest_file = os.path.join(dest_dir, f"{chat_id}.json")
         shutil.copy2(src_file, dest_file)
+        get_blob_store().copy_owner(os.path.abspath(src_file), os.path.abspath(dest_file))
         
         # Copy associated folder (images, audio, etc.)
         src_assets = os.path.join(source_dir, chat_id.replace('.json', ''))
@@ -159,6 +160,7 @@ class ProjectsRepository:
         
         dest_file = os.path.join(dest_dir, f"{chat_id_clean}.json")
         shutil.move(src_file, dest_file)
+        get_blob_store().rename_owner(os.path.abspath(src_file), os.path.abspath(dest_file))
         
         # Move associated folder (images, audio, etc.)
         src_assets = os.path.join(source_dir, chat_id_clean)
@@ -197,11 +199,7 @@ class ProjectsRepository:
         shutil.move(src_file, dest_file)
 
         # Remove entry from source history index
-        source_index = load_history_index(Path(source_dir))
-        source_entries = source_index.get("entries", {})
-        if doc_id_clean in source_entries:
-            del source_entries[doc_id_clean]
-            save_history_index(Path(source_dir), source_index)
+        get_history_index(source_dir).remove(doc_id_clean)
 
         # Add entry to destination history index
         title = doc_id_clean
@@ -214,21 +212,18 @@ class ProjectsRepository:
         except Exception:
             pass
 
-        dest_index = load_history_index(Path(dest_dir))
-        dest_entries = dest_index.get("entries", {})
         try:
             file_mtime = os.path.getmtime(dest_file)
         except OSError:
             file_mtime = 0.0
         if not updated_at and file_mtime:
             updated_at = datetime.fromtimestamp(file_mtime).isoformat()
-        dest_entries[doc_id_clean] = {
+        get_history_index(dest_dir).set(doc_id_clean, {
             "title": title,
             "updated_at": updated_at,
             "sort_ts": updated_at,
             "file_mtime": file_mtime,
             "is_document": True,
-        }
-        save_history_index(Path(dest_dir), dest_index)
+        })
 
         return True
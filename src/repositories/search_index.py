@@ -0,0 +1,449 @@
+"""
+SQLite FTS5 full-text index over chats and documents.
+
+Each history directory gets one database (``.search_index.sqlite3``)
+shared by the chat and document repositories through
+:func:`get_search_index`. The repositories keep it current from their
+save/delete hooks and re-index files whose modification time no longer
+matches the index (older files, chats moved between projects, external
+edits) lazily before a search.
+
+FTS5 only narrows the candidates: every hit is re-checked with the
+keyword regex (word boundary, optional plural ``s``), so results match
+what a full scan of the files would return.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+SEARCH_INDEX_FILENAME = ".search_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_rows (
+    id INTEGER PRIMARY KEY,
+    item_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS item_rows_item ON item_rows(item_id, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS item_rows_fts USING fts5(
+    content, content='item_rows', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS item_rows_ai AFTER INSERT ON item_rows BEGIN
+    INSERT INTO item_rows_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS item_rows_ad AFTER DELETE ON item_rows BEGIN
+    INSERT INTO item_rows_fts(item_rows_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class SearchResult:
+    """Result from a chat history search."""
+    chat_id: str
+    chat_title: str
+    matches: List[str]
+    relevance_score: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chat_id': self.chat_id,
+            'chat_title': self.chat_title,
+            'matches': self.matches,
+            'relevance_score': self.relevance_score,
+        }
+
+
+def keyword_pattern(query: str) -> "re.Pattern":
+    """Word-boundary regex for a keyword, with an optional plural 's'."""
+    return re.compile(r'\b' + re.escape(query) + r's?\b', re.IGNORECASE)
+
+
+def match_snippet(content: str, match: "re.Match", context_window: int) -> str:
+    """Cut ``context_window`` characters either side of a match."""
+    start = max(0, match.start() - context_window)
+    end = min(len(content), match.end() + context_window)
+    snippet = content[start:end]
+    if start > 0:
+        snippet = '...' + snippet
+    if end < len(content):
+        snippet = snippet + '...'
+    return snippet
+
+
+def message_text(content: Any) -> str:
+    """Flatten message content (string or content-part list) to plain text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") in ("text", "input_text", "output_text"):
+                parts.append(part.get("text", "") or "")
+            elif isinstance(part, str):
+                parts.append(part)
+        return "\n".join(parts)
+    return ""
+
+
+def collect_results(
+    candidates: Iterable[Tuple[str, str, int, str, str]],
+    query: str,
+    limit: int,
+    context_window: int,
+    exclude_id: Optional[str] = None,
+) -> List[SearchResult]:
+    """
+    Verify candidate rows against the keyword and group them per item.
+
+    Parameters
+    ----------
+    candidates : iterable of (item_id, title, position, role, content)
+        Rows in rank order.
+    query : str
+        The keyword or phrase.
+    limit : int
+        Maximum number of items to return.
+    context_window : int
+        Characters to show before/after each match.
+    exclude_id : str, optional
+        Item to skip (e.g. the current chat).
+
+    Returns
+    -------
+    List[SearchResult]
+        Items sorted by number of matching rows, best first (ties keep
+        rank order), each with up to three matches in message order.
+    """
+    pattern = keyword_pattern(query)
+    titles: Dict[str, str] = {}
+    hits: Dict[str, List[Tuple[int, str, "re.Match", str]]] = {}
+    for item_id, title, position, role, content in candidates:
+        if exclude_id and item_id == exclude_id:
+            continue
+        match = pattern.search(content)
+        if not match:
+            continue
+        titles.setdefault(item_id, title)
+        hits.setdefault(item_id, []).append((position, role, match, content))
+
+    results = []
+    for item_id, item_hits in hits.items():
+        item_hits.sort(key=lambda hit: hit[0])
+        results.append(SearchResult(
+            chat_id=item_id,
+            chat_title=titles[item_id],
+            matches=[
+                f"[{role}]: {match_snippet(content, match, context_window)}"
+                for _pos, role, match, content in item_hits[:3]  # Limit messages per item
+            ],
+            relevance_score=len(item_hits),
+        ))
+    results.sort(key=lambda r: r.relevance_score, reverse=True)
+    return results[:limit]
+
+
+def filter_predicate(text: str, whole_words: bool = False) -> Callable[[str], bool]:
+    """
+    Build the sidebar filter test: case-insensitive substring, or whole
+    words when ``whole_words`` is set.
+    """
+    if whole_words:
+        pattern = re.compile(r"\b" + re.escape(text) + r"\b", re.IGNORECASE)
+        return lambda content: pattern.search(content) is not None
+    needle = text.lower()
+    return lambda content: needle in content.lower()
+
+
+def _fts_query(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    Build an FTS5 query matching a superset of the keyword regex.
+
+    The keyword's tokens must appear as a phrase; with ``prefix`` the last
+    one is a prefix so plurals match too. Returns None for queries without
+    word tokens.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return '"' + " ".join(tokens) + '"' + ("*" if prefix else "")
+
+
+class SearchIndex:
+    """Full-text index over the chats and documents of one history directory."""
+
+    def __init__(self, db_path: Path):
+        """
+        Parameters
+        ----------
+        db_path : Path
+            SQLite database file; created on first use.
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.available = True
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or not self.available:
+            return self._conn
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            # WAL lets background filter queries read while saves write.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except sqlite3.Error as e:
+            # Most likely SQLite built without FTS5; callers fall back to scanning.
+            print(f"[SearchIndex] Full-text index unavailable: {e}")
+            self.available = False
+        return self._conn
+
+    # -----------------------------------------------------------------------
+    # Maintenance
+    # -----------------------------------------------------------------------
+
+    def replace_item(
+        self,
+        item_id: str,
+        kind: str,
+        title: str,
+        mtime: float,
+        rows: Iterable[Tuple[int, str, str]],
+        start: int = 0,
+    ) -> None:
+        """
+        Store an item's rows from position ``start`` onwards.
+
+        Parameters
+        ----------
+        item_id : str
+            Chat or document ID.
+        kind : str
+            ``'chat'`` or ``'document'``.
+        title : str
+            Title returned with results.
+        mtime : float
+            Modification time of the item's file when indexed.
+        rows : iterable of (position, role, content)
+            Replacement rows; rows before ``start`` are kept.
+        start : int
+            First position being replaced.
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    if start <= 0:
+                        conn.execute("DELETE FROM item_rows WHERE item_id = ?", (item_id,))
+                    else:
+                        conn.execute(
+                            "DELETE FROM item_rows WHERE item_id = ? AND position >= ?", (item_id, start)
+                        )
+                    conn.executemany(
+                        "INSERT INTO item_rows(item_id, position, role, content) VALUES (?, ?, ?, ?)",
+                        [(item_id, pos, role, content) for pos, role, content in rows if content],
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO items(item_id, kind, title, mtime) VALUES (?, ?, ?, ?)",
+                        (item_id, kind, title, mtime),
+                    )
+            except sqlite3.Error as e:
+                print(f"[SearchIndex] Error indexing {item_id}: {e}")
+
+    def set_mtime(self, item_id: str, mtime: float) -> None:
+        """Record a new file mtime for an item whose content is unchanged."""
+        self._execute("UPDATE items SET mtime = ? WHERE item_id = ?", (mtime, item_id))
+
+    def remove_item(self, item_id: str) -> None:
+        """Drop an item and its rows."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute("DELETE FROM item_rows WHERE item_id = ?", (item_id,))
+                    conn.execute("DELETE FROM items WHERE item_id = ?", (item_id,))
+            except sqlite3.Error as e:
+                print(f"[SearchIndex] Error removing {item_id}: {e}")
+
+    def item_mtimes(self) -> Dict[str, Tuple[str, float]]:
+        """Return ``{item_id: (kind, mtime)}`` for everything indexed."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            try:
+                cursor = conn.execute("SELECT item_id, kind, mtime FROM items")
+                return {item_id: (kind, mtime) for item_id, kind, mtime in cursor}
+            except sqlite3.Error:
+                return {}
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"[SearchIndex] Error updating index: {e}")
+
+    # -----------------------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------------------
+
+    def candidates(self, query: str, kind: str) -> Optional[List[Tuple[str, str, int, str, str]]]:
+        """
+        Return rows that may contain ``query``, best BM25 rank first.
+
+        Returns
+        -------
+        list of (item_id, title, position, role, content), or None
+            None when the index cannot answer the query (unavailable, or
+            a keyword without word characters) and the caller should scan.
+        """
+        match = _fts_query(query)
+        if match is None:
+            return None
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                cursor = conn.execute(
+                    """
+                    SELECT item_rows.item_id, items.title, item_rows.position, item_rows.role, item_rows.content
+                    FROM item_rows_fts
+                    JOIN item_rows ON item_rows.id = item_rows_fts.rowid
+                    JOIN items ON items.item_id = item_rows.item_id
+                    WHERE item_rows_fts MATCH ? AND items.kind = ?
+                    ORDER BY bm25(item_rows_fts), item_rows.item_id, item_rows.position
+                    """,
+                    (match, kind),
+                )
+                return cursor.fetchall()
+            except sqlite3.Error as e:
+                print(f"[SearchIndex] Query failed: {e}")
+                return None
+
+    def iter_filter_matches(
+        self,
+        text: str,
+        whole_words: bool = False,
+        kind: str = 'chat',
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Iterator[str]]:
+        """
+        Yield IDs of items whose content passes the sidebar filter.
+
+        Meant for worker threads: the query runs on its own read-only
+        connection, so it never holds the lock that saves need, and it is
+        aborted as soon as ``is_cancelled`` returns True. IDs are yielded
+        as they are found, in no particular order.
+
+        Returns
+        -------
+        Iterator[str] or None
+            None when the index is unavailable and the caller should scan.
+        """
+        if not text or self._connect() is None:
+            return None
+        return self._filter_matches(text, whole_words, kind, is_cancelled)
+
+    def _filter_matches(self, text, whole_words, kind, is_cancelled) -> Iterator[str]:
+        predicate = filter_predicate(text, whole_words)
+        matched = set()
+
+        def row_matches(item_id, content):
+            # Skip the remaining rows of items that already matched.
+            return item_id not in matched and predicate(content or "")
+
+        try:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        except sqlite3.Error as e:
+            print(f"[SearchIndex] Filter query failed: {e}")
+            return
+        try:
+            conn.create_function("row_matches", 2, row_matches)
+            if is_cancelled is not None:
+                conn.set_progress_handler(lambda: 1 if is_cancelled() else 0, 2000)
+            match = _fts_query(text, prefix=False) if whole_words else None
+            if match:
+                # Whole-word hits always contain the phrase's tokens.
+                cursor = conn.execute(
+                    """
+                    SELECT item_rows.item_id FROM item_rows_fts
+                    JOIN item_rows ON item_rows.id = item_rows_fts.rowid
+                    JOIN items ON items.item_id = item_rows.item_id
+                    WHERE item_rows_fts MATCH ? AND items.kind = ?
+                      AND row_matches(item_rows.item_id, item_rows.content)
+                    """,
+                    (match, kind),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT item_rows.item_id FROM item_rows
+                    JOIN items ON items.item_id = item_rows.item_id
+                    WHERE items.kind = ? AND row_matches(item_rows.item_id, item_rows.content)
+                    """,
+                    (kind,),
+                )
+            for (item_id,) in cursor:
+                if item_id in matched:
+                    continue
+                matched.add(item_id)
+                yield item_id
+        except sqlite3.OperationalError as e:
+            if not (is_cancelled and is_cancelled()):
+                print(f"[SearchIndex] Filter query failed: {e}")
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(history_dir) -> SearchIndex:
+    """Return the shared search index for a history directory."""
+    key = os.path.abspath(str(history_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = SearchIndex(Path(key) / SEARCH_INDEX_FILENAME)
+            _indexes[key] = index
+        return index
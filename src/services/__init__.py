@@ -6,6 +6,7 @@ and coordinate between repositories and providers.
 """
 
 from .chat_service import ChatService
+from .save_queue import ChatSaveQueue
 from .image_service import ImageGenerationService
 from .audio_service import AudioService
 from .tool_service import ToolService
@@ -15,6 +16,7 @@ from .document_conversion_service import DocumentConversionService, DocumentConv
 
 __all__ = [
     'ChatService',
+    'ChatSaveQueue',
     'ImageGenerationService',
     'AudioService',
     'ToolService',
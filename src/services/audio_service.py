@@ -8,13 +8,16 @@ import os
 import platform
 import re
 import hashlib
+import queue
 import subprocess
 import shutil
 import threading
 import tempfile
 import time
+import wave
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any, Callable, Tuple
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from datetime import datetime
 
 # Heavy native deps are imported lazily to keep app startup fast, especially on Windows.
@@ -36,6 +39,89 @@ from config import HISTORY_DIR
 from events import EventBus, EventType, Event
 
 
+# Sample format of streamed TTS audio (OpenAI ``pcm`` and Gemini LINEAR16).
+TTS_PCM_SAMPLE_RATE = 24000
+
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?…。！？])["”’)\]]*\s+|\n+')
+_CLAUSE_BREAK_RE = re.compile(r'(?<=[,;:—–])\s+')
+
+
+def _pack_pieces(pieces: List[str], max_chars: int, first_max_chars: Optional[int] = None) -> List[str]:
+    """
+    Greedily join pieces with spaces into chunks of at most ``max_chars``
+    (``first_max_chars`` for the first chunk).
+    """
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        limit = first_max_chars if first_max_chars and not chunks else max_chars
+        if current and len(current) + 1 + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_tts_chunks(text: str, max_chars: int = 300, first_chunk_chars: int = 120) -> List[str]:
+    """
+    Split text into sentence-sized chunks for pipelined TTS.
+    
+    Sentences are kept whole where possible and merged up to ``max_chars``.
+    Longer sentences are split at clause punctuation, then at whitespace. The
+    first chunk is kept short (``first_chunk_chars``) so playback can start
+    quickly.
+    
+    Parameters
+    ----------
+    text : str
+        Cleaned text to speak.
+    max_chars : int
+        Maximum characters per chunk (except single words longer than this).
+    first_chunk_chars : int
+        Maximum characters for the first chunk.
+        
+    Returns
+    -------
+    List[str]
+        Non-empty chunks in reading order.
+    """
+    pieces: List[str] = []
+    for sentence in _SENTENCE_BREAK_RE.split(text):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _pack_pieces(_CLAUSE_BREAK_RE.split(sentence), max_chars):
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+            else:
+                pieces.extend(_pack_pieces(clause.split(), max_chars))
+    
+    if pieces and len(pieces[0]) > first_chunk_chars:
+        # Start with a short chunk so playback begins quickly.
+        pieces[:1] = _pack_pieces(_CLAUSE_BREAK_RE.split(pieces[0]), first_chunk_chars)
+    return _pack_pieces(pieces, max_chars, first_max_chars=first_chunk_chars)
+
+
+@dataclass
+class PlaybackItem:
+    """An entry in the AudioService playback queue."""
+    item_id: int
+    text: str
+    synthesize: Callable[[threading.Event], Optional[Path]]
+    tag: str = ""
+    group_id: int = 0
+    use_subprocess: Optional[bool] = None
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    audio_path: Optional[Path] = None
+    synthesized: bool = False
+
+
 class AudioService:
     """
     Service for managing audio operations.
@@ -44,10 +130,20 @@ class AudioService:
     GTK-free - can be used with any UI framework.
     """
     
+    # Number of queued items synthesized ahead of the one currently playing.
+    PLAYBACK_LOOKAHEAD = 2
+
     def __init__(self, event_bus: Optional[EventBus] = None):
         self._event_bus = event_bus
         self._current_playback_stop = None
         self._current_process = None
+        
+        # Playback queue (see enqueue_playback)
+        self._queue_cond = threading.Condition()
+        self._queue_items: List[PlaybackItem] = []
+        self._playing_item: Optional[PlaybackItem] = None
+        self._next_item_id = 1
+        self._queue_threads_started = False
 
     def _should_use_paplay(self) -> bool:
         return platform.system() == "Linux" and shutil.which("paplay") is not None
@@ -490,6 +586,7 @@ class AudioService:
         audio_path: Path,
         stop_event: Optional[threading.Event] = None,
         callback: Optional[Callable[[], None]] = None,
+        event_data: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """
         Play audio file. Blocks until complete or stopped.
@@ -502,16 +599,19 @@ class AudioService:
             Event to signal playback should stop.
         callback : Optional[Callable]
             Called when playback completes.
+        event_data : Optional[Dict[str, Any]]
+            Extra fields added to the PLAYBACK_STARTED/STOPPED events.
             
         Returns
         -------
         bool
             True if played successfully.
         """
+        event_data = event_data or {}
         try:
             sd = _lazy_sd()
             sf = _lazy_sf()
-            self._emit(EventType.PLAYBACK_STARTED, audio_path=str(audio_path))
+            self._emit(EventType.PLAYBACK_STARTED, audio_path=str(audio_path), **event_data)
             
             data, sample_rate = sf.read(str(audio_path))
             
@@ -530,7 +630,12 @@ class AudioService:
             sd.wait()
             
             self._current_playback_stop = None
-            self._emit(EventType.PLAYBACK_STOPPED, audio_path=str(audio_path))
+            self._emit(
+                EventType.PLAYBACK_STOPPED,
+                audio_path=str(audio_path),
+                stopped=bool(stop_event and stop_event.is_set()),
+                **event_data,
+            )
             
             if callback:
                 callback()
@@ -546,26 +651,28 @@ class AudioService:
         self,
         audio_path: Path,
         stop_event: Optional[threading.Event] = None,
+        event_data: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """Play audio using an OS subprocess player when available."""
+        event_data = event_data or {}
         try:
-            self._emit(EventType.PLAYBACK_STARTED, audio_path=str(audio_path))
-
-            if self._should_use_paplay():
-                self._current_process = subprocess.Popen(["paplay", str(audio_path)])
-            else:
+            if not self._should_use_paplay():
                 # Fallback to in-process playback (works on Windows/macOS if PortAudio/libsndfile are available).
-                return self.play_audio(audio_path, stop_event)
+                return self.play_audio(audio_path, stop_event, event_data=event_data)
+
+            self._emit(EventType.PLAYBACK_STARTED, audio_path=str(audio_path), **event_data)
+            self._current_process = subprocess.Popen(["paplay", str(audio_path)])
             
             while self._current_process.poll() is None:
                 if stop_event and stop_event.is_set():
                     self._current_process.terminate()
                     self._current_process = None
+                    self._emit(EventType.PLAYBACK_STOPPED, audio_path=str(audio_path), stopped=True, **event_data)
                     return False
                 time.sleep(0.1)
             
             self._current_process = None
-            self._emit(EventType.PLAYBACK_STOPPED, audio_path=str(audio_path))
+            self._emit(EventType.PLAYBACK_STOPPED, audio_path=str(audio_path), stopped=False, **event_data)
             return True
         except Exception as e:
             print(f"Subprocess playback error: {e}")
@@ -576,13 +683,28 @@ class AudioService:
         self,
         audio_path: Path,
         stop_event: Optional[threading.Event] = None,
+        event_data: Optional[Dict[str, Any]] = None,
     ) -> bool:
         """
         Best-effort playback that picks an appropriate backend for the platform.
         """
         if self._should_use_paplay():
-            return self.play_audio_subprocess(audio_path, stop_event)
-        return self.play_audio(audio_path, stop_event)
+            return self.play_audio_subprocess(audio_path, stop_event, event_data=event_data)
+        return self.play_audio(audio_path, stop_event, event_data=event_data)
+    
+    def _play_path(
+        self,
+        audio_path: Path,
+        stop_event: Optional[threading.Event],
+        use_subprocess: Optional[bool],
+        event_data: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Play a file with the backend selected by ``use_subprocess``."""
+        if use_subprocess is None:
+            return self.play_audio_auto(audio_path, stop_event, event_data=event_data)
+        if use_subprocess:
+            return self.play_audio_subprocess(audio_path, stop_event, event_data=event_data)
+        return self.play_audio(audio_path, stop_event, event_data=event_data)
     
     def stop_playback(self) -> None:
         """Stop current playback."""
@@ -601,18 +723,17 @@ class AudioService:
     # Convenience: Synthesize and Play
     # -------------------------------------------------------------------------
     
-    def synthesize_and_play(
+    def synthesize(
         self,
         text: str,
         provider_type: str,
         provider: Any,
         stop_event: Optional[threading.Event] = None,
         chat_id: Optional[str] = None,
-        use_subprocess: Optional[bool] = None,
         **kwargs,
-    ) -> bool:
+    ) -> Optional[Path]:
         """
-        Synthesize speech and play it.
+        Synthesize already-cleaned text with the given backend.
         
         Parameters
         ----------
@@ -626,62 +747,114 @@ class AudioService:
             Event to signal stop.
         chat_id : Optional[str]
             Chat ID for caching audio.
-        use_subprocess : bool
-            Use paplay subprocess instead of sounddevice.
         **kwargs
             Additional arguments for synthesis (voice, model, etc.)
             
         Returns
         -------
-        bool
-            True if successful.
+        Optional[Path]
+            Path to the audio file, or None on error/stop.
         """
-        # Clean text
-        clean_text = self._clean_tts_text(text)
-        if not clean_text:
-            return True  # Nothing to say
-        
-        # Check for stop before starting
-        if stop_event and stop_event.is_set():
-            return False
-        
-        # Synthesize based on provider type
-        audio_path = None
-        
         if provider_type == 'openai':
-            audio_path = self.synthesize_openai_tts(
-                clean_text, provider,
+            return self.synthesize_openai_tts(
+                text, provider,
                 voice=kwargs.get('voice', 'alloy'),
                 model=kwargs.get('model', 'tts-1'),
                 chat_id=chat_id,
                 stop_event=stop_event,
             )
-        elif provider_type == 'gemini':
-            audio_path = self.synthesize_gemini_tts(
-                clean_text, provider,
+        if provider_type == 'gemini':
+            return self.synthesize_gemini_tts(
+                text, provider,
                 voice=kwargs.get('voice', 'Kore'),
                 chat_id=chat_id,
                 prompt_template=kwargs.get('prompt_template', ''),
                 stop_event=stop_event,
             )
-        elif provider_type == 'audio_preview':
-            audio_path = self.synthesize_audio_preview(
-                clean_text, provider,
+        if provider_type == 'audio_preview':
+            return self.synthesize_audio_preview(
+                text, provider,
                 model_id=kwargs.get('model_id', 'gpt-4o-audio-preview'),
                 voice=kwargs.get('voice', 'alloy'),
                 prompt_template=kwargs.get('prompt_template', 'Please say the following verbatim: "{text}"'),
                 chat_id=chat_id,
                 stop_event=stop_event,
             )
-        elif provider_type == 'custom':
-            audio_path = self.synthesize_custom_tts(
-                clean_text, provider,
+        if provider_type == 'custom':
+            return self.synthesize_custom_tts(
+                text, provider,
                 voice=kwargs.get('voice', ''),
                 model_id=kwargs.get('model_id', 'custom'),
                 chat_id=chat_id,
                 stop_event=stop_event,
             )
+        return None
+    
+    def synthesize_and_play(
+        self,
+        text: str,
+        provider_type: str,
+        provider: Any,
+        stop_event: Optional[threading.Event] = None,
+        chat_id: Optional[str] = None,
+        use_subprocess: Optional[bool] = None,
+        pipelined: bool = True,
+        **kwargs,
+    ) -> bool:
+        """
+        Synthesize speech and play it.
+        
+        In pipelined mode the text is split into sentences; chunk N+1 is
+        synthesized while chunk N plays, and each chunk is cached on its own.
+        When the first chunk is not cached and the backend can stream PCM
+        (OpenAI TTS, Gemini), it is streamed straight to the audio output.
+        
+        Parameters
+        ----------
+        text : str
+            Text to synthesize.
+        provider_type : str
+            One of: 'openai', 'gemini', 'audio_preview', 'custom'
+        provider : Any
+            The AI provider instance.
+        stop_event : Optional[threading.Event]
+            Event to signal stop.
+        chat_id : Optional[str]
+            Chat ID for caching audio.
+        use_subprocess : bool
+            Use paplay subprocess instead of sounddevice.
+        pipelined : bool
+            Split into sentences and overlap synthesis with playback.
+        **kwargs
+            Additional arguments for synthesis (voice, model, etc.)
+            
+        Returns
+        -------
+        bool
+            True if successful.
+        """
+        # Clean text
+        clean_text = self._clean_tts_text(text)
+        if not clean_text:
+            return True  # Nothing to say
+        
+        # Check for stop before starting
+        if stop_event and stop_event.is_set():
+            return False
+        
+        if pipelined:
+            return self._synthesize_and_play_pipelined(
+                split_tts_chunks(clean_text), provider_type, provider,
+                stop_event=stop_event or threading.Event(),
+                chat_id=chat_id,
+                use_subprocess=use_subprocess,
+                **kwargs,
+            )
         
+        audio_path = self.synthesize(
+            clean_text, provider_type, provider,
+            stop_event=stop_event, chat_id=chat_id, **kwargs,
+        )
         if not audio_path:
             return False
         
@@ -689,9 +862,507 @@ class AudioService:
         if stop_event and stop_event.is_set():
             return False
         
-        # Play
-        if use_subprocess is None:
-            return self.play_audio_auto(audio_path, stop_event)
-        if use_subprocess:
-            return self.play_audio_subprocess(audio_path, stop_event)
-        return self.play_audio(audio_path, stop_event)
+        return self._play_path(audio_path, stop_event, use_subprocess)
+    
+    def _synthesize_and_play_pipelined(
+        self,
+        chunks: List[str],
+        provider_type: str,
+        provider: Any,
+        stop_event: threading.Event,
+        chat_id: Optional[str],
+        use_subprocess: Optional[bool],
+        **kwargs,
+    ) -> bool:
+        """Play chunks in order while a worker synthesizes the following ones."""
+        # ``pipeline_stop`` aborts the producer without touching the caller's event.
+        pipeline_stop = threading.Event()
+        ready: queue.Queue = queue.Queue(maxsize=self.PLAYBACK_LOOKAHEAD)
+        stream_first = bool(chunks) and self._can_stream_pcm(provider_type, provider)
+        
+        def put(item) -> bool:
+            while not pipeline_stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def producer():
+            try:
+                for index, chunk in enumerate(chunks):
+                    if pipeline_stop.is_set():
+                        return
+                    if index == 0 and stream_first and not self._check_cache(
+                        self._chunk_cache_path(chunk, provider_type, chat_id, **kwargs)
+                    ):
+                        # The consumer streams this chunk itself.
+                        if not put((chunk, None, True)):
+                            return
+                        continue
+                    try:
+                        audio_path = self.synthesize(
+                            chunk, provider_type, provider,
+                            stop_event=pipeline_stop, chat_id=chat_id, **kwargs,
+                        )
+                    except Exception as e:
+                        print(f"[AudioService] Chunk synthesis failed: {e}")
+                        audio_path = None
+                    if not put((chunk, audio_path, False)):
+                        return
+            finally:
+                put(None)
+        
+        threading.Thread(target=producer, name="tts-pipeline", daemon=True).start()
+        
+        success = True
+        try:
+            while True:
+                if stop_event.is_set():
+                    return False
+                try:
+                    item = ready.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    return success
+                
+                chunk, audio_path, stream = item
+                if stream:
+                    streamed = self._stream_chunk(
+                        chunk, provider_type, provider, stop_event, chat_id, use_subprocess, **kwargs
+                    )
+                    if streamed is not None:
+                        success = success and streamed
+                        continue
+                    # Streaming unavailable; fall back to a synthesized file.
+                    audio_path = self.synthesize(
+                        chunk, provider_type, provider,
+                        stop_event=stop_event, chat_id=chat_id, **kwargs,
+                    )
+                
+                if stop_event.is_set():
+                    return False
+                if not audio_path:
+                    success = False
+                    continue
+                success = self._play_path(audio_path, stop_event, use_subprocess) and success
+        finally:
+            pipeline_stop.set()
+    
+    def _chunk_cache_path(
+        self,
+        text: str,
+        provider_type: str,
+        chat_id: Optional[str],
+        **kwargs,
+    ) -> Optional[Path]:
+        """Cache path a streamed chunk shares with synthesize() for the same text."""
+        if not chat_id:
+            return None
+        if provider_type == 'openai':
+            return self._get_cache_path(text, chat_id, f"openai_{kwargs.get('model', 'tts-1')}", kwargs.get('voice', 'alloy'))
+        if provider_type == 'gemini':
+            prompt_template = kwargs.get('prompt_template', '')
+            prompt_text = prompt_template.replace('{text}', text) if prompt_template and '{text}' in prompt_template else text
+            return self._get_cache_path(prompt_text, chat_id, "gemini", kwargs.get('voice', 'Kore'), prompt_template)
+        return None
+    
+    def _can_stream_pcm(self, provider_type: str, provider: Any) -> bool:
+        if provider_type == 'openai':
+            return hasattr(provider, 'audio')
+        if provider_type == 'gemini':
+            return hasattr(provider, 'stream_speech')
+        return False
+    
+    def _stream_chunk(
+        self,
+        text: str,
+        provider_type: str,
+        provider: Any,
+        stop_event: threading.Event,
+        chat_id: Optional[str],
+        use_subprocess: Optional[bool],
+        **kwargs,
+    ) -> Optional[bool]:
+        """
+        Synthesize one chunk as streamed PCM and play it as it arrives.
+        
+        Returns None if streaming could not start (the caller falls back to
+        file synthesis), otherwise whether the chunk played completely.
+        """
+        cache_path = self._chunk_cache_path(text, provider_type, chat_id, **kwargs)
+        try:
+            if provider_type == 'openai':
+                response_cm = provider.audio.speech.with_streaming_response.create(
+                    model=kwargs.get('model', 'tts-1'),
+                    voice=kwargs.get('voice', 'alloy'),
+                    input=text,
+                    response_format="pcm",
+                )
+                with response_cm as response:
+                    return self._play_pcm_stream(response.iter_bytes(), cache_path, stop_event, use_subprocess)
+            if provider_type == 'gemini':
+                prompt_template = kwargs.get('prompt_template', '')
+                prompt_text = prompt_template.replace('{text}', text) if prompt_template and '{text}' in prompt_template else text
+                return self._play_pcm_stream(
+                    provider.stream_speech(prompt_text, kwargs.get('voice', 'Kore')),
+                    cache_path, stop_event, use_subprocess,
+                )
+        except Exception as e:
+            print(f"[AudioService] Streaming TTS unavailable, synthesizing to file instead: {e}")
+        return None
+    
+    def _play_pcm_stream(
+        self,
+        pcm_chunks,
+        cache_path: Optional[Path],
+        stop_event: threading.Event,
+        use_subprocess: Optional[bool],
+    ) -> bool:
+        """
+        Play 16-bit mono PCM from an iterator while writing it to ``cache_path``.
+        
+        Uses ``paplay --raw`` where paplay is the playback backend, otherwise a
+        sounddevice output stream. Raises if no audio arrives or the output
+        cannot be opened (so the caller can fall back to file synthesis); the
+        cache file is only kept if the stream completes.
+        """
+        pcm_chunks = iter(pcm_chunks)
+        first = b""
+        while not first:
+            first = next(pcm_chunks, None)
+            if first is None:
+                raise RuntimeError("TTS stream returned no audio")
+        
+        use_paplay = self._should_use_paplay() if use_subprocess is not False else False
+        part_path = cache_path.with_suffix(".part") if cache_path else None
+        wav_file = None
+        if part_path:
+            wav_file = wave.open(str(part_path), "wb")
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(TTS_PCM_SAMPLE_RATE)
+        
+        completed = False
+        started = False
+        try:
+            if use_paplay:
+                process = subprocess.Popen(
+                    ["paplay", "--raw", "--format=s16le", f"--rate={TTS_PCM_SAMPLE_RATE}", "--channels=1"],
+                    stdin=subprocess.PIPE,
+                )
+                self._current_process = process
+                write = process.stdin.write
+            else:
+                sd = _lazy_sd()
+                stream = sd.RawOutputStream(samplerate=TTS_PCM_SAMPLE_RATE, channels=1, dtype='int16')
+                stream.start()
+                write = stream.write
+            
+            started = True
+            self._current_playback_stop = stop_event
+            self._emit(EventType.PLAYBACK_STARTED, audio_path=str(cache_path or ""), streaming=True)
+            try:
+                pending = b""
+                for data in _chain_first(first, pcm_chunks):
+                    if stop_event.is_set():
+                        break
+                    # Keep whole 16-bit samples; carry an odd byte to the next write.
+                    data = pending + data
+                    usable = len(data) - (len(data) % 2)
+                    pending = data[usable:]
+                    if not usable:
+                        continue
+                    write(data[:usable])
+                    if wav_file:
+                        wav_file.writeframes(data[:usable])
+                else:
+                    completed = True
+            except Exception as e:
+                # Part of the chunk was already heard; don't fall back and repeat it.
+                print(f"[AudioService] Streaming TTS interrupted: {e}")
+            finally:
+                if use_paplay:
+                    try:
+                        process.stdin.close()
+                    except Exception:
+                        pass
+                    while process.poll() is None:
+                        if stop_event.is_set():
+                            process.terminate()
+                            break
+                        time.sleep(0.05)
+                    self._current_process = None
+                else:
+                    if stop_event.is_set():
+                        stream.abort()
+                    else:
+                        stream.stop()
+                    stream.close()
+                self._current_playback_stop = None
+        finally:
+            if wav_file:
+                wav_file.close()
+                if completed and not stop_event.is_set():
+                    os.replace(part_path, cache_path)
+                else:
+                    part_path.unlink(missing_ok=True)
+            if started:
+                self._emit(
+                    EventType.PLAYBACK_STOPPED,
+                    audio_path=str(cache_path or ""),
+                    stopped=stop_event.is_set(),
+                    streaming=True,
+                )
+        return completed and not stop_event.is_set()
+    
+    # -------------------------------------------------------------------------
+    # Playback Queue
+    # -------------------------------------------------------------------------
+    # Queued items are synthesized in order on one worker (up to
+    # PLAYBACK_LOOKAHEAD items ahead of playback) and played in order on
+    # another, so callers such as the read_aloud tool return immediately.
+    # Every item ends with a PLAYBACK_STOPPED event carrying its ``item_id``,
+    # ``group_id`` and ``stopped`` (True if skipped/cancelled mid-playback). Items that did
+    # not play through also carry ``status``: 'failed' (synthesis or playback
+    # failed) or 'cancelled'.
+    
+    def enqueue_speech(
+        self,
+        text: str,
+        provider_type: str,
+        provider: Any,
+        chat_id: Optional[str] = None,
+        use_subprocess: Optional[bool] = None,
+        tag: str = "",
+        **kwargs,
+    ) -> Optional[int]:
+        """
+        Queue text to be synthesized and played in the background.
+        
+        Parameters
+        ----------
+        text : str
+            Text to speak.
+        provider_type : str
+            One of: 'openai', 'gemini', 'audio_preview', 'custom'
+        provider : Any
+            The AI provider instance.
+        chat_id : Optional[str]
+            Chat ID for caching audio.
+        use_subprocess : Optional[bool]
+            Playback backend (None picks one for the platform).
+        tag : str
+            Label used to cancel a group of items (see cancel_playback).
+        **kwargs
+            Additional arguments for synthesis (voice, model, etc.)
+            
+        Returns
+        -------
+        Optional[int]
+            The group ID shared by the queued sentence chunks (equal to the
+            first item's ID), or None if there is nothing to say.
+        """
+        clean_text = self._clean_tts_text(text)
+        if not clean_text:
+            return None
+        
+        # One item per sentence chunk: the queue's lookahead then synthesizes
+        # the next sentence while the current one plays.
+        group_id = None
+        for chunk in split_tts_chunks(clean_text):
+            def synthesize(stop_event: threading.Event, chunk=chunk) -> Optional[Path]:
+                return self.synthesize(
+                    chunk, provider_type, provider,
+                    stop_event=stop_event, chat_id=chat_id, **kwargs,
+                )
+            item_id = self.enqueue_playback(
+                synthesize, text=chunk, tag=tag, use_subprocess=use_subprocess, group_id=group_id,
+            )
+            if group_id is None:
+                group_id = item_id
+        return group_id
+    
+    def enqueue_playback(
+        self,
+        synthesize: Callable[[threading.Event], Optional[Path]],
+        text: str = "",
+        tag: str = "",
+        use_subprocess: Optional[bool] = None,
+        group_id: Optional[int] = None,
+    ) -> int:
+        """
+        Queue an item whose audio is produced by ``synthesize(stop_event)``.
+        
+        Items sharing a ``group_id`` (e.g. the sentences of one utterance) are
+        skipped together. By default an item forms its own group.
+        
+        Returns
+        -------
+        int
+            The queue item ID.
+        """
+        with self._queue_cond:
+            item_id = self._next_item_id
+            item = PlaybackItem(
+                item_id=item_id,
+                text=text,
+                synthesize=synthesize,
+                tag=tag,
+                group_id=group_id if group_id is not None else item_id,
+                use_subprocess=use_subprocess,
+            )
+            self._next_item_id += 1
+            self._queue_items.append(item)
+            self._ensure_queue_threads()
+            self._queue_cond.notify_all()
+        return item.item_id
+    
+    def skip_playback(self) -> bool:
+        """
+        Stop the utterance currently playing and continue with the next one.
+        
+        Returns
+        -------
+        bool
+            True if an item was playing.
+        """
+        with self._queue_cond:
+            item = self._playing_item
+            if item is None:
+                return False
+            skipped = [i for i in self._queue_items if i.group_id == item.group_id]
+            self._queue_items = [i for i in self._queue_items if i.group_id != item.group_id]
+            item.stop_event.set()
+            self._queue_cond.notify_all()
+        for queued in skipped:
+            queued.stop_event.set()
+            self._emit(
+                EventType.PLAYBACK_STOPPED,
+                audio_path=None, item_id=queued.item_id, group_id=queued.group_id,
+                stopped=True, status='cancelled',
+            )
+        return True
+    
+    def cancel_playback(self, tag: Optional[str] = None) -> int:
+        """
+        Cancel queued items and stop the current one.
+        
+        Parameters
+        ----------
+        tag : Optional[str]
+            Only cancel items with this tag. None cancels everything.
+            
+        Returns
+        -------
+        int
+            Number of items cancelled (including the one playing).
+        """
+        with self._queue_cond:
+            cancelled = [i for i in self._queue_items if tag is None or i.tag == tag]
+            self._queue_items = [i for i in self._queue_items if i not in cancelled]
+            playing = self._playing_item
+            if playing is not None and (tag is None or playing.tag == tag):
+                playing.stop_event.set()
+            else:
+                playing = None
+            self._queue_cond.notify_all()
+        
+        for item in cancelled:
+            item.stop_event.set()
+            self._emit(
+                EventType.PLAYBACK_STOPPED,
+                audio_path=None, item_id=item.item_id, group_id=item.group_id,
+                stopped=True, status='cancelled',
+            )
+        return len(cancelled) + (1 if playing is not None else 0)
+    
+    def get_playback_queue_length(self) -> int:
+        """Number of items waiting or playing in the playback queue."""
+        with self._queue_cond:
+            return len(self._queue_items) + (1 if self._playing_item is not None else 0)
+    
+    def _ensure_queue_threads(self) -> None:
+        """Start the queue workers on first use (caller holds the lock)."""
+        if self._queue_threads_started:
+            return
+        self._queue_threads_started = True
+        threading.Thread(target=self._synthesis_worker, name="tts-synthesis", daemon=True).start()
+        threading.Thread(target=self._playback_worker, name="tts-playback", daemon=True).start()
+    
+    def _next_item_to_synthesize(self) -> Optional[PlaybackItem]:
+        ready = 0
+        for item in self._queue_items:
+            if not item.synthesized:
+                return item if ready < self.PLAYBACK_LOOKAHEAD else None
+            ready += 1
+        return None
+    
+    def _synthesis_worker(self) -> None:
+        while True:
+            with self._queue_cond:
+                item = self._next_item_to_synthesize()
+                while item is None:
+                    self._queue_cond.wait()
+                    item = self._next_item_to_synthesize()
+            
+            audio_path = None
+            if not item.stop_event.is_set():
+                try:
+                    audio_path = item.synthesize(item.stop_event)
+                except Exception as e:
+                    print(f"[AudioService] Synthesis failed for queue item {item.item_id}: {e}")
+            
+            with self._queue_cond:
+                item.audio_path = audio_path
+                item.synthesized = True
+                self._queue_cond.notify_all()
+    
+    def _playback_worker(self) -> None:
+        while True:
+            with self._queue_cond:
+                while not (self._queue_items and self._queue_items[0].synthesized):
+                    self._queue_cond.wait()
+                item = self._queue_items.pop(0)
+                self._playing_item = item
+                self._queue_cond.notify_all()
+            
+            try:
+                if item.audio_path is None or item.stop_event.is_set():
+                    status = 'cancelled' if item.stop_event.is_set() else 'failed'
+                    self._emit_item_stopped(item, None, status)
+                else:
+                    # play_* emit PLAYBACK_STARTED/STOPPED; tag them with the item.
+                    played = self._play_path(
+                        item.audio_path,
+                        item.stop_event,
+                        item.use_subprocess,
+                        event_data={'item_id': item.item_id, 'group_id': item.group_id},
+                    )
+                    if not played and not item.stop_event.is_set():
+                        print(f"[AudioService] Playback failed for queue item {item.item_id}")
+                        self._emit_item_stopped(item, item.audio_path, 'failed')
+            except Exception as e:
+                print(f"[AudioService] Playback error for queue item {item.item_id}: {e}")
+                self._emit_item_stopped(item, item.audio_path, 'failed')
+            finally:
+                with self._queue_cond:
+                    self._playing_item = None
+                    self._queue_cond.notify_all()
+    
+    def _emit_item_stopped(self, item: PlaybackItem, audio_path: Optional[Path], status: str) -> None:
+        """Emit the PLAYBACK_STOPPED event of an item that did not play through."""
+        self._emit(
+            EventType.PLAYBACK_STOPPED,
+            audio_path=str(audio_path) if audio_path else None,
+            item_id=item.item_id, group_id=item.group_id,
+            stopped=True, status=status,
+        )
+
+
+def _chain_first(first, rest):
+    """Yield ``first`` followed by the items of ``rest``."""
+    yield first
+    yield from rest
@@ -2,7 +2,7 @@
 Chat service for managing conversation lifecycle and message handling.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any
 from datetime import datetime
 
 from repositories import (
@@ -13,6 +13,7 @@ from repositories import (
 from conversation import ConversationHistory, Message, create_system_message
 from utils import generate_chat_name
 from events import EventBus, EventType, Event
+from .save_queue import ChatSaveQueue
 
 
 class ChatService:
@@ -53,6 +54,8 @@ class ChatService:
         self._api_keys_repo = api_keys_repo
         self._event_bus = event_bus
         self._settings_manager = settings_manager
+        # Chat writes run on a worker thread so the UI never waits on disk.
+        self._save_queue = ChatSaveQueue()
     
     def _emit(self, event_type: EventType, **data) -> None:
         """Emit an event if event bus is configured."""
@@ -110,15 +113,21 @@ class ChatService:
         Optional[ConversationHistory]
             The conversation history if found, None otherwise.
         """
+        # A save of this chat may still be queued; read what it will write.
+        self._save_queue.wait(self._save_key(chat_id))
         history = self._history_repo.get(chat_id)
         if history:
             self._emit(EventType.CHAT_LOADED, chat_id=chat_id, message_count=len(history))
         return history
     
-    def save_chat(self, chat_id: str, history: ConversationHistory) -> str:
+    def save_chat(self, chat_id: str, history: ConversationHistory, wait: bool = False) -> str:
         """
         Save a chat conversation.
         
+        The write is queued and performed on a background thread; a queued
+        save of the same chat that has not started yet is replaced by this
+        one. ``history`` must not be modified afterwards, so pass a snapshot.
+        
         Parameters
         ----------
         chat_id : str
@@ -126,6 +135,8 @@ class ChatService:
             ID will be generated based on the first user message.
         history : ConversationHistory
             The conversation history to save.
+        wait : bool
+            Block until the chat has been written.
             
         Returns
         -------
@@ -147,10 +158,38 @@ class ChatService:
             if chat_id.endswith('.json'):
                 chat_id = chat_id[:-5]
         
-        self._history_repo.save(chat_id, history)
-        self._emit(EventType.CHAT_SAVED, chat_id=chat_id, message_count=len(history))
+        repo = self._history_repo
+        
+        def write():
+            repo.save(chat_id, history)
+            self._emit(EventType.CHAT_SAVED, chat_id=chat_id, message_count=len(history))
+        
+        key = self._save_key(chat_id)
+        self._save_queue.submit(key, write)
+        if wait:
+            self._save_queue.wait(key)
         return chat_id
     
+    def flush_saves(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all queued chat saves have been written.
+        
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum seconds to wait; None waits indefinitely.
+            
+        Returns
+        -------
+        bool
+            False if the timeout expired with saves still pending.
+        """
+        return self._save_queue.flush(timeout)
+    
+    def _save_key(self, chat_id: str) -> tuple:
+        """Queue key for a chat in the current history directory."""
+        return (str(self._history_repo.history_dir), chat_id)
+    
     def delete_chat(self, chat_id: str) -> bool:
         """
         Delete a chat conversation.
@@ -165,6 +204,7 @@ class ChatService:
         bool
             True if deleted successfully, False otherwise.
         """
+        self._save_queue.discard(self._save_key(chat_id))
         result = self._history_repo.delete(chat_id)
         if result:
             self._emit(EventType.CHAT_DELETED, chat_id=chat_id)
@@ -182,6 +222,33 @@ class ChatService:
         metadata_list = self._history_repo.list_all()
         return [meta.to_dict() for meta in metadata_list]
     
+    def iter_content_matches(
+        self,
+        text: str,
+        whole_words: bool = False,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield IDs of chats whose messages contain ``text``.
+        
+        May read from disk; call it from a worker thread.
+        
+        Parameters
+        ----------
+        text : str
+            Filter text.
+        whole_words : bool
+            Only match whole words.
+        is_cancelled : Optional[Callable[[], bool]]
+            Polled while searching; stops early once it returns True.
+            
+        Returns
+        -------
+        Iterator[str]
+            Matching chat IDs, as they are found.
+        """
+        return self._history_repo.iter_content_matches(text, whole_words, is_cancelled)
+    
     def search_history(self, query: str, limit: int = 10, exclude_chat_id: Optional[str] = None, context_window: int = 200) -> List[Dict[str, Any]]:
         """
         Search chat histories for a keyword.
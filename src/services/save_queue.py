@@ -0,0 +1,113 @@
+"""
+Write-behind queue for chat persistence.
+
+Saving a chat serializes the whole conversation and touches the disk, which
+is too slow to do on the GTK main thread for long chats. :class:`ChatSaveQueue`
+runs the writes on a single worker thread instead. Callers hand it a write
+for a key (normally a chat ID); a write queued while an earlier one for the
+same key is still waiting replaces it, so bursts of saves during streaming
+or tool use collapse into one write of the latest snapshot.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class ChatSaveQueue:
+    """
+    Single worker thread that performs queued writes in submission order.
+
+    Writes for the same key never overlap and run in the order they were
+    submitted; a pending write is coalesced with newer ones for its key.
+    """
+
+    def __init__(self, name: str = "chat-save-queue"):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the worker thread.
+        """
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[Hashable, Callable[[], None]]" = OrderedDict()
+        self._active: Optional[Hashable] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: Hashable, write: Callable[[], None]) -> None:
+        """
+        Queue a write, replacing any write for ``key`` that has not started.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies what is written (e.g. the chat ID).
+        write : Callable[[], None]
+            Performs the write on the worker thread. It must only use data
+            captured at submission time.
+        """
+        with self._cond:
+            self._pending[key] = write
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a queued write for ``key`` and wait for one in progress."""
+        with self._cond:
+            self._pending.pop(key, None)
+        self.wait(key)
+
+    def is_pending(self, key: Optional[Hashable] = None) -> bool:
+        """Return True while a write for ``key`` (or any write) is outstanding."""
+        with self._cond:
+            return self._is_pending(key)
+
+    def wait(self, key: Optional[Hashable] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until writes for ``key`` (or all writes) have completed.
+
+        Returns
+        -------
+        bool
+            False if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._is_pending(key):
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued write has completed."""
+        return self.wait(None, timeout)
+
+    def _is_pending(self, key: Optional[Hashable]) -> bool:
+        if key is None:
+            return bool(self._pending) or self._active is not None
+        return key in self._pending or self._active == key
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                key, write = self._pending.popitem(last=False)
+                self._active = key
+            try:
+                write()
+            except Exception as e:
+                print(f"[ChatSaveQueue] Error writing {key}: {e}")
+            finally:
+                with self._cond:
+                    self._active = None
+                    self._cond.notify_all()
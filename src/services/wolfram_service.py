@@ -1,6 +1,8 @@
 import requests
 from typing import Optional
 
+from http_transport import get_http_transport
+
 class WolframService:
     """Service for interacting with the Wolfram Alpha LLM API."""
 
@@ -27,7 +29,7 @@ class WolframService:
         }
 
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
+            response = get_http_transport().get(self.base_url, params=params, timeout=30)
             
             if response.status_code == 200:
                 return response.text
@@ -12,8 +12,9 @@ This module provides:
 from __future__ import annotations
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from model_cards import get_card
 
@@ -48,6 +49,7 @@ class ToolSpec:
     description: str
     parameters: Dict[str, Any]  # JSON Schema for parameters
     prompt_appendix: str = ""   # Guidance to add to system prompt when tool is enabled
+    serial: bool = False        # Never run concurrently with other calls in the same round
 
 
 # ---------------------------------------------------------------------------
@@ -103,6 +105,8 @@ TEXT_GET_TOOL_SPEC = ToolSpec(
     prompt_appendix=(
         "Use text_get to read the current text for a target before editing."
     ),
+    # Must observe edits requested earlier in the same round.
+    serial=True,
 )
 
 APPLY_TEXT_EDIT_TOOL_SPEC = ToolSpec(
@@ -143,6 +147,8 @@ APPLY_TEXT_EDIT_TOOL_SPEC = ToolSpec(
     prompt_appendix=(
         "When updating a text target, prefer operation=search_replace for targeted edits."
     ),
+    # Edits to the same target must be applied in the order requested.
+    serial=True,
 )
 
 MUSIC_TOOL_SPEC = ToolSpec(
@@ -181,6 +187,8 @@ MUSIC_TOOL_SPEC = ToolSpec(
             },
         },
     },
+    # Player commands (play, pause, next, ...) are order dependent.
+    serial=True,
 )
 
 READ_ALOUD_TOOL_SPEC = ToolSpec(
@@ -200,6 +208,8 @@ READ_ALOUD_TOOL_SPEC = ToolSpec(
             },
         },
     },
+    # Speech must come out in the order it was requested.
+    serial=True,
 )
 
 SEARCH_TOOL_SPEC = ToolSpec(
@@ -614,6 +624,75 @@ def run_tool_call(
         return f"Error: unknown tool '{tool_name}' requested."
 
 
+def is_serial_tool(tool_name: str) -> bool:
+    """Return True if calls to the tool must not run concurrently with others."""
+    spec = TOOL_REGISTRY.get(tool_name)
+    return bool(spec and spec.serial)
+
+
+def _get_tool_call_concurrency() -> int:
+    try:
+        return max(1, int(_get_setting_value("TOOL_CALL_CONCURRENCY", 4)))
+    except Exception:
+        return 4
+
+
+def run_tool_calls(
+    calls: List[Tuple[str, Dict[str, Any]]],
+    context: ToolContext,
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Dispatch all tool calls requested in one model turn.
+
+    Independent calls run concurrently on a bounded worker pool. Tools whose
+    spec is marked ``serial`` act as barriers: every earlier call finishes
+    before a serial call starts, and no later call starts until it is done.
+    Results are always returned in the order the calls were requested.
+
+    Parameters
+    ----------
+    calls : List[Tuple[str, Dict[str, Any]]]
+        ``(tool_name, args)`` pairs in the order the model requested them.
+    context : ToolContext
+        Context containing the handler callables.
+    max_workers : Optional[int]
+        Upper bound on concurrently running calls. Defaults to the
+        TOOL_CALL_CONCURRENCY setting.
+
+    Returns
+    -------
+    List[str]
+        One result per call, in request order.
+    """
+    if max_workers is None:
+        max_workers = _get_tool_call_concurrency()
+    parallel_count = sum(1 for name, _ in calls if not is_serial_tool(name))
+    if max_workers <= 1 or parallel_count <= 1:
+        return [run_tool_call(name, args, context) for name, args in calls]
+
+    results: List[str] = [""] * len(calls)
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, parallel_count),
+        thread_name_prefix="tool-call",
+    ) as executor:
+        pending = []
+
+        def drain():
+            for index, future in pending:
+                results[index] = future.result()
+            pending.clear()
+
+        for index, (name, args) in enumerate(calls):
+            if is_serial_tool(name):
+                drain()
+                results[index] = run_tool_call(name, args, context)
+            else:
+                pending.append((index, executor.submit(run_tool_call, name, args, context)))
+        drain()
+    return results
+
+
 def parse_tool_arguments(raw_args: str) -> Dict[str, Any]:
     """
     Parse raw JSON arguments from a tool call.
@@ -35,6 +35,7 @@ class ChatView(UIComponent):
     - Scrollable message display
     - Delegates rendering to MessageRenderer
     - Animated thinking indicator with cancel button
+    - Live preview of streamed assistant text
     - Event-driven updates
     """
     
@@ -76,6 +77,14 @@ class ChatView(UIComponent):
         self._thinking_dots = 0
         self._loader_animation_state = 0
         
+        # Streaming preview state. Deltas are accumulated off the main thread
+        # and flushed to the label in a single idle callback.
+        self._stream_container = None
+        self._stream_label = None
+        self._stream_index = None
+        self._stream_text = ""
+        self._stream_update_pending = False
+        
         self.message_widgets: List[Any] = []
         
         # Build UI
@@ -84,6 +93,7 @@ class ChatView(UIComponent):
         # Subscribe to events
         self.subscribe(EventType.THINKING_STARTED, self._on_thinking_started)
         self.subscribe(EventType.THINKING_STOPPED, self._on_thinking_stopped)
+        self.subscribe(EventType.MESSAGE_STREAMING, self._on_message_streaming)
     
     def _build_ui(self):
         """Build the chat view UI."""
@@ -119,6 +129,9 @@ class ChatView(UIComponent):
         for child in self.conversation_box.get_children():
             child.destroy()
         self.message_widgets.clear()
+        self._stream_container = None
+        self._stream_label = None
+        self._stream_index = None
     
     def update_chat_id(self, chat_id: str):
         """Update the current chat ID for image paths."""
@@ -267,9 +280,69 @@ class ChatView(UIComponent):
         self._thinking_label = None
         self._loader_dot = None
     
+    def _show_stream_impl(self):
+        """Create or update the streaming preview with the accumulated text."""
+        self._stream_update_pending = False
+        text = self._stream_text
+        if not text:
+            return False
+        
+        adj = self.widget.get_vadjustment()
+        at_bottom = adj.get_value() >= adj.get_upper() - adj.get_page_size() - 20
+        
+        if self._stream_container is None:
+            hex_color = rgb_to_hex(self._ai_color)
+            self._stream_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+            css = """
+                box {
+                    background-color: @theme_base_color;
+                    padding: 12px;
+                    border-radius: 12px;
+                }
+            """
+            css_provider = Gtk.CssProvider()
+            css_provider.load_from_data(css.encode())
+            self._stream_container.get_style_context().add_provider(
+                css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
+            
+            header = Gtk.Label()
+            header.set_markup(f"<span color='{hex_color}' weight='bold'>{GLib.markup_escape_text(self._ai_name)}</span>")
+            header.set_xalign(0)
+            self._stream_container.pack_start(header, False, False, 0)
+            
+            self._stream_label = Gtk.Label()
+            self._stream_label.set_xalign(0)
+            self._stream_label.set_line_wrap(True)
+            self._stream_label.set_selectable(True)
+            self._stream_container.pack_start(self._stream_label, False, False, 0)
+            
+            self.conversation_box.pack_start(self._stream_container, False, False, 0)
+            # Keep the thinking indicator (and its cancel button) below the preview.
+            if self._thinking_container:
+                position = self.conversation_box.get_children().index(self._thinking_container)
+                self.conversation_box.reorder_child(self._stream_container, position)
+            self._stream_container.show_all()
+        
+        self._stream_label.set_text(text)
+        if at_bottom:
+            self.scroll_to_bottom()
+        return False
+    
+    def _clear_stream_impl(self):
+        """Remove the streaming preview, if any."""
+        self._stream_text = ""
+        self._stream_index = None
+        if self._stream_container:
+            self._stream_container.destroy()
+        self._stream_container = None
+        self._stream_label = None
+        return False
+    
     def _on_cancel_clicked(self, button):
         """Handle cancel button click."""
         self._hide_thinking_impl()
+        self._clear_stream_impl()
         if self._on_cancel:
             self._on_cancel()
     
@@ -280,3 +353,17 @@ class ChatView(UIComponent):
     def _on_thinking_stopped(self, event):
         """Handle THINKING_STOPPED event."""
         self.hide_thinking()
+        # The final message has been appended by now (MESSAGE_RECEIVED is
+        # published first), so the provisional preview can go.
+        self.schedule_ui_update(self._clear_stream_impl)
+    
+    def _on_message_streaming(self, event):
+        """Handle MESSAGE_STREAMING event - coalesce deltas into one UI update."""
+        index = event.data.get('index')
+        if index != self._stream_index:
+            self._stream_index = index
+            self._stream_text = ""
+        self._stream_text = event.data.get('content') or (self._stream_text + event.data.get('delta', ''))
+        if not self._stream_update_pending:
+            self._stream_update_pending = True
+            self.schedule_ui_update(self._show_stream_impl)
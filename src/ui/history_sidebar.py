@@ -8,6 +8,8 @@ It subscribes to events for reactive updates.
 from typing import Optional, Callable, List, Dict, Any
 from datetime import datetime
 import re
+import threading
+import time
 
 import gi
 gi.require_version('Gtk', '3.0')
@@ -24,10 +26,20 @@ class HistorySidebar(UIComponent):
     Features:
     - Displays list of saved chats with title and timestamp
     - Handles chat selection and right-click context menu
-    - Filtering with titles-only and whole-words options
+    - Filtering with titles-only and whole-words options; content
+      matches are found on a worker thread and stream into the list
     - Event-driven updates
     """
     
+    # Debounce before applying filter text (titles / message content)
+    TITLE_FILTER_DELAY_MS = 150
+    CONTENT_FILTER_DELAY_MS = 300
+    # Content matches are added to the list in batches this large/often
+    CONTENT_BATCH_SIZE = 25
+    CONTENT_BATCH_INTERVAL = 0.1
+    # Rows are created this many at a time, as the list is scrolled
+    ROW_PAGE_SIZE = 60
+    
     def __init__(
         self,
         event_bus: Optional[EventBus] = None,
@@ -91,6 +103,19 @@ class HistorySidebar(UIComponent):
         self._filter_titles_only = True
         self._filter_whole_words = False
         self._filter_timeout_id = None
+        # Bumped on every refresh; content queries of older generations are stale
+        self._filter_generation = 0
+        # Chats not matched by title, waiting on the content query
+        self._pending_content_rows: Dict[str, Dict[str, Any]] = {}
+        # chat_id -> position in the full (unfiltered) listing
+        self._listing_positions: Dict[str, int] = {}
+        
+        # List model: keys of everything shown, in order, with their data.
+        # Only the first ``_materialized`` keys have rows in the ListBox.
+        self._keys: List[tuple] = []
+        self._entries: Dict[tuple, Dict[str, Any]] = {}
+        self._rows: Dict[tuple, Gtk.ListBoxRow] = {}
+        self._materialized = 0
         
         # Selection tracking
         self._current_chat_id = None
@@ -169,6 +194,9 @@ class HistorySidebar(UIComponent):
         self.history_list.connect('button-press-event', self._on_button_press)
         self.history_list.get_style_context().add_class('navigation-sidebar')
         scrolled.add(self.history_list)
+        self._list_adjustment = scrolled.get_vadjustment()
+        self._list_adjustment.connect('value-changed', self._on_list_scrolled)
+        self._list_adjustment.connect('changed', self._on_list_scrolled)
         
         # Filter container (hidden by default)
         self.filter_container = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
@@ -226,44 +254,130 @@ class HistorySidebar(UIComponent):
         if not self._controller:
             return
 
+        # Any content query still running belongs to the old listing
+        self._filter_generation += 1
+        self._pending_content_rows = {}
+
         # Get histories (chats)
         histories = self._controller.list_chats()
+        self._listing_positions = {
+            self._history_id(h): i for i, h in enumerate(histories)
+        }
         
         # Get documents
         documents = []
         if hasattr(self._controller, 'list_documents'):
             documents = self._controller.list_documents()
         
-        # Apply filter to chats
+        # Apply filter to chats: titles now, message content in the background
         if self._filter_text:
-            histories = [h for h in histories if self._matches_filter(h)]
+            matched = [h for h in histories if self._matches_filter(h)]
+            if not self._filter_titles_only:
+                matched_ids = {self._history_id(h) for h in matched}
+                self._pending_content_rows = {
+                    self._history_id(h): h for h in histories
+                    if self._history_id(h) not in matched_ids
+                }
+            histories = matched
             # Also filter documents by title
             documents = [d for d in documents if self._filter_text.lower() in d.get('title', '').lower()]
         
-        # Preserve selection
-        selected_chat_id = self._current_chat_id
-        selected_doc_id = self._current_document_id
-        
-        # Clear and repopulate
-        for child in self.history_list.get_children():
-            self.history_list.remove(child)
-        
-        # Add documents first (with distinct styling)
-        for doc in documents:
-            row = self._create_document_row(doc)
-            self.history_list.add(row)
-        
-        for history in histories:
-            row = self._create_row(history)
-            self.history_list.add(row)
-        
-        self.history_list.show_all()
+        keys = [('doc', doc.get('id', '')) for doc in documents]
+        keys += [('chat', self._history_id(h)) for h in histories]
+        entries = {key: doc for key, doc in zip(keys, documents)}
+        entries.update({('chat', self._history_id(h)): h for h in histories})
+        self._apply_listing(keys, entries)
+        
+        # Restore selection (rows that survived the diff keep theirs)
+        if self._current_document_id:
+            self.select_document(self._current_document_id)
+        elif self._current_chat_id:
+            self.select_chat(self._current_chat_id)
+
+        if self._pending_content_rows:
+            self._start_content_filter()
+    
+    def _history_id(self, history: Dict[str, Any]) -> str:
+        return history.get('chat_id') or history.get('filename', '')
+    
+    # -----------------------------------------------------------------------
+    # List model
+    # -----------------------------------------------------------------------
+    
+    def _apply_listing(self, keys: List[tuple], entries: Dict[tuple, Dict[str, Any]]) -> None:
+        """
+        Bring the ListBox in line with a new listing.
         
-        # Restore selection
-        if selected_doc_id:
-            self.select_document(selected_doc_id)
-        elif selected_chat_id:
-            self.select_chat(selected_chat_id)
+        Rows are matched by key, so only added, removed, moved or retitled
+        entries touch the ListBox; unchanged rows are left alone. At most as
+        many rows as were already materialized (or one page) are built now;
+        the rest are created as the list is scrolled.
+        """
+        old_entries = self._entries
+        self._keys = keys
+        self._entries = entries
+        target = keys[:max(self._materialized, self.ROW_PAGE_SIZE)]
+        wanted = set(target)
+        
+        for key in [k for k in self._rows if k not in wanted]:
+            self.history_list.remove(self._rows.pop(key))
+        
+        for index, key in enumerate(target):
+            row = self._rows.get(key)
+            if row is None:
+                self._insert_row(key, index)
+                continue
+            if self._entry_signature(key, old_entries.get(key)) != self._entry_signature(key, entries[key]):
+                self._update_row(row, key, entries[key])
+            if row.get_index() != index:
+                self.history_list.remove(row)
+                self.history_list.insert(row, index)
+        self._materialized = len(target)
+    
+    def _entry_signature(self, key: tuple, entry: Optional[Dict[str, Any]]) -> tuple:
+        if entry is None:
+            return ()
+        if key[0] == 'doc':
+            return (entry.get('title', 'Untitled'), entry.get('updated_at') or entry.get('created_at', ''))
+        return (entry.get('title') or key[1], entry.get('timestamp', ''))
+    
+    def _insert_row(self, key: tuple, index: int) -> Gtk.ListBoxRow:
+        entry = self._entries[key]
+        row = self._create_document_row(entry) if key[0] == 'doc' else self._create_row(entry)
+        self.history_list.insert(row, index)
+        row.show_all()
+        self._rows[key] = row
+        return row
+    
+    def _update_row(self, row: Gtk.ListBoxRow, key: tuple, entry: Dict[str, Any]) -> None:
+        title, timestamp = self._entry_signature(key, entry)
+        row.title_label.set_text(title)
+        row.time_label.set_text(self._format_timestamp(timestamp))
+    
+    def _materialize(self, count: int) -> None:
+        """Create rows for the first ``count`` listed entries."""
+        count = min(count, len(self._keys))
+        while self._materialized < count:
+            key = self._keys[self._materialized]
+            if key not in self._rows:
+                self._insert_row(key, self._materialized)
+            self._materialized += 1
+    
+    def _ensure_materialized(self, key: tuple) -> Optional[Gtk.ListBoxRow]:
+        """Return the row for a listed entry, creating rows up to it if needed."""
+        row = self._rows.get(key)
+        if row is None and key in self._entries:
+            self._materialize(self._keys.index(key) + 1)
+            row = self._rows.get(key)
+        return row
+    
+    def _on_list_scrolled(self, adjustment) -> None:
+        """Create the next page of rows when the end of the list comes into view."""
+        if self._materialized >= len(self._keys):
+            return
+        remaining = adjustment.get_upper() - (adjustment.get_value() + adjustment.get_page_size())
+        if remaining <= adjustment.get_page_size():
+            self._materialize(self._materialized + self.ROW_PAGE_SIZE)
     
     def _create_document_row(self, doc: Dict[str, Any]) -> Gtk.ListBoxRow:
         """Create a row for a document entry."""
@@ -328,37 +442,81 @@ class HistorySidebar(UIComponent):
         
         row.add(vbox)
         row.chat_id = chat_id
+        row.title_label = title_label
+        row.time_label = time_label
         
         return row
     
     def _matches_filter(self, history: Dict[str, Any]) -> bool:
-        """Check if history matches current filter."""
-        if not self._filter_text:
-            return True
-        
-        title = history.get('title', '')
-        
-        if self._filter_titles_only:
-            return self._text_matches(title)
+        """
+        Check if a history's title matches the current filter.
         
-        # Full content search - need to load chat
-        if self._text_matches(title):
+        Message content is never read here; with "titles only" off, the
+        remaining chats are checked by ``_start_content_filter``.
+        """
+        if not self._filter_text:
             return True
-        
-        # Search content via controller
-        if self._controller:
-            chat_id = history.get('chat_id') or history.get('filename', '')
+        return self._text_matches(history.get('title', ''))
+    
+    def _start_content_filter(self) -> None:
+        """Find chats whose messages match the filter on a worker thread."""
+        chat_service = getattr(self._controller, 'chat_service', None)
+        if not chat_service:
+            return
+        generation = self._filter_generation
+        text = self._filter_text
+        whole_words = self._filter_whole_words
+        wanted = frozenset(self._pending_content_rows)
+
+        def is_cancelled() -> bool:
+            return generation != self._filter_generation
+
+        def worker():
+            batch: List[str] = []
+            last_flush = time.monotonic()
             try:
-                conv = self._controller.chat_service.load_chat(chat_id)
-                if conv:
-                    messages = conv.to_list() if hasattr(conv, 'to_list') else conv
-                    for msg in messages:
-                        content = msg.get('content', '')
-                        if isinstance(content, str) and self._text_matches(content):
-                            return True
-            except:
-                pass
-        
+                for chat_id in chat_service.iter_content_matches(text, whole_words, is_cancelled):
+                    if is_cancelled():
+                        return
+                    if chat_id not in wanted:
+                        continue
+                    batch.append(chat_id)
+                    if (len(batch) >= self.CONTENT_BATCH_SIZE
+                            or time.monotonic() - last_flush >= self.CONTENT_BATCH_INTERVAL):
+                        self.schedule_ui_update(self._add_content_matches, generation, batch)
+                        batch = []
+                        last_flush = time.monotonic()
+            except Exception as e:
+                print(f"[HistorySidebar] Content filter failed: {e}")
+            if batch and not is_cancelled():
+                self.schedule_ui_update(self._add_content_matches, generation, batch)
+
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _add_content_matches(self, generation: int, chat_ids: List[str]) -> bool:
+        """Add chats found by the content query to the listing, in listing order."""
+        if generation != self._filter_generation:
+            return False
+        for chat_id in chat_ids:
+            history = self._pending_content_rows.pop(chat_id, None)
+            if history is None:
+                continue
+            key = ('chat', chat_id)
+            position = self._listing_positions.get(chat_id, 0)
+            index = len(self._keys)
+            for i, other in enumerate(self._keys):
+                if other[0] == 'chat' and self._listing_positions.get(other[1], -1) > position:
+                    index = i
+                    break
+            self._keys.insert(index, key)
+            self._entries[key] = history
+            # Below one page everything is materialized; beyond that rows
+            # past the materialized range wait for scrolling.
+            if index < self._materialized or self._materialized < self.ROW_PAGE_SIZE:
+                row = self._insert_row(key, index)
+                self._materialized += 1
+                if self._current_chat_id and self._current_chat_id.replace('.json', '') == chat_id:
+                    self.history_list.select_row(row)
         return False
     
     def _text_matches(self, text: str) -> bool:
@@ -397,16 +555,18 @@ class HistorySidebar(UIComponent):
         doc = doc_service.get_document(doc_id)
         if not doc:
             return False
-        for row in self.history_list.get_children():
-            if getattr(row, 'is_document', False) and getattr(row, 'doc_id', None) == doc_id:
-                if hasattr(row, 'title_label'):
-                    row.title_label.set_text(doc.title or "Untitled")
-                if hasattr(row, 'time_label'):
-                    row.time_label.set_text(self._format_timestamp(doc.updated_at))
-                if self._current_document_id == doc_id:
-                    self.history_list.select_row(row)
-                return True
-        return False
+        key = ('doc', doc_id)
+        row = self._ensure_materialized(key)
+        if row is None:
+            return False
+        entry = dict(self._entries[key])
+        entry['title'] = doc.title or "Untitled"
+        entry['updated_at'] = doc.updated_at.isoformat()
+        self._entries[key] = entry
+        self._update_row(row, key, entry)
+        if self._current_document_id == doc_id:
+            self.history_list.select_row(row)
+        return True
     
     def select_chat(self, chat_id: str, scroll_to: bool = True) -> None:
         """Select a chat by ID and optionally scroll it into view."""
@@ -422,23 +582,15 @@ class HistorySidebar(UIComponent):
             focus_widget is not None and
             (focus_widget == self.filter_entry or focus_widget.is_ancestor(self.history_list))
         )
-        children = self.history_list.get_children()
-        for row in children:
-            row_id = getattr(row, 'chat_id', None)
-            if row_id == chat_id:
-                self.history_list.select_row(row)
-                if scroll_to and not filter_has_focus and sidebar_has_focus:
-                    row.grab_focus()
-                return
-        # No exact match - try without .json extension
-        chat_id_clean = chat_id.replace('.json', '') if chat_id else ''
-        for row in children:
-            row_id = getattr(row, 'chat_id', '')
-            if row_id.replace('.json', '') == chat_id_clean:
-                self.history_list.select_row(row)
-                if scroll_to and not filter_has_focus and sidebar_has_focus:
-                    row.grab_focus()
-                return
+        # Exact match first, then without .json extension
+        row = self._ensure_materialized(('chat', chat_id))
+        if row is None and chat_id:
+            row = self._ensure_materialized(('chat', chat_id.replace('.json', '')))
+        if row is not None:
+            self.history_list.select_row(row)
+            if scroll_to and not filter_has_focus and sidebar_has_focus:
+                row.grab_focus()
+            return
         self.history_list.unselect_all()
 
     def select_document(self, doc_id: str, scroll_to: bool = True) -> None:
@@ -454,13 +606,12 @@ class HistorySidebar(UIComponent):
             focus_widget is not None and
             (focus_widget == self.filter_entry or focus_widget.is_ancestor(self.history_list))
         )
-        children = self.history_list.get_children()
-        for row in children:
-            if getattr(row, 'is_document', False) and getattr(row, 'doc_id', None) == doc_id:
-                self.history_list.select_row(row)
-                if scroll_to and not filter_has_focus and sidebar_has_focus:
-                    row.grab_focus()
-                return
+        row = self._ensure_materialized(('doc', doc_id))
+        if row is not None:
+            self.history_list.select_row(row)
+            if scroll_to and not filter_has_focus and sidebar_has_focus:
+                row.grab_focus()
+            return
         self.history_list.unselect_all()
     
     def _on_new_chat_clicked(self, button) -> None:
@@ -502,10 +653,10 @@ class HistorySidebar(UIComponent):
         """Handle filter text change with debounce."""
         self._filter_text = entry.get_text()
         
-        if self._filter_titles_only:
-            if self._filter_timeout_id:
-                GLib.source_remove(self._filter_timeout_id)
-            self._filter_timeout_id = GLib.timeout_add(150, self._apply_filter)
+        if self._filter_timeout_id:
+            GLib.source_remove(self._filter_timeout_id)
+        delay = self.TITLE_FILTER_DELAY_MS if self._filter_titles_only else self.CONTENT_FILTER_DELAY_MS
+        self._filter_timeout_id = GLib.timeout_add(delay, self._apply_filter)
     
     def _on_filter_icon_pressed(self, entry, icon_pos, event) -> None:
         """Clear filter when clear icon pressed."""
@@ -522,6 +673,8 @@ class HistorySidebar(UIComponent):
             self.refresh()
             return True
         if event.keyval == Gdk.KEY_Return:
+            if self._filter_timeout_id:
+                GLib.source_remove(self._filter_timeout_id)
             self._apply_filter()
             self.history_list.grab_focus()
             return True
@@ -530,8 +683,7 @@ class HistorySidebar(UIComponent):
     def _on_titles_only_toggled(self, toggle) -> None:
         """Handle titles-only toggle."""
         self._filter_titles_only = toggle.get_active()
-        if self._filter_titles_only:
-            self._apply_filter()
+        self._apply_filter()
     
     def _on_whole_words_toggled(self, toggle) -> None:
         """Handle whole-words toggle."""
@@ -547,15 +699,27 @@ class HistorySidebar(UIComponent):
     def _on_chat_event(self, event) -> None:
         """Handle chat events - refresh list and select new/saved chats."""
         chat_id = event.data.get('chat_id', '')
-        # Select chat on create or save
-        should_select = event.type in (EventType.CHAT_CREATED, EventType.CHAT_SAVED) and chat_id
         def update():
             self.refresh()
-            if should_select and chat_id:
+            # Saves are written in the background and may land after the
+            # user has switched to another chat; only follow them while the
+            # saved chat is still the open one.
+            if event.type == EventType.CHAT_CREATED:
+                should_select = bool(chat_id)
+            else:
+                should_select = event.type == EventType.CHAT_SAVED and self._is_current_chat(chat_id)
+            if should_select:
                 # Defer selection to ensure rows are realized
                 GLib.idle_add(self.select_chat, chat_id)
         self.schedule_ui_update(update)
     
+    def _is_current_chat(self, chat_id: str) -> bool:
+        """Return True if ``chat_id`` is the chat open in the window."""
+        if not chat_id:
+            return False
+        current = getattr(self._controller, 'current_chat_id', None) if self._controller else self._current_chat_id
+        return bool(current) and current.replace('.json', '') == chat_id.replace('.json', '')
+
     def _on_chat_loaded(self, event) -> None:
         """Handle chat loaded - update selection."""
         chat_id = event.data.get('chat_id', '')
@@ -0,0 +1,140 @@
+"""Tests for the AudioService background playback queue."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from events import EventBus, EventType
+from services import AudioService
+
+
+class FakePlaybackAudioService(AudioService):
+    """AudioService that 'plays' by sleeping instead of using a sound device."""
+
+    def __init__(self, event_bus, play_seconds=0.1):
+        super().__init__(event_bus=event_bus)
+        self.play_seconds = play_seconds
+        self.log = []
+
+    def _play_path(self, audio_path, stop_event, use_subprocess, event_data=None):
+        self.log.append(("play", str(audio_path)))
+        stop_event.wait(self.play_seconds)
+        self.log.append(("end", str(audio_path)))
+        self._emit(
+            EventType.PLAYBACK_STOPPED,
+            audio_path=str(audio_path),
+            stopped=stop_event.is_set(),
+            **(event_data or {}),
+        )
+        return True
+
+
+def _synth(service, name, delay=0.0):
+    def synthesize(stop_event):
+        service.log.append(("synth", name))
+        time.sleep(delay)
+        return Path(name)
+    return synthesize
+
+
+def _collect_stopped(bus, expected):
+    events = []
+    done = threading.Event()
+
+    def on_stopped(event):
+        events.append(event.data)
+        if len(events) >= expected:
+            done.set()
+
+    bus.subscribe(EventType.PLAYBACK_STOPPED, on_stopped)
+    return events, done
+
+
+def test_items_play_in_order_and_enqueue_returns_immediately():
+    bus = EventBus()
+    service = FakePlaybackAudioService(bus)
+    events, done = _collect_stopped(bus, 3)
+
+    start = time.monotonic()
+    ids = [service.enqueue_playback(_synth(service, f"a{i}", delay=0.05)) for i in range(3)]
+    assert time.monotonic() - start < 0.05
+
+    assert done.wait(5)
+    assert [e["item_id"] for e in events] == ids
+    assert [entry for entry in service.log if entry[0] == "play"] == [
+        ("play", "a0"), ("play", "a1"), ("play", "a2"),
+    ]
+
+
+def test_next_item_is_synthesized_while_current_plays():
+    bus = EventBus()
+    service = FakePlaybackAudioService(bus, play_seconds=0.3)
+    events, done = _collect_stopped(bus, 2)
+
+    service.enqueue_playback(_synth(service, "first"))
+    service.enqueue_playback(_synth(service, "second"))
+
+    assert done.wait(5)
+    assert service.log.index(("synth", "second")) < service.log.index(("end", "first"))
+
+
+def test_cancel_drops_queued_items_and_stops_current():
+    bus = EventBus()
+    service = FakePlaybackAudioService(bus, play_seconds=5)
+    events, done = _collect_stopped(bus, 3)
+
+    service.enqueue_playback(_synth(service, "one"))
+    service.enqueue_playback(_synth(service, "two"))
+    service.enqueue_playback(_synth(service, "three"))
+    while ("play", "one") not in service.log:
+        time.sleep(0.01)
+
+    assert service.cancel_playback() == 3
+    assert done.wait(5)
+    assert all(e["stopped"] for e in events)
+    assert sorted(e.get("status", "played") for e in events) == ["cancelled", "cancelled", "played"]
+    assert service.get_playback_queue_length() == 0
+
+
+def test_skip_moves_to_next_item():
+    bus = EventBus()
+    service = FakePlaybackAudioService(bus, play_seconds=5)
+    events, done = _collect_stopped(bus, 1)
+
+    service.enqueue_playback(_synth(service, "long"))
+    while ("play", "long") not in service.log:
+        time.sleep(0.01)
+    assert service.skip_playback()
+    assert done.wait(5)
+    assert events[0]["stopped"] is True
+
+
+class FailingPlaybackAudioService(FakePlaybackAudioService):
+    """Playback backend that fails without emitting PLAYBACK_STOPPED."""
+
+    def _play_path(self, audio_path, stop_event, use_subprocess, event_data=None):
+        self.log.append(("play", str(audio_path)))
+        if str(audio_path) == "raises":
+            raise RuntimeError("no audio device")
+        return False
+
+
+def test_failed_playback_still_reports_each_item():
+    bus = EventBus()
+    service = FailingPlaybackAudioService(bus)
+    events, done = _collect_stopped(bus, 3)
+
+    ids = [
+        service.enqueue_playback(_synth(service, "fails")),
+        service.enqueue_playback(_synth(service, "raises")),
+        service.enqueue_playback(_synth(service, "fails")),
+    ]
+
+    assert done.wait(5)
+    assert [e["item_id"] for e in events] == ids
+    assert all(e["status"] == "failed" for e in events)
+    assert service.get_playback_queue_length() == 0
@@ -0,0 +1,125 @@
+"""Tests for the content-addressed image blob store."""
+
+import base64
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.blob_store import BlobStore, externalize_images, referenced_blobs
+from repositories.chat_history_repository import ChatHistoryRepository
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"pixels" * 100
+PNG_B64 = base64.b64encode(PNG).decode("utf-8")
+
+
+def _store(tmp_path):
+    store = BlobStore(tmp_path / ".blobs")
+    store.GC_GRACE_SECONDS = 0
+    return store
+
+
+def test_put_dedupes_and_memoizes_base64(tmp_path):
+    store = _store(tmp_path)
+    digest = store.put(PNG)
+    assert store.put_base64(PNG_B64) == digest
+    assert len(list((tmp_path / ".blobs").glob("??/*"))) == 1
+    assert store.read(digest) == PNG
+    assert store.read_base64(digest) == PNG_B64
+    assert store.read_base64(digest) is store.read_base64(digest)
+
+
+def test_blobs_are_collected_when_last_reference_goes(tmp_path):
+    store = _store(tmp_path)
+    digest = store.put(PNG)
+    store.set_refs("chat_a", [digest])
+    store.set_refs("chat_b", [digest])
+    assert store.ref_count(digest) == 2
+
+    store.release("chat_a")
+    assert store.exists(digest)
+    store.set_refs("chat_b", [])
+    assert not store.exists(digest)
+
+    # References survive a restart.
+    digest = store.put(PNG)
+    store.set_refs("chat_c", [digest])
+    assert BlobStore(tmp_path / ".blobs").ref_count(digest) == 1
+
+
+def test_grace_period_protects_unsaved_blobs(tmp_path):
+    store = BlobStore(tmp_path / ".blobs")
+    digest = store.put(PNG)
+    store.set_refs("chat_a", [digest])
+    store.release("chat_a")
+    assert store.exists(digest)
+    assert store.collect_garbage() == 0
+
+
+def test_collect_garbage_forgets_missing_owners(tmp_path):
+    store = _store(tmp_path)
+    owner = tmp_path / "gone.json"
+    owner.write_text("{}", encoding="utf-8")
+    digest = store.put(PNG)
+    store.set_refs(str(owner), [digest])
+    assert store.collect_garbage() == 0
+
+    owner.unlink()
+    assert store.collect_garbage() == 1
+    assert not store.exists(digest)
+
+
+def test_externalize_images_does_not_modify_input(tmp_path):
+    store = _store(tmp_path)
+    messages = [{"role": "user", "content": "hi", "images": [{"data": PNG_B64, "mime_type": "image/png"}]}]
+    result = externalize_images(store, messages)
+    assert "data" in messages[0]["images"][0]
+    assert result[0]["images"] == [{"mime_type": "image/png", "blob": store.put(PNG)}]
+    assert referenced_blobs(result) == {store.put(PNG)}
+
+
+def test_chat_repository_stores_images_as_blobs(tmp_path):
+    store = _store(tmp_path)
+    history_dir = tmp_path / "history"
+    repo = ChatHistoryRepository(history_dir=str(history_dir), blob_store=store)
+    image = {"data": PNG_B64, "mime_type": "image/png"}
+    messages = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "look", "images": [image]},
+    ]
+    repo.save("chat_a", messages)
+    repo.save("chat_b", messages)
+
+    snapshot = json.loads((history_dir / "chat_a.json").read_text(encoding="utf-8"))
+    saved_image = snapshot["messages"][1]["images"][0]
+    assert "data" not in saved_image
+    digest = saved_image["blob"]
+    assert store.ref_count(digest) == 2
+
+    loaded = repo.get("chat_a").to_list()
+    assert loaded[1]["images"][0]["blob"] == digest
+    assert store.read_base64(digest) == PNG_B64
+
+    repo.delete("chat_a")
+    assert store.exists(digest)
+    repo.delete("chat_b")
+    assert not store.exists(digest)
+
+
+def test_legacy_inline_images_are_moved_on_load(tmp_path):
+    store = _store(tmp_path)
+    legacy = {
+        "messages": [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "look", "images": [{"data": PNG_B64, "mime_type": "image/png"}]},
+        ]
+    }
+    (tmp_path / "old.json").write_text(json.dumps(legacy), encoding="utf-8")
+    repo = ChatHistoryRepository(history_dir=str(tmp_path), blob_store=store)
+
+    history = repo.get("old")
+    image = history.to_list()[1]["images"][0]
+    assert "data" not in image
+    assert store.read(image["blob"]) == PNG
@@ -0,0 +1,137 @@
+"""Tests for the journaled chat history storage."""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.chat_history_repository import ChatHistoryRepository, JOURNAL_FILENAME
+
+
+def _messages(count):
+    msgs = [{"role": "system", "content": "You are a helpful assistant."}]
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        msgs.append({"role": role, "content": f"message {i}"})
+    return msgs
+
+
+def _contents(history):
+    return [msg["content"] for msg in history.to_list()]
+
+
+def test_first_save_writes_snapshot_and_later_saves_append(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_a", _messages(2))
+    snapshot = tmp_path / "chat_a.json"
+    journal = tmp_path / "chat_a" / JOURNAL_FILENAME
+    assert snapshot.exists()
+    assert not journal.exists()
+    snapshot_before = snapshot.read_text(encoding="utf-8")
+
+    repo.save("chat_a", _messages(4))
+    repo.save("chat_a", _messages(6))
+
+    assert snapshot.read_text(encoding="utf-8") == snapshot_before
+    records = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+    assert [r["start"] for r in records] == [3, 5]
+    assert [len(r["messages"]) for r in records] == [2, 2]
+
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    assert _contents(reloaded.get("chat_a"))[1:] == [f"message {i}" for i in range(6)]
+
+
+def test_edits_truncation_and_metadata_replay(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_b", _messages(4))
+
+    edited = _messages(4)
+    edited[2]["content"] = "edited"
+    repo.save("chat_b", edited[:3], metadata={"title": "Renamed"})
+
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    history = reloaded.get("chat_b")
+    assert _contents(history)[1:] == ["message 0", "edited"]
+    assert history.metadata == {"title": "Renamed"}
+    assert reloaded.list_all()[0].message_count == 3
+
+
+def test_legacy_json_is_read_and_journaled(tmp_path):
+    legacy = {"messages": _messages(2), "timestamp": "2024-01-01T00:00:00", "metadata": {"title": "Old"}}
+    (tmp_path / "legacy.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    history = repo.get("legacy")
+    assert _contents(history)[1:] == ["message 0", "message 1"]
+
+    repo.save("legacy", _messages(3), metadata={"title": "Old"})
+    assert (tmp_path / "legacy" / JOURNAL_FILENAME).exists()
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    assert _contents(reloaded.get("legacy"))[-1] == "message 2"
+
+
+def test_compaction_folds_journal_and_is_idempotent(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_c", _messages(2))
+    repo.save("chat_c", _messages(4))
+    journal = tmp_path / "chat_c" / JOURNAL_FILENAME
+    stale_journal = journal.read_text(encoding="utf-8")
+
+    assert repo.compact("chat_c")
+    assert not journal.exists()
+    data = json.loads((tmp_path / "chat_c.json").read_text(encoding="utf-8"))
+    assert len(data["messages"]) == 5
+
+    # A journal left behind by an interrupted compaction is not re-applied.
+    journal.write_text(stale_journal, encoding="utf-8")
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    assert len(reloaded.get("chat_c")) == 5
+
+
+def test_background_compaction_after_many_records(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.COMPACT_MAX_RECORDS = 3
+    for count in range(1, 6):
+        repo.save("chat_d", _messages(count))
+
+    snapshot = tmp_path / "chat_d.json"
+    deadline = time.monotonic() + 5
+    while json.loads(snapshot.read_text(encoding="utf-8")).get("journal_seq", 0) < 3:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    assert _contents(reloaded.get("chat_d"))[1:] == [f"message {i}" for i in range(5)]
+
+
+def test_delete_removes_snapshot_and_journal(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_e", _messages(1))
+    repo.save("chat_e", _messages(2))
+    assert repo.delete("chat_e")
+    assert not (tmp_path / "chat_e.json").exists()
+    assert not (tmp_path / "chat_e").exists()
+    assert repo.get("chat_e") is None
+
+
+def test_saves_through_two_repositories_on_one_chat(tmp_path):
+    first = ChatHistoryRepository(history_dir=str(tmp_path))
+    second = ChatHistoryRepository(history_dir=str(tmp_path))
+    first.save("chat_f", _messages(2))
+    second.save("chat_f", _messages(3))
+
+    first.save("chat_f", _messages(4))
+    assert _contents(second.get("chat_f"))[1:] == [f"message {i}" for i in range(4)]
+    second.save("chat_f", _messages(5), metadata={"title": "Shared"})
+
+    reloaded = ChatHistoryRepository(history_dir=str(tmp_path))
+    history = reloaded.get("chat_f")
+    assert _contents(history)[1:] == [f"message {i}" for i in range(5)]
+    assert history.metadata == {"title": "Shared"}
+    records = [
+        json.loads(line)
+        for line in (tmp_path / "chat_f" / JOURNAL_FILENAME).read_text(encoding="utf-8").splitlines()
+    ]
+    assert [r["seq"] for r in records] == [1, 2, 3]
@@ -0,0 +1,60 @@
+"""Tests for the write-behind chat save queue."""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.save_queue import ChatSaveQueue
+
+
+def test_pending_writes_for_a_key_are_coalesced():
+    queue = ChatSaveQueue()
+    started = threading.Event()
+    release = threading.Event()
+    written = []
+
+    queue.submit("a", lambda: (started.set(), release.wait(5), written.append("a1")))
+    assert started.wait(5)
+    queue.submit("a", lambda: written.append("a2"))
+    queue.submit("a", lambda: written.append("a3"))
+    queue.submit("b", lambda: written.append("b1"))
+    release.set()
+
+    assert queue.flush(timeout=5)
+    # The first write was already running; the two queued after it collapse
+    # into the latest one.
+    assert written == ["a1", "a3", "b1"]
+    assert not queue.is_pending()
+
+
+def test_wait_for_one_key_and_discard():
+    queue = ChatSaveQueue()
+    started = threading.Event()
+    release = threading.Event()
+    written = []
+
+    queue.submit("slow", lambda: (started.set(), release.wait(5), written.append("slow")))
+    assert started.wait(5)
+    queue.submit("dropped", lambda: written.append("dropped"))
+    assert not queue.wait("slow", timeout=0.05)
+
+    queue.discard("dropped")
+    release.set()
+    assert queue.wait("slow", timeout=5)
+    assert queue.flush(timeout=5)
+    assert "dropped" not in written
+
+
+def test_failed_write_does_not_stop_the_worker():
+    queue = ChatSaveQueue()
+    written = []
+
+    def fail():
+        raise OSError("disk full")
+
+    queue.submit("a", fail)
+    queue.submit("b", lambda: written.append("b"))
+    assert queue.flush(timeout=5)
+    assert written == ["b"]
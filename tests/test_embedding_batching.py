@@ -0,0 +1,84 @@
+"""Tests for request splitting, parallelism and retries of hosted embedding providers."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory.embedding_provider import BatchedEmbeddingProvider, split_for_embedding
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeProvider(BatchedEmbeddingProvider):
+    MAX_BATCH_TOKENS = 10
+    MAX_BATCH_ITEMS = 3
+    MAX_PARALLEL_REQUESTS = 2
+    RETRY_BASE_DELAY_SECONDS = 0.01
+
+    def __init__(self, failures=0, delay=0.0):
+        self.requests = []
+        self.failures = failures
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def dimension(self):
+        return 1
+
+    def _embed_request(self, texts):
+        with self._lock:
+            self.requests.append(list(texts))
+            if self.failures:
+                self.failures -= 1
+                raise RateLimitError("slow down")
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return [[float(text)] for text in texts]
+
+
+def test_split_respects_token_and_item_limits():
+    texts = ["a" * 36, "b", "c", "d", "e" * 100, "f"]
+
+    ranges = split_for_embedding(texts, max_tokens=10, max_items=3)
+
+    assert [list(r) for r in ranges] == [[0], [1, 2, 3], [4], [5]]
+
+
+def test_embed_batch_preserves_order_across_parallel_requests():
+    provider = FakeProvider(delay=0.02)
+    texts = [str(i) for i in range(10)]
+
+    vectors = provider.embed_batch(texts)
+
+    assert vectors == [[float(i)] for i in range(10)]
+    assert len(provider.requests) == 4
+    assert all(len(request) <= 3 for request in provider.requests)
+    assert provider.max_active <= 2
+
+
+def test_rate_limited_requests_are_retried():
+    provider = FakeProvider(failures=2)
+
+    assert provider.embed("7") == [7.0]
+    assert len(provider.requests) == 3
+
+
+def test_other_errors_and_exhausted_retries_are_raised():
+    provider = FakeProvider(failures=100)
+    provider.MAX_RETRIES = 2
+
+    with pytest.raises(RateLimitError):
+        provider.embed_batch(["1"])
+    assert len(provider.requests) == 3
@@ -0,0 +1,65 @@
+"""Tests for the embedding cache."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory.embedding_cache import CachedEmbeddingProvider, EmbeddingCache, cache_namespace
+from memory.embedding_provider import EmbeddingProvider
+
+
+class CountingProvider(EmbeddingProvider):
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def dimension(self):
+        return 2
+
+    def embed(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 0.5]
+
+    def embed_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+
+def test_only_uncached_texts_are_embedded(tmp_path):
+    provider = CountingProvider()
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3")
+    cached = CachedEmbeddingProvider(provider, cache, cache_namespace("openai", "small", 2))
+
+    assert cached.embed_batch(["a", "bb", "a"]) == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert cached.embed("bb") == [2.0, 0.5]
+    assert cached.embed_batch(["ccc", "a"]) == [[3.0, 0.5], [1.0, 0.5]]
+    assert provider.calls == [["a", "bb"], ["ccc"]]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+    assert stats["disk_entries"] == 3
+
+
+def test_disk_level_survives_restart_and_namespaces_are_separate(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = CachedEmbeddingProvider(CountingProvider(), EmbeddingCache(path), "local|mini|2")
+    first.embed("hello")
+    first.cache.close()
+
+    provider = CountingProvider()
+    again = CachedEmbeddingProvider(provider, EmbeddingCache(path), "local|mini|2")
+    assert again.embed("hello") == [5.0, 0.5]
+    assert provider.calls == []
+
+    other = CachedEmbeddingProvider(provider, EmbeddingCache(path), "local|mpnet|2")
+    other.embed("hello")
+    assert provider.calls == [["hello"]]
+
+
+def test_disk_level_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=2, memory_entries=1)
+    for i in range(4):
+        cache.put_many({f"k{i}": [float(i)]})
+    assert cache.stats()["disk_entries"] == 2
+    assert set(cache.get_many(["k0", "k1", "k2", "k3"])) == {"k2", "k3"}
@@ -0,0 +1,69 @@
+"""Tests for the memoized file encoding cache."""
+
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from encoding_cache import EncodingCache
+
+
+def _write(path, data, mtime_ns=None):
+    path.write_bytes(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_hits_misses_and_data_url(tmp_path):
+    path = tmp_path / "a.png"
+    _write(path, b"image bytes")
+    cache = EncodingCache()
+
+    expected = base64.b64encode(b"image bytes").decode("utf-8")
+    assert cache.base64_file(path) == expected
+    assert cache.base64_file(str(path)) == expected
+    assert cache.data_url(path, "image/png") == f"data:image/png;base64,{expected}"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+
+
+def test_changed_file_is_reencoded(tmp_path):
+    path = tmp_path / "a.png"
+    _write(path, b"first", mtime_ns=1_000_000_000)
+    cache = EncodingCache()
+    cache.base64_file(path)
+
+    _write(path, b"second", mtime_ns=2_000_000_000)
+    assert base64.b64decode(cache.base64_file(path)) == b"second"
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_respects_memory_budget(tmp_path):
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.png"
+        _write(path, name.encode() * 30)  # 40 base64 characters each
+        paths.append(path)
+    cache = EncodingCache(max_bytes=100)
+
+    cache.base64_file(paths[0])
+    cache.base64_file(paths[1])
+    cache.base64_file(paths[0])  # a is now most recently used
+    cache.base64_file(paths[2])  # evicts b
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 100
+    cache.base64_file(paths[0])
+    assert cache.stats()["hits"] == 2
+    cache.base64_file(paths[1])
+    assert cache.stats()["misses"] == 4
+
+
+def test_oversized_encodings_are_not_cached(tmp_path):
+    path = tmp_path / "big.png"
+    _write(path, b"x" * 300)
+    cache = EncodingCache(max_bytes=100)
+    assert cache.base64_file(path)
+    assert cache.stats()["entries"] == 0
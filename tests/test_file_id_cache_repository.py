@@ -0,0 +1,88 @@
+"""Tests for the persistent uploaded-file id cache."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.file_id_cache_repository import FileIdCacheRepository, api_key_fingerprint
+
+
+def test_ids_survive_restart_and_follow_content(tmp_path):
+    cache_file = tmp_path / "file_id_cache.json"
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 body")
+    account = api_key_fingerprint("sk-one")
+
+    cache = FileIdCacheRepository(str(cache_file))
+    digest = cache.content_hash(str(pdf))
+    cache.put(account, digest, "file-123")
+
+    # A moved copy of the same document maps to the same id after a restart.
+    moved = tmp_path / "moved.pdf"
+    pdf.rename(moved)
+    reloaded = FileIdCacheRepository(str(cache_file))
+    assert reloaded.get(account, reloaded.content_hash(str(moved)))["file_id"] == "file-123"
+    assert reloaded.get(api_key_fingerprint("sk-two"), digest) is None
+
+    reloaded.invalidate("file-123")
+    assert FileIdCacheRepository(str(cache_file)).get(account, digest) is None
+
+
+def test_expired_and_old_entries(tmp_path):
+    cache = FileIdCacheRepository(str(tmp_path / "cache.json"))
+    cache.put("acct", "abc", "file-old", expires_at=1)
+    assert cache.get("acct", "abc") is None
+
+    cache.put("acct", "abc", "file-new")
+    entry = cache.get("acct", "abc")
+    assert not cache.needs_verification(entry)
+    entry["verified_at"] -= cache.VERIFY_AFTER_SECONDS + 1
+    assert cache.needs_verification(entry)
+
+
+class _FileNotFound(Exception):
+    status_code = 400
+
+
+def test_request_with_deleted_file_reuploads_and_retries(tmp_path):
+    from types import SimpleNamespace
+    from ai_providers import OpenAIProvider
+
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4 body")
+    uploads = []
+    requests = []
+
+    def upload(file, purpose):
+        uploads.append(purpose)
+        return SimpleNamespace(id=f"file-{len(uploads)}", expires_at=None)
+
+    def create(**params):
+        requests.append(params)
+        file_id = params["input"][0]["content"][1]["file_id"]
+        if file_id == "file-1":
+            raise _FileNotFound(f"Error code: 400 - File '{file_id}' not found")
+        message = SimpleNamespace(type="message", content=[SimpleNamespace(text="read it")])
+        return SimpleNamespace(id="resp_1", output=[message], usage=None)
+
+    provider = OpenAIProvider()
+    provider._current_api_key = "sk-test"
+    provider._file_id_cache = FileIdCacheRepository(str(tmp_path / "file_id_cache.json"))
+    provider.client = SimpleNamespace(
+        files=SimpleNamespace(create=upload),
+        responses=SimpleNamespace(create=create),
+    )
+    messages = [{
+        "role": "user",
+        "content": "summarise",
+        "files": [{"path": str(pdf), "mime_type": "application/pdf"}],
+    }]
+
+    assert provider._generate_with_responses_api(messages, "gpt-4o") == "read it"
+    assert [r["input"][0]["content"][1]["file_id"] for r in requests] == ["file-1", "file-2"]
+
+    # The stale id is gone from the cache; the next send uses the new upload.
+    assert provider._generate_with_responses_api(messages, "gpt-4o") == "read it"
+    assert len(uploads) == 2
+    assert requests[-1]["input"][0]["content"][1]["file_id"] == "file-2"
@@ -0,0 +1,60 @@
+"""Tests for the shared in-memory history index."""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.history_index import HistoryIndex, HISTORY_INDEX_FILENAME, get_history_index
+
+
+def _read(path):
+    return json.loads((path / HISTORY_INDEX_FILENAME).read_text(encoding="utf-8"))["entries"]
+
+
+def test_writes_are_debounced_and_coalesced(tmp_path):
+    index = HistoryIndex(tmp_path, flush_delay=0.1)
+    index.set("a", {"title": "A"})
+    index.set("b", {"title": "B"})
+    index.remove("a")
+    assert not (tmp_path / HISTORY_INDEX_FILENAME).exists()
+    assert set(index.entries()) == {"b"}
+
+    deadline = time.monotonic() + 5
+    while not (tmp_path / HISTORY_INDEX_FILENAME).exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert _read(tmp_path) == {"b": {"title": "B"}}
+    # Atomic write leaves no temp files behind.
+    assert [p.name for p in tmp_path.iterdir()] == [HISTORY_INDEX_FILENAME]
+
+
+def test_external_change_is_reloaded_and_merged_with_pending(tmp_path):
+    index = HistoryIndex(tmp_path, flush_delay=60)
+    index.set("ours", {"title": "Ours"})
+    index.flush()
+
+    index.set("pending", {"title": "Pending"})
+    external = {"version": 1, "entries": {"theirs": {"title": "Theirs"}}}
+    path = tmp_path / HISTORY_INDEX_FILENAME
+    path.write_text(json.dumps(external), encoding="utf-8")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+    assert set(index.entries()) == {"theirs", "pending"}
+    index.flush()
+    assert set(_read(tmp_path)) == {"theirs", "pending"}
+
+
+def test_get_returns_copies(tmp_path):
+    index = HistoryIndex(tmp_path, flush_delay=60)
+    index.set("a", {"title": "A"})
+    index.get("a")["title"] = "mutated"
+    index.entries()["a"]["title"] = "mutated"
+    assert index.get("a") == {"title": "A"}
+
+
+def test_shared_per_directory(tmp_path):
+    assert get_history_index(tmp_path) is get_history_index(str(tmp_path))
+    assert get_history_index(tmp_path) is not get_history_index(tmp_path / "other")
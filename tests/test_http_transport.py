@@ -0,0 +1,40 @@
+"""Tests for the shared HTTP transport."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from http_transport import HttpTransport, get_http_transport
+
+
+def test_get_http_transport_is_shared():
+    assert get_http_transport() is get_http_transport()
+
+
+def test_resolve_timeout_applies_connect_timeout():
+    transport = HttpTransport(connect_timeout=5, read_timeout=30)
+    assert transport.resolve_timeout() == (5.0, 30.0)
+    assert transport.resolve_timeout(60) == (5.0, 60.0)
+    assert transport.resolve_timeout((1, 2)) == (1, 2)
+
+
+def test_session_is_reused_and_pooled():
+    transport = HttpTransport(pool_connections=4, pool_maxsize=8)
+    session = transport.session
+    assert transport.session is session
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 8
+
+
+def test_configure_pool_size_rebuilds_session():
+    transport = HttpTransport()
+    session = transport.session
+
+    transport.configure(connect_timeout=3)
+    assert transport.session is session
+    assert transport.connect_timeout == 3.0
+
+    transport.configure(pool_maxsize=32)
+    assert transport.session is not session
@@ -0,0 +1,87 @@
+"""Tests for image preprocessing before upload."""
+
+import base64
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import image_preprocess
+from image_preprocess import estimate_payload_bytes, prepare_image, prepare_images_for_model, prune_history_images
+
+
+def _messages():
+    data = base64.b64encode(b"not really an image").decode("utf-8")
+    return [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "look", "images": [{"data": data, "mime_type": "image/png"}]},
+    ]
+
+
+def test_no_limit_leaves_messages_untouched():
+    messages = _messages()
+    assert prepare_images_for_model(messages, None) is messages
+
+
+def test_shrunk_image_replaces_source_and_is_cached(monkeypatch):
+    calls = []
+
+    def fake_shrink(raw, max_edge, quality):
+        calls.append((raw, max_edge, quality))
+        return b"small", "image/jpeg"
+
+    monkeypatch.setattr(image_preprocess, "_shrink", fake_shrink)
+    messages = _messages()
+    original = messages[1]["images"][0]
+
+    for _ in range(2):
+        prepared = prepare_images_for_model(messages, 512, quality=70)
+        image = prepared[1]["images"][0]
+        assert image == {"mime_type": "image/jpeg", "data": base64.b64encode(b"small").decode("utf-8")}
+    assert calls == [(b"not really an image", 512, 70)]
+    assert messages[1]["images"][0] is original
+
+    # A different limit is a different cache entry.
+    prepare_images_for_model(messages, 256, quality=70)
+    assert len(calls) == 2
+
+
+def test_unshrinkable_image_is_returned_as_is(monkeypatch, tmp_path):
+    monkeypatch.setattr(image_preprocess, "_shrink", lambda raw, max_edge, quality: None)
+    path = tmp_path / "a.png"
+    path.write_bytes(b"png bytes")
+    img = {"path": str(path), "mime_type": "image/png"}
+    assert prepare_image(img, 1024) is img
+    assert prepare_image({"mime_type": "image/png", "path": str(tmp_path / "missing.png")}, 1024)["path"]
+
+
+def test_prune_keeps_images_of_recent_turns_only():
+    image = {"data": "QUJD", "mime_type": "image/png"}
+    messages = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": "first", "images": [image, dict(image, caption="a cat")]},
+        {"role": "assistant", "content": "ok"},
+        {"role": "user", "content": "", "images": [image]},
+        {"role": "user", "content": "last", "images": [image]},
+    ]
+    assert prune_history_images(messages, 0) is messages
+
+    pruned = prune_history_images(messages, 1)
+    assert pruned[1] == {
+        "role": "user",
+        "content": "first\n[Image from an earlier turn omitted]\n[Image from an earlier turn omitted: a cat]",
+    }
+    assert pruned[3]["content"] == "[Image from an earlier turn omitted]"
+    assert pruned[4] is messages[4]
+    assert "images" in messages[1]
+
+    total, image_bytes = estimate_payload_bytes(pruned)
+    assert image_bytes == 4
+    assert total > image_bytes
+
+
+def test_payload_estimate_counts_files_as_base64(tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"x" * 10)
+    _total, image_bytes = estimate_payload_bytes([{"role": "user", "images": [{"path": str(path)}]}])
+    assert image_bytes == len(base64.b64encode(b"x" * 10))
@@ -0,0 +1,95 @@
+"""Tests for batched, resumable bulk import of chats into memory."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory.bulk_import import BulkImporter, conversation_items, import_item_id, pack_batches
+
+
+def _chats():
+    return [
+        ("chat_a", [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": "hello"},
+            {"role": "assistant", "content": [{"type": "text", "text": "hi"}, {"type": "image_url"}]},
+        ]),
+        ("chat_b", [{"role": "user", "content": "x" * 400}, {"role": "user", "content": "   "}]),
+        ("chat_c", [{"role": "user", "content": "bye"}]),
+    ]
+
+
+def _embed(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def test_conversation_items_skip_system_and_empty_and_read_content_parts():
+    items = conversation_items("chat_a", _chats()[0][1])
+
+    assert [(i.role, i.text) for i in items] == [("user", "hello"), ("assistant", "hi")]
+    assert items[0].id == import_item_id("chat_a", 1)
+    assert items[0].imported_at
+    assert [i.text for i in conversation_items("chat_a", _chats()[0][1], "user")] == ["hello"]
+
+
+def test_pack_batches_respects_token_and_item_limits():
+    items = [item for chat_id, messages in _chats() for item in conversation_items(chat_id, messages)]
+
+    batches = pack_batches(items, max_tokens=50, max_items=2)
+
+    assert [[i.text[:5] for i in batch] for batch in batches] == [["hello", "hi"], ["xxxxx"], ["bye"]]
+
+
+def test_run_stores_batches_from_many_chats_in_order_and_reports_progress(tmp_path):
+    stored = []
+    progress = []
+    checkpoint = tmp_path / "memory.import.json"
+    importer = BulkImporter(
+        _embed,
+        lambda items, vectors: stored.append([(i.conversation_id, i.text[:5], v[0]) for i, v in zip(items, vectors)]),
+        checkpoint_path=str(checkpoint),
+        progress_callback=lambda *args: progress.append(args),
+    )
+    importer.MAX_BATCH_ITEMS = 2
+
+    result = importer.run(_chats())
+
+    assert result == {"imported": 3, "messages": 4}
+    assert stored == [
+        [("chat_a", "hello", 5.0), ("chat_a", "hi", 2.0)],
+        [("chat_b", "xxxxx", 400.0), ("chat_c", "bye", 3.0)],
+    ]
+    assert progress == [(0, 4, ""), (2, 4, "chat_a"), (4, 4, "chat_c")]
+    assert not checkpoint.exists()
+
+
+def test_interrupted_run_leaves_unfinished_chats_in_checkpoint(tmp_path):
+    checkpoint = tmp_path / "memory.import.json"
+    stored = []
+
+    def store(items, vectors):
+        if stored:
+            raise OSError("database locked")
+        stored.append(items)
+
+    importer = BulkImporter(_embed, store, checkpoint_path=str(checkpoint), concurrency=1)
+    importer.MAX_BATCH_ITEMS = 2
+
+    with pytest.raises(OSError):
+        importer.run(_chats())
+
+    assert json.loads(checkpoint.read_text()) == {"pending": ["chat_b", "chat_c"]}
+    resumed = BulkImporter(_embed, lambda items, vectors: None, checkpoint_path=str(checkpoint))
+    assert resumed.resume_ids() == ["chat_b", "chat_c"]
+
+
+def test_reimport_uses_the_same_memory_ids():
+    first = conversation_items("chat_c", _chats()[2][1])
+    second = conversation_items("chat_c", _chats()[2][1])
+
+    assert [i.id for i in first] == [i.id for i in second]
+    assert first[0].id != import_item_id("chat_a", 0)
@@ -0,0 +1,114 @@
+"""Tests for chunking long messages into overlapping memory items."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory.bulk_import import BulkImporter
+from memory.chunker import assemble_context, chunk_item, chunk_spans, neighbour_ids
+from memory.schema import MemoryItem
+
+
+def _prose(sentences=60):
+    return " ".join(f"Sentence {i} is about subject {i % 5}." for i in range(sentences))
+
+
+def test_short_messages_are_not_chunked():
+    item = MemoryItem.create("just a line", "user", "chat_a")
+
+    assert chunk_item(item) == [item]
+
+
+def test_chunks_end_at_sentences_and_overlap():
+    text = _prose()
+
+    spans = chunk_spans(text, max_chars=300, overlap_chars=80)
+
+    assert len(spans) > 3
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    for start, end in spans:
+        assert end - start <= 300
+        assert text[start:end].endswith(".")
+        assert text[start:end].startswith("Sentence")
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        assert 0 < previous_end - start <= 80
+
+
+def test_lines_without_punctuation_and_overlong_words_are_split():
+    code = "\n".join(f"value_{i} = compute({i})" for i in range(80)) + "\n" + "x" * 700
+
+    spans = chunk_spans(code, max_chars=250, overlap_chars=40)
+
+    assert all(end - start <= 250 for start, end in spans)
+    assert "".join(code[start:end] for start, end in spans).count("value_79 = compute(79)") >= 1
+    assert spans[-1][1] == len(code)
+
+
+def test_chunk_items_carry_parent_and_offsets_through_payloads():
+    item = MemoryItem.create(_prose(), "assistant", "chat_a", tags=["t"])
+
+    chunks = chunk_item(item, max_chars=300, overlap_chars=80)
+    restored = [MemoryItem.from_payload(c.id, c.to_payload()) for c in chunks]
+
+    assert restored == chunks
+    for index, chunk in enumerate(chunks):
+        assert chunk.parent_id == item.id and chunk.source_id == item.id
+        assert (chunk.chunk_index, chunk.chunk_count) == (index, len(chunks))
+        assert item.text[chunk.start:chunk.end] == chunk.text
+        assert chunk.conversation_id == "chat_a" and chunk.tags == ["t"]
+    assert neighbour_ids(chunks[0]) == [chunks[1].id]
+    assert neighbour_ids(chunks[2]) == [chunks[1].id, chunks[3].id]
+    assert chunk_item(item, max_chars=300, overlap_chars=80)[1].id == chunks[1].id
+
+
+def test_whole_message_payloads_stay_unchanged():
+    item = MemoryItem.create("short", "user", "chat_a")
+
+    assert "parent_id" not in item.to_payload()
+    assert MemoryItem.from_payload(item.id, item.to_payload()).source_id == item.id
+
+
+def test_context_is_the_hit_plus_bounded_neighbouring_text():
+    item = MemoryItem.create(_prose(), "assistant", "chat_a")
+    chunks = chunk_item(item, max_chars=300, overlap_chars=80)
+    hit = chunks[2]
+
+    context = assemble_context([hit], [chunks[1], chunks[3]], context_chars=100)
+
+    assert hit.text in context
+    assert context.startswith("… ") and context.endswith(" …")
+    assert len(context) <= len(hit.text) + 2 * 100 + 4
+    body = context[2:-2]
+    assert item.text.find(body) != -1
+
+
+def test_context_of_whole_message_and_separate_hits():
+    whole = MemoryItem.create("complete answer", "assistant", "chat_a")
+    assert assemble_context([whole]) == "complete answer"
+
+    item = MemoryItem.create(_prose(), "assistant", "chat_a")
+    chunks = chunk_item(item, max_chars=300, overlap_chars=80)
+    context = assemble_context([chunks[0], chunks[-1]], context_chars=0)
+
+    assert context == chunks[0].text + " … " + chunks[-1].text
+
+
+def test_bulk_import_stores_chunks_but_counts_messages():
+    stored = []
+    progress = []
+    importer = BulkImporter(
+        lambda texts: [[0.0] for _ in texts],
+        lambda items, vectors: stored.extend(items),
+        progress_callback=lambda *args: progress.append(args),
+    )
+
+    result = importer.run([("chat_a", [
+        {"role": "user", "content": "short question"},
+        {"role": "assistant", "content": _prose(200)},
+    ])])
+
+    assert result == {"imported": 1, "messages": 2}
+    assert len(stored) > 2
+    assert {item.source_id for item in stored} == {stored[0].id, stored[1].parent_id}
+    assert progress[-1] == (2, 2, "chat_a")
@@ -0,0 +1,141 @@
+"""Tests for the background memory ingestion queue."""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory.ingest_queue import MemoryIngestQueue
+from memory.schema import MemoryItem
+
+
+def _queue(store, spool):
+    queue = MemoryIngestQueue(store, spool_path=str(spool))
+    queue.BATCH_DELAY_SECONDS = 0.05
+    return queue
+
+
+def test_items_are_stored_in_batches_and_spool_is_cleared(tmp_path):
+    spool = tmp_path / "memory.pending.jsonl"
+    batches = []
+    queue = _queue(lambda items: batches.append([item.text for item in items]), spool)
+
+    for text in ("one", "two", "three"):
+        queue.submit(MemoryItem.create(text, "user", "chat_a"))
+    assert queue.flush(timeout=5)
+
+    assert batches == [["one", "two", "three"]]
+    assert not spool.exists()
+    assert queue.pending_count() == 0
+
+
+def test_unstored_items_survive_a_restart(tmp_path):
+    spool = tmp_path / "memory.pending.jsonl"
+    release = threading.Event()
+
+    def failing_store(items):
+        release.wait(5)
+        raise OSError("embedding service unavailable")
+
+    queue = _queue(failing_store, spool)
+    item = MemoryItem.create("remember me", "assistant", "chat_a")
+    queue.submit(item)
+    queue.submit(MemoryItem.create("dropped", "user", "chat_b"))
+    assert queue.discard_conversation("chat_b") == 1
+    queue.close(timeout=0)
+    release.set()
+
+    stored = []
+    resumed = _queue(stored.extend, spool)
+    assert resumed.flush(timeout=5)
+    assert [(i.id, i.text, i.role) for i in stored] == [(item.id, "remember me", "assistant")]
+
+
+def test_failed_batches_are_retried(tmp_path):
+    attempts = []
+
+    def flaky_store(items):
+        attempts.append(len(items))
+        if len(attempts) == 1:
+            raise OSError("rate limited")
+
+    queue = _queue(flaky_store, tmp_path / "spool.jsonl")
+    queue.submit(MemoryItem.create("text", "user", "chat_a"))
+    assert queue.flush(timeout=5)
+    assert attempts == [1, 1]
+
+
+def test_discard_waits_for_a_batch_in_flight(tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+    stored = []
+
+    def slow_store(items):
+        started.set()
+        release.wait(5)
+        stored.extend(items)
+
+    queue = _queue(slow_store, tmp_path / "spool.jsonl")
+    queue.submit(MemoryItem.create("in flight", "user", "chat_a"))
+    assert started.wait(5)
+    queue.submit(MemoryItem.create("queued", "user", "chat_a"))
+
+    results = []
+    discarding = threading.Thread(target=lambda: results.append(queue.discard_conversation("chat_a")))
+    discarding.start()
+    discarding.join(0.2)
+    assert discarding.is_alive()
+
+    release.set()
+    discarding.join(5)
+    # The in-flight item was stored before discard returned, so a delete
+    # of the conversation's stored memories that follows removes it too.
+    assert results == [1]
+    assert [item.text for item in stored] == ["in flight"]
+    assert queue.flush(timeout=5)
+    assert [item.text for item in stored] == ["in flight"]
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+def test_items_that_always_fail_are_dropped_without_blocking_the_queue(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    stored = []
+
+    def store(items):
+        if any(item.text == "too long" for item in items):
+            raise _BadRequest("input too long")
+        stored.extend(item.text for item in items)
+
+    queue = _queue(store, spool)
+    for text in ("one", "too long", "two", "three"):
+        queue.submit(MemoryItem.create(text, "user", "chat_a"))
+    assert queue.flush(timeout=5)
+
+    assert sorted(stored) == ["one", "three", "two"]
+    assert not spool.exists()
+
+
+def test_transient_failures_keep_items_queued(tmp_path):
+    attempts = []
+
+    def unavailable(items):
+        attempts.append(len(items))
+        raise OSError("connection refused")
+
+    queue = _queue(unavailable, tmp_path / "spool.jsonl")
+    queue.MAX_ATTEMPTS = 2
+    queue.MAX_RETRY_DELAY_SECONDS = 0.01
+    queue.submit(MemoryItem.create("text", "user", "chat_a"))
+
+    deadline = time.monotonic() + 5
+    while len(attempts) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    queue.close(timeout=1)
+
+    # Network errors never drop the item; it stays queued for later.
+    assert queue.pending_count() == 1
@@ -0,0 +1,62 @@
+"""Tests for the model cache repository (TTL and HTTP validators)."""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.model_cache_repository import ModelCacheRepository
+
+
+def test_set_models_round_trip_with_validators(tmp_path):
+    cache_file = tmp_path / "model_cache.json"
+    repo = ModelCacheRepository(cache_file=str(cache_file))
+    repo.set_models("Gemini", ["gemini-2.5-pro"], etag='"abc"', last_modified="Tue, 01 Jan 2030 00:00:00 GMT")
+    repo.save()
+
+    reloaded = ModelCacheRepository(cache_file=str(cache_file))
+    assert reloaded.has_models("gemini")
+    assert reloaded.get_models("gemini") == ["gemini-2.5-pro"]
+    assert reloaded.get_validators("gemini") == {
+        "etag": '"abc"',
+        "last_modified": "Tue, 01 Jan 2030 00:00:00 GMT",
+    }
+    # No temp files left behind by the atomic write.
+    assert [p.name for p in tmp_path.iterdir()] == ["model_cache.json"]
+
+
+def test_is_stale_and_mark_fresh(tmp_path):
+    repo = ModelCacheRepository(cache_file=str(tmp_path / "cache.json"))
+    assert repo.is_stale("openai")
+
+    repo.set_models("openai", ["gpt-4o"])
+    assert not repo.is_stale("openai", max_age_hours=1)
+
+    old = (datetime.now() - timedelta(hours=2)).isoformat()
+    repo._cache["openai"]["last_updated"] = old
+    assert repo.is_stale("openai", max_age_hours=1)
+
+    repo.mark_fresh("openai")
+    assert not repo.is_stale("openai", max_age_hours=1)
+    assert repo.get_models("openai") == ["gpt-4o"]
+
+
+def test_mark_fresh_upgrades_legacy_list_entries(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    cache_file.write_text(json.dumps({"grok": ["grok-4"]}), encoding="utf-8")
+    repo = ModelCacheRepository(cache_file=str(cache_file))
+
+    assert repo.get_models("grok") == ["grok-4"]
+    assert repo.get_validators("grok") == {}
+    repo.mark_fresh("grok")
+    assert repo.get_models("grok") == ["grok-4"]
+    assert repo.get_last_updated("grok") is not None
+
+
+def test_get_models_returns_copy(tmp_path):
+    repo = ModelCacheRepository(cache_file=str(tmp_path / "cache.json"))
+    repo.set_models("claude", ["claude-sonnet-4"])
+    repo.get_models("claude").append("mutated")
+    assert repo.get_models("claude") == ["claude-sonnet-4"]
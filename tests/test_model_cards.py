@@ -127,6 +127,14 @@ class TestModelCard:
         assert card_with_name.get_display_name() == "GPT-4o Mini"
         assert card_without_name.get_display_name() == "gpt-4o-mini"
 
+    def test_get_max_image_edge(self):
+        """get_max_image_edge() prefers the card value over the provider default."""
+        assert ModelCard(id="gpt-4o", provider="openai").get_max_image_edge() == 2048
+        assert ModelCard(id="x", provider="openai", max_image_edge=1024).get_max_image_edge() == 1024
+        assert ModelCard(id="x", provider="custom").get_max_image_edge() is None
+        card = apply_override_to_card(ModelCard(id="x", provider="custom"), {"max_image_edge": 768})
+        assert card.get_max_image_edge() == 768
+
 
 class TestBuiltinCatalog:
     """Tests for the built-in card catalog."""
@@ -0,0 +1,72 @@
+"""Tests for refreshing provider model lists through the model cache."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from controller import ChatController
+from events import EventBus, EventType
+from repositories.model_cache_repository import ModelCacheRepository
+
+
+class FakeSettings:
+    def get(self, key, default=None):
+        return default
+
+
+class OfflineProvider:
+    """Provider whose API is unreachable; get_available_models() falls back."""
+
+    def fetch_models(self, disable_filter=False):
+        raise ConnectionError("network is unreachable")
+
+    def get_available_models(self, disable_filter=False):
+        return ["gpt-3.5-turbo", "gpt-4"]
+
+
+class OnlineProvider(OfflineProvider):
+    def fetch_models(self, disable_filter=False):
+        return ["gpt-5.1", "gpt-4o"]
+
+
+def _controller(tmp_path, provider):
+    controller = ChatController.__new__(ChatController)
+    controller.providers = {"openai": provider}
+    controller.api_keys = {}
+    controller._settings_manager = FakeSettings()
+    controller._event_bus = EventBus()
+    controller._model_cache_repo = ModelCacheRepository(cache_file=str(tmp_path / "model_cache.json"))
+    return controller
+
+
+def _age(repo, name, hours):
+    repo._cache[name]["last_updated"] = (datetime.now() - timedelta(hours=hours)).isoformat()
+
+
+def test_failed_fetch_keeps_the_cached_models_stale(tmp_path):
+    controller = _controller(tmp_path, OfflineProvider())
+    repo = controller._model_cache_repo
+    repo.set_models("openai", ["gpt-4o", "gpt-5.1"])
+    _age(repo, "openai", 48)
+    published = []
+    controller._event_bus.subscribe(EventType.MODELS_FETCHED, lambda e: published.append(e.data))
+
+    results = controller.refresh_provider_models(["openai"])
+
+    assert results == {"openai": ["gpt-4o", "gpt-5.1"]}
+    assert repo.get_models("openai") == ["gpt-4o", "gpt-5.1"]
+    assert repo.is_stale("openai", max_age_hours=24)
+    assert published == [{"provider": "openai", "models": ["gpt-4o", "gpt-5.1"]}]
+
+
+def test_successful_fetch_replaces_the_cached_models(tmp_path):
+    controller = _controller(tmp_path, OnlineProvider())
+    repo = controller._model_cache_repo
+    repo.set_models("openai", ["gpt-4o"])
+    _age(repo, "openai", 48)
+
+    assert controller.refresh_provider_models(["openai"]) == {"openai": ["gpt-5.1", "gpt-4o"]}
+    assert repo.get_models("openai") == ["gpt-5.1", "gpt-4o"]
+    assert not repo.is_stale("openai", max_age_hours=24)
@@ -0,0 +1,62 @@
+"""Tests for prompt-cache hints and cached-token accounting."""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ai_providers import (
+    ClaudeProvider,
+    OpenAIProvider,
+    _prompt_cache_key,
+    _record_cache_usage,
+)
+
+
+def test_cache_usage_is_summed_across_rounds():
+    meta = {}
+    responses_usage = SimpleNamespace(
+        input_tokens=1000, input_tokens_details=SimpleNamespace(cached_tokens=768)
+    )
+    chat_usage = {"prompt_tokens": 1100, "prompt_tokens_details": None, "cache_read_input_tokens": 1000}
+    _record_cache_usage(meta, "openai", SimpleNamespace(usage=responses_usage), "Test")
+    _record_cache_usage(meta, "openai", SimpleNamespace(usage=chat_usage), "Test")
+    _record_cache_usage(meta, "openai", SimpleNamespace(usage=None), "Test")
+    assert meta == {"openai": {"usage": {"input_tokens": 2100, "cached_tokens": 1768}}}
+
+
+def test_responses_requests_carry_a_stable_cache_key():
+    calls = []
+
+    def create(**params):
+        calls.append(params)
+        message = SimpleNamespace(type="message", content=[SimpleNamespace(text="ok")])
+        return SimpleNamespace(id="resp_1", output=[message], usage=None)
+
+    provider = OpenAIProvider()
+    provider.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    messages = [{"role": "user", "content": "hi"}]
+    provider._generate_with_responses_api(messages, "gpt-4o", chat_id="chat_a")
+    provider._generate_with_responses_api(messages, "gpt-4o", chat_id="chat_a")
+    provider._generate_with_responses_api(messages, "gpt-4o")
+
+    assert calls[0]["prompt_cache_key"] == calls[1]["prompt_cache_key"] == _prompt_cache_key("chat_a")
+    assert "chat_a" not in calls[0]["prompt_cache_key"]
+    assert "prompt_cache_key" not in calls[2]
+
+
+def test_claude_requests_carry_no_cache_hints():
+    calls = []
+
+    def create(**params):
+        calls.append(params)
+        message = SimpleNamespace(content="ok", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    provider = ClaudeProvider()
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
+
+    assert provider.generate_chat_completion(messages, "claude-sonnet-4-5") == "ok"
+    assert calls[0]["messages"] == messages
@@ -0,0 +1,75 @@
+"""Tests for Responses API conversation chaining via previous_response_id."""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ai_providers import OpenAIProvider, _messages_since_last_reply
+
+
+class NotFound(Exception):
+    status_code = 404
+
+
+class FakeResponsesClient:
+    """Records Responses API calls; optionally rejects previous_response_id."""
+
+    def __init__(self, reject_previous=False):
+        self.calls = []
+        self.reject_previous = reject_previous
+        self.responses = SimpleNamespace(create=self._create)
+
+    def _create(self, **params):
+        self.calls.append(params)
+        if self.reject_previous and "previous_response_id" in params:
+            raise NotFound("Previous response not found")
+        message = SimpleNamespace(type="message", content=[SimpleNamespace(text="answer")])
+        return SimpleNamespace(id=f"resp_{len(self.calls)}", output=[message])
+
+
+MESSAGES = [
+    {"role": "system", "content": "be brief"},
+    {"role": "user", "content": "one"},
+    {"role": "assistant", "content": "first"},
+    {"role": "user", "content": "two"},
+]
+
+
+def test_messages_since_last_reply_keeps_system_prompt():
+    assert _messages_since_last_reply(MESSAGES) == [MESSAGES[0], MESSAGES[3]]
+    assert _messages_since_last_reply(MESSAGES[:2]) == MESSAGES[:2]
+
+
+def _provider(client):
+    provider = OpenAIProvider()
+    provider.client = client
+    return provider
+
+
+def test_previous_response_sends_only_new_turn():
+    client = FakeResponsesClient()
+    meta = {}
+    answer = _provider(client)._generate_with_responses_api(
+        MESSAGES, "gpt-4o", response_meta=meta, previous_response_id="resp_prev",
+    )
+    assert answer == "answer"
+    params = client.calls[0]
+    assert params["previous_response_id"] == "resp_prev"
+    assert params["instructions"] == "be brief"
+    assert [item["content"][0]["text"] for item in params["input"]] == ["two"]
+    assert meta == {"openai": {"response_id": "resp_1", "model": "gpt-4o"}}
+
+
+def test_unknown_previous_response_falls_back_to_full_history():
+    client = FakeResponsesClient(reject_previous=True)
+    meta = {}
+    _provider(client)._generate_with_responses_api(
+        MESSAGES, "gpt-4o", response_meta=meta, previous_response_id="resp_gone",
+    )
+    assert len(client.calls) == 2
+    retry = client.calls[1]
+    assert "previous_response_id" not in retry
+    assert len(retry["input"]) == 3
+    assert meta["openai"]["response_id"] == "resp_2"
@@ -0,0 +1,132 @@
+"""Tests for the full-text search index over chats and documents."""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from repositories.chat_history_repository import ChatHistoryRepository, JOURNAL_FILENAME
+from repositories.document_repository import DocumentRepository
+from repositories.search_index import SEARCH_INDEX_FILENAME
+
+
+def _chat(*contents):
+    msgs = [{"role": "system", "content": "You are helpful about dogs."}]
+    for i, content in enumerate(contents):
+        msgs.append({"role": "user" if i % 2 == 0 else "assistant", "content": content})
+    return msgs
+
+
+def test_word_boundary_and_plural_semantics(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_dogs", _chat("Tell me about my dog", "Dogs are great companions!"))
+    repo.save("chat_other", _chat("She worked doggedly on hotdog dogma"))
+
+    results = repo.search("dog")
+    assert [r.chat_id for r in results] == ["chat_dogs"]
+    assert results[0].relevance_score == 2
+    assert results[0].matches[0].startswith("[user]: ")
+    # System prompts are not searched.
+    assert repo.search("helpful") == []
+    assert (tmp_path / SEARCH_INDEX_FILENAME).exists()
+
+
+def test_index_follows_saves_edits_and_deletes(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_a", _chat("first question"))
+    repo.save("chat_a", _chat("first question", "an answer about parrots"))
+    assert [r.chat_id for r in repo.search("parrot")] == ["chat_a"]
+
+    repo.save("chat_a", _chat("first question", "an answer about cats"))
+    assert repo.search("parrot") == []
+    assert len(repo.search("cats")) == 1
+
+    repo.delete("chat_a")
+    assert repo.search("cats") == []
+
+
+def test_snippet_window_and_exclusion(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    text = "x" * 50 + " needle " + "y" * 50
+    repo.save("chat_a", _chat(text))
+    repo.save("chat_b", _chat("needle"))
+
+    results = repo.search("needle", context_window=10, exclude_chat_id="chat_b.json")
+    assert [r.chat_id for r in results] == ["chat_a"]
+    assert results[0].matches == ["[user]: ...xxxxxxxxx needle yyyyyyyyy..."]
+
+
+def test_files_written_outside_the_repository_are_indexed_lazily(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_a", _chat("nothing here"))
+    assert repo.search("zebra") == []
+
+    legacy = {"messages": _chat("A zebra walked in"), "metadata": {"title": "Zoo"}}
+    (tmp_path / "legacy.json").write_text(json.dumps(legacy), encoding="utf-8")
+    assert repo.search("zebra")[0].chat_title == "Zoo"
+    # A plural keyword does not match the singular.
+    assert repo.search("zebras") == []
+
+    path = tmp_path / "legacy.json"
+    legacy["messages"] = _chat("Now about lions")
+    path.write_text(json.dumps(legacy), encoding="utf-8")
+    os.utime(path, (time.time() + 5, time.time() + 5))
+    assert repo.search("zebra") == []
+    assert len(repo.search("lion")) == 1
+
+    path.unlink()
+    assert repo.search("lion") == []
+
+
+def test_journal_appends_missed_by_the_index_are_indexed_lazily(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_a", _chat("first question"))
+    repo.save("chat_a", _chat("first question", "an answer"))
+    assert repo.search("giraffe") == []
+
+    # Another instance appends to the journal but never updates the index
+    # (as after a crash between the append and the index update).
+    other = ChatHistoryRepository(history_dir=str(tmp_path))
+    other._index_chat = lambda *args, **kwargs: None
+    other.save("chat_a", _chat("first question", "an answer", "what about a giraffe?"))
+    journal = tmp_path / "chat_a" / JOURNAL_FILENAME
+    os.utime(journal, (time.time() + 5, time.time() + 5))
+
+    results = ChatHistoryRepository(history_dir=str(tmp_path)).search("giraffe")
+    assert [r.chat_id for r in results] == ["chat_a"]
+
+
+def test_document_search(tmp_path):
+    chats = ChatHistoryRepository(history_dir=str(tmp_path))
+    docs = DocumentRepository(history_dir=str(tmp_path))
+    chats.save("chat_a", _chat("galaxy in a chat"))
+    doc = docs.create(title="Notes", content="A spiral galaxy far away")
+
+    results = docs.search("galaxy")
+    assert [(r.chat_id, r.chat_title) for r in results] == [(doc.id, "Notes")]
+    assert [r.chat_id for r in chats.search("galaxy")] == ["chat_a"]
+
+    docs.delete(doc.id)
+    assert docs.search("galaxy") == []
+
+
+def test_content_filter_matches_substrings_and_whole_words(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    repo.save("chat_a", _chat("I ate a Hotdog", "tasty"))
+    repo.save("chat_b", _chat("my dog barks"))
+    repo.save("chat_c", _chat("nothing relevant"))
+
+    assert sorted(repo.iter_content_matches("dog")) == ["chat_a", "chat_b"]
+    assert list(repo.iter_content_matches("dog", whole_words=True)) == ["chat_b"]
+    assert list(repo.iter_content_matches("")) == []
+
+
+def test_content_filter_stops_when_cancelled(tmp_path):
+    repo = ChatHistoryRepository(history_dir=str(tmp_path))
+    for i in range(5):
+        repo.save(f"chat_{i}", _chat("common words"))
+
+    assert list(repo.iter_content_matches("common", is_cancelled=lambda: True)) == []
+    assert len(list(repo.iter_content_matches("common", is_cancelled=lambda: False))) == 5
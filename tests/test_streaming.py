@@ -0,0 +1,148 @@
+"""Tests for the provider streaming helpers."""
+
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from ai_providers import (
+    _create_chat_completion,
+    _create_responses,
+    _read_chat_completion_json,
+    _read_responses_json,
+)
+
+
+class FakeSSEResponse:
+    """Minimal stand-in for a streamed requests.Response."""
+
+    def __init__(self, events, content_type="text/event-stream"):
+        self.headers = {"Content-Type": content_type}
+        self._events = events
+
+    def iter_lines(self, decode_unicode=False):
+        for event in self._events:
+            yield f"data: {json.dumps(event)}"
+            yield ""
+        yield "data: [DONE]"
+
+    def json(self):
+        return {"plain": True}
+
+
+def _sdk_chunk(content=None, tool_calls=None, finish_reason=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)],
+        usage=None,
+    )
+
+
+def _sdk_tool_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index,
+        id=id,
+        type="function" if id else None,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+class FakeClient:
+    """Fake OpenAI client returning canned results for create()."""
+
+    def __init__(self, result):
+        self.calls = []
+        create = self._create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+        self.responses = SimpleNamespace(create=create)
+        self._result = result
+
+    def _create(self, **params):
+        self.calls.append(params)
+        return self._result
+
+
+class TestHttpChatCompletionStream:
+    def test_merges_content_and_forwards_deltas(self):
+        resp = FakeSSEResponse([
+            {"choices": [{"delta": {"role": "assistant", "content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+        ])
+        deltas = []
+        data = _read_chat_completion_json(resp, deltas.append)
+
+        assert deltas == ["Hel", "lo"]
+        assert data["choices"][0]["message"]["content"] == "Hello"
+        assert data["choices"][0]["finish_reason"] == "stop"
+        assert "tool_calls" not in data["choices"][0]["message"]
+
+    def test_merges_tool_call_fragments(self):
+        resp = FakeSSEResponse([
+            {"choices": [{"delta": {"tool_calls": [
+                {"index": 0, "id": "call_1", "type": "function",
+                 "function": {"name": "generate_image", "arguments": "{\"pro"}},
+            ]}}]},
+            {"choices": [{"delta": {"tool_calls": [
+                {"index": 0, "function": {"arguments": "mpt\": \"cat\"}"}},
+            ]}}]},
+        ])
+        data = _read_chat_completion_json(resp, lambda delta: None)
+        tool_calls = data["choices"][0]["message"]["tool_calls"]
+
+        assert len(tool_calls) == 1
+        assert tool_calls[0]["id"] == "call_1"
+        assert tool_calls[0]["function"]["name"] == "generate_image"
+        assert json.loads(tool_calls[0]["function"]["arguments"]) == {"prompt": "cat"}
+
+    def test_plain_json_response_is_returned_unchanged(self):
+        resp = FakeSSEResponse([], content_type="application/json")
+        assert _read_chat_completion_json(resp, lambda delta: None) == {"plain": True}
+
+
+class TestHttpResponsesStream:
+    def test_returns_completed_response(self):
+        final = {"output": [{"type": "message", "content": [{"text": "Hi there"}]}]}
+        resp = FakeSSEResponse([
+            {"type": "response.output_text.delta", "delta": "Hi"},
+            {"type": "response.output_text.delta", "delta": " there"},
+            {"type": "response.completed", "response": final},
+        ])
+        deltas = []
+        assert _read_responses_json(resp, deltas.append) == final
+        assert deltas == ["Hi", " there"]
+
+
+class TestSdkStreaming:
+    def test_without_callback_calls_create_directly(self):
+        sentinel = object()
+        client = FakeClient(sentinel)
+        assert _create_chat_completion(client, {"model": "m"}) is sentinel
+        assert "stream" not in client.calls[0]
+
+    def test_chat_completion_stream_builds_message(self):
+        client = FakeClient([
+            _sdk_chunk(content="A", tool_calls=[_sdk_tool_delta(0, id="c1", name="search", arguments="{}")]),
+            _sdk_chunk(content="B", finish_reason="tool_calls"),
+        ])
+        deltas = []
+        response = _create_chat_completion(client, {"model": "m"}, deltas.append)
+        message = response.choices[0].message
+
+        assert client.calls[0]["stream"] is True
+        assert deltas == ["A", "B"]
+        assert message.content == "AB"
+        assert message.tool_calls[0].function.name == "search"
+        assert response.choices[0].finish_reason == "tool_calls"
+
+    def test_responses_stream_returns_final_response(self):
+        final = SimpleNamespace(output=[])
+        client = FakeClient([
+            SimpleNamespace(type="response.output_text.delta", delta="x"),
+            SimpleNamespace(type="response.completed", response=final),
+        ])
+        deltas = []
+        assert _create_responses(client, {"model": "m"}, deltas.append) is final
+        assert deltas == ["x"]
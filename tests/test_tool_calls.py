@@ -0,0 +1,77 @@
+"""Tests for dispatching several tool calls from one model turn."""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from tools import ToolContext, is_serial_tool, run_tool_calls
+
+
+def _recording_context(delay=0.05):
+    """Build a context whose handlers record start/end order and concurrency."""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0, "events": []}
+
+    def track(label):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["events"].append(("start", label))
+        time.sleep(delay)
+        with lock:
+            state["active"] -= 1
+            state["events"].append(("end", label))
+        return label
+
+    context = ToolContext(
+        wolfram_handler=lambda query: track(f"wolfram:{query}"),
+        memory_handler=lambda query: track(f"memory:{query}"),
+        text_edit_handler=lambda target, op, text, summary, search: track(f"edit:{text}"),
+    )
+    return context, state
+
+
+def test_apply_text_edit_is_serial():
+    assert is_serial_tool("apply_text_edit")
+    assert not is_serial_tool("wolfram_alpha")
+    assert not is_serial_tool("unknown_tool")
+
+
+def test_results_keep_request_order_and_run_concurrently():
+    context, state = _recording_context()
+    calls = [
+        ("wolfram_alpha", {"query": "a"}),
+        ("retrieve_memory", {"query": "b"}),
+        ("wolfram_alpha", {"query": "c"}),
+    ]
+    results = run_tool_calls(calls, context, max_workers=4)
+
+    assert results == ["wolfram:a", "memory:b", "wolfram:c"]
+    assert state["peak"] == 3
+
+
+def test_max_workers_bounds_concurrency():
+    context, state = _recording_context()
+    calls = [("wolfram_alpha", {"query": str(i)}) for i in range(5)]
+    results = run_tool_calls(calls, context, max_workers=2)
+
+    assert results == [f"wolfram:{i}" for i in range(5)]
+    assert state["peak"] == 2
+
+
+def test_serial_tool_is_a_barrier():
+    context, state = _recording_context()
+    calls = [
+        ("wolfram_alpha", {"query": "before"}),
+        ("apply_text_edit", {"target": "document", "text": "x"}),
+        ("wolfram_alpha", {"query": "after"}),
+    ]
+    results = run_tool_calls(calls, context, max_workers=4)
+
+    assert [r.split("__")[-1] for r in results] == ["wolfram:before", "edit:x", "wolfram:after"]
+    events = state["events"]
+    assert events.index(("end", "wolfram:before")) < events.index(("start", "edit:x"))
+    assert events.index(("end", "edit:x")) < events.index(("start", "wolfram:after"))
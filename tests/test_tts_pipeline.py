@@ -0,0 +1,98 @@
+"""Tests for sentence-pipelined TTS in AudioService."""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services import AudioService
+from services.audio_service import split_tts_chunks
+
+
+class TestSplitTtsChunks:
+    def test_keeps_text_and_order(self):
+        text = "First sentence. Second one! Third?\n\nA new paragraph."
+        chunks = split_tts_chunks(text)
+        assert " ".join(chunks) == " ".join(text.split())
+
+    def test_first_chunk_is_short(self):
+        text = "Opening line here. " + "More words in a following sentence. " * 20
+        chunks = split_tts_chunks(text, max_chars=300, first_chunk_chars=60)
+        assert len(chunks[0]) <= 60
+        assert all(len(chunk) <= 300 for chunk in chunks)
+        assert len(chunks) > 2
+
+    def test_long_sentence_splits_at_clauses(self):
+        text = ", ".join(["a clause of several words"] * 30) + "."
+        chunks = split_tts_chunks(text, max_chars=100, first_chunk_chars=50)
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        assert chunks[0].endswith(",")
+
+    def test_empty_text(self):
+        assert split_tts_chunks("  \n ") == []
+
+
+class RecordingAudioService(AudioService):
+    """Synthesizes and 'plays' chunks by recording them."""
+
+    def __init__(self, synth_seconds=0.05, play_seconds=0.1):
+        super().__init__()
+        self.synth_seconds = synth_seconds
+        self.play_seconds = play_seconds
+        self.log = []
+        self._lock = threading.Lock()
+
+    def _record(self, entry):
+        with self._lock:
+            self.log.append(entry)
+
+    def synthesize(self, text, provider_type, provider, stop_event=None, chat_id=None, **kwargs):
+        self._record(("synth", text))
+        time.sleep(self.synth_seconds)
+        return Path(text)
+
+    def _play_path(self, audio_path, stop_event, use_subprocess, event_data=None):
+        self._record(("play", str(audio_path)))
+        time.sleep(self.play_seconds)
+        self._record(("end", str(audio_path)))
+        return True
+
+
+def test_pipelined_playback_overlaps_synthesis_and_keeps_order():
+    service = RecordingAudioService()
+    chunks = ["One.", "Two.", "Three."]
+    assert service._synthesize_and_play_pipelined(
+        chunks, "custom", provider=None, stop_event=threading.Event(), chat_id=None, use_subprocess=False,
+    )
+
+    plays = [entry[1] for entry in service.log if entry[0] == "play"]
+    assert plays == chunks
+    # Chunk 2 is synthesized before chunk 1 finishes playing.
+    assert service.log.index(("synth", "Two.")) < service.log.index(("end", "One."))
+
+
+def test_pipelined_playback_stops_on_stop_event():
+    service = RecordingAudioService(play_seconds=0.2)
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+
+    result = service._synthesize_and_play_pipelined(
+        ["One.", "Two.", "Three."], "custom", provider=None,
+        stop_event=stop_event, chat_id=None, use_subprocess=False,
+    )
+
+    assert result is False
+    assert ("play", "Three.") not in service.log
+
+
+def test_chunk_cache_path_matches_synthesis_cache(tmp_path, monkeypatch):
+    import services.audio_service as audio_module
+    monkeypatch.setattr(audio_module, "HISTORY_DIR", str(tmp_path))
+    service = AudioService()
+
+    path = service._chunk_cache_path("Hello.", "openai", "chat_1", model="tts-1", voice="nova")
+    assert path == service._get_cache_path("Hello.", "chat_1", "openai_tts-1", "nova")
+    assert service._chunk_cache_path("Hello.", "openai", None) is None